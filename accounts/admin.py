@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Account
+from .models import Account, OutboundEmail, RefreshTokenFamily
 
 
 @admin.register(Account)
@@ -22,3 +22,35 @@ class AccountAdmin(admin.ModelAdmin):
     filter_horizontal = ()
     list_filter = ()
     fieldsets = ()
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        "subject",
+        "to_email",
+        "status",
+        "attempts",
+        "next_attempt_at",
+        "created_at",
+        "sent_at",
+    )
+    search_fields = ("to_email", "subject")
+    list_filter = ("status",)
+    readonly_fields = ("created_at", "sent_at", "locked_at", "locked_by")
+
+
+@admin.register(RefreshTokenFamily)
+class RefreshTokenFamilyAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "user",
+        "generation",
+        "created_at",
+        "last_used_at",
+        "expires_at",
+        "revoked_at",
+    )
+    search_fields = ("user__email",)
+    list_select_related = ("user",)
+    readonly_fields = ("id", "user", "generation", "created_at", "last_used_at")
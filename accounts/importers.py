@@ -0,0 +1,250 @@
+import csv
+import io
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import connection, transaction
+from django.utils import timezone
+
+from cfehome import hashing
+from cfehome.pagination import invalidate_counts
+
+from .models import Account
+
+# Only the first errors are kept, with their line numbers.
+MAX_REPORTED_ERRORS = 100
+
+BOOLEANS = {
+    "": None,
+    "1": True,
+    "true": True,
+    "yes": True,
+    "0": False,
+    "false": False,
+    "no": False,
+}
+
+
+class ImportResult:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.duplicates = 0
+        self.error_count = 0
+        self.errors = []
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "message": message})
+
+
+class AccountImporter:
+    """
+    Imports accounts from rows of `email`, `first_name`, `last_name` and
+    optionally `password` (plain text), `password_hash` (any format of
+    `PASSWORD_HASHERS`), `email_verified` and `is_active`.
+
+    Rows are handled `chunk_size` at a time: emails already taken are
+    skipped with a single `email__in` query, plain passwords are hashed
+    across the whole hashing pool, and the remaining rows are inserted in
+    one statement (COPY on PostgreSQL, `bulk_create` elsewhere). Imported
+    accounts get no signals or verification emails.
+
+    `max_rows` and `max_passwords` limit the number of rows and of plain
+    passwords, whose hashing bypasses the hashing queue; past them the
+    import fails with a ValueError.
+    """
+
+    def __init__(
+        self, chunk_size=None, max_rows=None, max_passwords=None, progress=None
+    ):
+        self.chunk_size = chunk_size or settings.BULK_IMPORT_CHUNK_SIZE
+        self.max_rows = max_rows
+        self.max_passwords = max_passwords
+        self.progress = progress
+
+    def run(self, rows):
+        """
+        Import the (line number, row) pairs of `rows`.
+        """
+        result = ImportResult()
+        seen = set()
+        chunk = []
+        passwords = 0
+
+        for line, row in rows:
+            result.rows += 1
+            if self.max_rows is not None and result.rows > self.max_rows:
+                raise ValueError(f"Imports are limited to {self.max_rows} rows")
+
+            try:
+                account = self.clean(row)
+            except ValueError as e:
+                result.add_error(line, str(e))
+                continue
+
+            email = account.email.lower()
+            if email in seen:
+                result.duplicates += 1
+                continue
+            seen.add(email)
+
+            if account._password is not None:
+                passwords += 1
+                if self.max_passwords is not None and passwords > self.max_passwords:
+                    raise ValueError(
+                        f"Imports are limited to {self.max_passwords} plain text "
+                        "passwords, send password hashes instead"
+                    )
+
+            chunk.append(account)
+            if len(chunk) >= self.chunk_size:
+                self.import_chunk(chunk, result)
+                chunk = []
+
+        if chunk:
+            self.import_chunk(chunk, result)
+
+        return result
+
+    def clean(self, row):
+        if not isinstance(row, dict):
+            raise ValueError("Row is not an object")
+
+        email = Account.objects.normalize_email(self.text(row, "email"))
+        try:
+            validate_email(email)
+        except ValidationError:
+            raise ValueError("Invalid email address")
+
+        first_name = self.text(row, "first_name")
+        last_name = self.text(row, "last_name")
+        for field, value in (("first_name", first_name), ("last_name", last_name)):
+            if not value:
+                raise ValueError(f"Missing {field}")
+            if len(value) > Account._meta.get_field(field).max_length:
+                raise ValueError(f"{field} is too long")
+
+        password_hash = self.text(row, "password_hash")
+        if password_hash:
+            try:
+                hashers.identify_hasher(password_hash)
+            except ValueError:
+                raise ValueError("Unknown password hash format")
+
+        account = Account(
+            email=email,
+            first_name=first_name,
+            last_name=last_name,
+            password=password_hash,
+            email_verified=self.boolean(row, "email_verified", False),
+            is_active=self.boolean(row, "is_active", True),
+            date_joined=timezone.now(),
+        )
+        # Hashed with the rest of the chunk.
+        account._password = self.text(row, "password") or None
+        return account
+
+    def text(self, row, field):
+        value = row.get(field)
+        return value.strip() if isinstance(value, str) else ""
+
+    def boolean(self, row, field, default):
+        value = row.get(field)
+        if isinstance(value, bool):
+            return value
+        if value is None:
+            return default
+
+        try:
+            parsed = BOOLEANS[str(value).strip().lower()]
+        except KeyError:
+            raise ValueError(f"Invalid {field}")
+        return default if parsed is None else parsed
+
+    def import_chunk(self, chunk, result):
+        taken = set(
+            Account.objects.filter(
+                email__in=[account.email for account in chunk]
+            ).values_list("email", flat=True)
+        )
+        accounts = [account for account in chunk if account.email not in taken]
+        result.duplicates += len(chunk) - len(accounts)
+
+        unhashed = [account for account in accounts if not account.password]
+        for account, encoded in zip(
+            unhashed, hashing.make_passwords(a._password for a in unhashed)
+        ):
+            account.password = encoded
+            account._password = None
+
+        if accounts:
+            with transaction.atomic():
+                created = self.insert(accounts)
+                if created:
+                    # bulk inserts send no post_save
+                    invalidate_counts(Account)
+                    Account.objects.accounts_imported()
+            result.created += created
+
+        if self.progress:
+            self.progress(result)
+
+    def insert(self, accounts):
+        """
+        Insert `accounts`, skipping emails taken in the meantime. Returns the
+        number of inserted rows.
+        """
+        if connection.vendor != "postgresql":
+            # Rows skipped by a concurrent insert can't be told apart here.
+            Account.objects.bulk_create(accounts, ignore_conflicts=True)
+            return len(accounts)
+
+        fields = [
+            Account._meta.get_field(name)
+            for name in (
+                "email",
+                "first_name",
+                "last_name",
+                "password",
+                "email_verified",
+                "is_active",
+                "is_staff",
+                "is_superuser",
+                "date_joined",
+                "version",
+            )
+        ]
+        columns = ", ".join(connection.ops.quote_name(f.column) for f in fields)
+        table = connection.ops.quote_name(Account._meta.db_table)
+
+        data = io.StringIO()
+        writer = csv.writer(data)
+        for account in accounts:
+            writer.writerow(
+                [
+                    field.get_db_prep_save(getattr(account, field.attname), connection)
+                    for field in fields
+                ]
+            )
+        data.seek(0)
+
+        with connection.cursor() as cursor:
+            # Kept until the outermost transaction commits.
+            cursor.execute(
+                "CREATE TEMPORARY TABLE IF NOT EXISTS account_import ON COMMIT DROP "
+                f"AS SELECT {columns} FROM {table} WITH NO DATA"
+            )
+            cursor.execute("TRUNCATE account_import")
+            cursor.copy_expert(
+                f"COPY account_import ({columns}) FROM STDIN WITH (FORMAT csv)", data
+            )
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) "
+                f"SELECT {columns} FROM account_import "
+                "ON CONFLICT (email) DO NOTHING"
+            )
+            return cursor.rowcount
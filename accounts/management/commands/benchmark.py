@@ -0,0 +1,306 @@
+import asyncio
+import json
+import statistics
+import time
+import tracemalloc
+import uuid
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+
+from accounts.models import Account
+
+
+class Scenario:
+    """
+    A request replayed by the benchmark. `setup` runs once, untimed, inside
+    the rolled back transaction.
+    """
+
+    # Whether requests may be in flight at the same time.
+    concurrent = True
+
+    def setup(self, client):
+        pass
+
+    def request(self, i):
+        """
+        The (method, path, kwargs) of the i-th request.
+        """
+        raise NotImplementedError
+
+    def done(self, response):
+        pass
+
+
+class Register(Scenario):
+    def request(self, i):
+        return (
+            "post",
+            reverse("accounts:register"),
+            {
+                "data": {
+                    "email": f"benchmark-{uuid.uuid4().hex}@example.com",
+                    "first_name": "Bench",
+                    "last_name": "Mark",
+                    "password": "Sup3r-Secret!pw",
+                    "password2": "Sup3r-Secret!pw",
+                },
+                "content_type": "application/json",
+            },
+        )
+
+
+class AdminExists(Scenario):
+    def request(self, i):
+        return "get", reverse("accounts:admin_exists"), {}
+
+
+class LoggedIn(Scenario):
+    def setup(self, client):
+        self.email = f"benchmark-{uuid.uuid4().hex}@example.com"
+        Account.objects.create_user(
+            first_name="Bench",
+            last_name="Mark",
+            email=self.email,
+            password="Sup3r-Secret!pw",
+        )
+        response = client.post(
+            reverse("accounts:login"),
+            {"email": self.email, "password": "Sup3r-Secret!pw"},
+            content_type="application/json",
+        )
+        self.access = response.data["access"]
+        self.refresh = response.data["refresh"]
+
+
+class Login(LoggedIn):
+    def request(self, i):
+        return (
+            "post",
+            reverse("accounts:login"),
+            {
+                "data": {"email": self.email, "password": "Sup3r-Secret!pw"},
+                "content_type": "application/json",
+            },
+        )
+
+
+class Refresh(LoggedIn):
+    # Every request needs the refresh token returned by the previous one.
+    concurrent = False
+
+    def request(self, i):
+        return (
+            "post",
+            reverse("accounts:refresh"),
+            {"data": {"refresh": self.refresh}, "content_type": "application/json"},
+        )
+
+    def done(self, response):
+        if response.status_code == 200:
+            self.refresh = json.loads(response.content)["refresh"]
+
+
+class Me(LoggedIn):
+    def request(self, i):
+        return (
+            "get",
+            reverse("accounts:me"),
+            {"headers": {"Authorization": f"Bearer {self.access}"}},
+        )
+
+
+SCENARIOS = {
+    "admin-exists": AdminExists,
+    "login": Login,
+    "me": Me,
+    "refresh": Refresh,
+    "register": Register,
+}
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Replays an API scenario in-process, through the WSGI or the ASGI "
+        "handler, and reports throughput and request latency. Everything the "
+        "scenario writes is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("scenario", choices=sorted(SCENARIOS))
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=200,
+            help="Number of timed requests.",
+        )
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=10,
+            help="Number of untimed requests sent first.",
+        )
+        parser.add_argument(
+            "--asgi",
+            action="store_true",
+            help="Send the requests through the ASGI handler from one event loop.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=1,
+            help="Number of requests in flight at once, requires --asgi.",
+        )
+        parser.add_argument(
+            "--memory",
+            action="store_true",
+            help="Trace allocations and report the peak heap per open connection.",
+        )
+
+    def handle(self, *args, **options):
+        scenario = SCENARIOS[options["scenario"]]()
+        concurrency = max(options["concurrency"], 1)
+        if concurrency > 1 and not options["asgi"]:
+            raise CommandError(
+                "--concurrency requires --asgi: a WSGI worker thread serves one "
+                "request at a time."
+            )
+        if concurrency > 1 and not scenario.concurrent:
+            raise CommandError(
+                f"The {options['scenario']} scenario can't run concurrently."
+            )
+
+        client = Client(HTTP_HOST=self.get_host())
+        timings = []
+        stats = {}
+
+        if options["memory"]:
+            tracemalloc.start()
+        try:
+            with transaction.atomic():
+                scenario.setup(client)
+
+                if options["asgi"]:
+                    # AsyncClient always sends "Host: testserver".
+                    with override_settings(
+                        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+                    ):
+                        async_to_sync(self.run_asgi)(
+                            scenario, options, concurrency, timings, stats
+                        )
+                else:
+                    self.run_wsgi(client, scenario, options, timings, stats)
+
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            if options["memory"]:
+                tracemalloc.stop()
+
+        if not timings:
+            return
+
+        timings.sort()
+        rows = [
+            ("handler", "asgi" if options["asgi"] else "wsgi"),
+            ("requests", len(timings)),
+            ("req/s", f"{len(timings) / stats['elapsed']:.1f}"),
+            ("mean", self.ms(statistics.mean(timings))),
+            ("p50", self.ms(self.percentile(timings, 50))),
+            ("p95", self.ms(self.percentile(timings, 95))),
+            ("p99", self.ms(self.percentile(timings, 99))),
+            ("max", self.ms(timings[-1])),
+        ]
+        if options["memory"]:
+            rows.append(("heap/conn", f"{stats['heap'] / concurrency / 1024:.1f}KiB"))
+        for label, value in rows:
+            self.stdout.write(f"{label:<10}{value}")
+
+    def run_wsgi(self, client, scenario, options, timings, stats):
+        def send(i):
+            method, path, kwargs = scenario.request(i)
+            start = time.perf_counter()
+            response = getattr(client, method)(path, **kwargs)
+            elapsed = time.perf_counter() - start
+            self.check_response(response)
+            scenario.done(response)
+            return elapsed
+
+        for i in range(options["warmup"]):
+            send(i)
+
+        self.start_phase(stats)
+        for i in range(options["requests"]):
+            timings.append(send(i))
+        self.end_phase(stats)
+
+    async def run_asgi(self, scenario, options, concurrency, timings, stats):
+        client = AsyncClient()
+
+        async def send(i):
+            method, path, kwargs = scenario.request(i)
+            start = time.perf_counter()
+            response = await getattr(client, method)(path, **kwargs)
+            elapsed = time.perf_counter() - start
+            self.check_response(response)
+            scenario.done(response)
+            return elapsed
+
+        async def connection(requests, timings):
+            for i in requests:
+                timings.append(await send(i))
+
+        async def run(count, timings):
+            await asyncio.gather(
+                *(
+                    connection(range(n, count, concurrency), timings)
+                    for n in range(concurrency)
+                )
+            )
+
+        await run(options["warmup"], [])
+
+        self.start_phase(stats)
+        await run(options["requests"], timings)
+        self.end_phase(stats)
+
+    def start_phase(self, stats):
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            stats["baseline"] = tracemalloc.get_traced_memory()[0]
+        stats["start"] = time.perf_counter()
+
+    def end_phase(self, stats):
+        stats["elapsed"] = time.perf_counter() - stats["start"]
+        if tracemalloc.is_tracing():
+            stats["heap"] = tracemalloc.get_traced_memory()[1] - stats["baseline"]
+
+    def get_host(self):
+        for host in settings.ALLOWED_HOSTS:
+            if host and "*" not in host and not host.startswith("."):
+                return host
+        return "localhost"
+
+    def check_response(self, response):
+        if response.status_code >= 400:
+            raise CommandError(
+                f"Scenario failed with status {response.status_code}: "
+                f"{response.content[:200]!r}"
+            )
+
+    def percentile(self, timings, percent):
+        index = round(percent / 100 * (len(timings) - 1))
+        return timings[index]
+
+    def ms(self, seconds):
+        return f"{seconds * 1000:.2f}ms"
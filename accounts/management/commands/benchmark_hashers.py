@@ -0,0 +1,61 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+from cfehome.hashing import _verify, executor
+
+CONFIGURATIONS = {
+    "pbkdf2": "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "argon2": "cfehome.hashers.Argon2PasswordHasher",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures how many password checks per second, the bulk of the cost "
+        "of a login, the hashing executor sustains for each hasher."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--checks",
+            type=int,
+            default=200,
+            help="Number of password checks per hasher.",
+        )
+        parser.add_argument(
+            "--hasher",
+            action="append",
+            choices=sorted(CONFIGURATIONS),
+            help="Hasher to measure, may be repeated. Defaults to all of them.",
+        )
+
+    def handle(self, *args, **options):
+        workers = executor.workers or 1
+        self.stdout.write(f"workers   {workers}")
+
+        for name in options["hasher"] or sorted(CONFIGURATIONS):
+            hasher = import_string(CONFIGURATIONS[name])()
+            encoded = hasher.encode("Sup3r-Secret!pw", hasher.salt())
+            checks = options["checks"]
+
+            # Start the pool before timing.
+            executor.run(_verify, "Sup3r-Secret!pw", encoded, False)
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers * 2) as threads:
+                list(
+                    threads.map(
+                        lambda _: executor.run(
+                            _verify, "Sup3r-Secret!pw", encoded, False
+                        ),
+                        range(checks),
+                    )
+                )
+            rate = checks / (time.perf_counter() - start)
+
+            self.stdout.write(
+                f"{name:<10}{rate:.1f} checks/s, {rate / workers:.1f} checks/s/core"
+            )
@@ -0,0 +1,96 @@
+import io
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+from accounts.models import Account
+from accounts.serializers import AccountSerializer
+
+# Renderer and parser of each wire format, DRF's own first as the reference.
+CONFIGURATIONS = {
+    "json": (
+        "rest_framework.renderers.JSONRenderer",
+        "rest_framework.parsers.JSONParser",
+    ),
+    "orjson": (
+        "cfehome.renderers.ORJSONRenderer",
+        "cfehome.parsers.ORJSONParser",
+    ),
+    "msgpack": (
+        "cfehome.renderers.MessagePackRenderer",
+        "cfehome.parsers.MessagePackParser",
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures how long each renderer and parser takes over a page of "
+        "serialized accounts, as returned by /api/auth/users/."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=1000,
+            help="Number of accounts in the page.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=50,
+            help="Number of times each page is rendered and parsed.",
+        )
+        parser.add_argument(
+            "--format",
+            action="append",
+            dest="formats",
+            choices=sorted(CONFIGURATIONS),
+            help="Format to measure, may be repeated. Defaults to all of them.",
+        )
+
+    def handle(self, *args, **options):
+        accounts = [
+            Account(
+                id=i,
+                first_name=f"First {i}",
+                last_name=f"Lást {i}",
+                email=f"user{i}@example.com",
+                email_verified=i % 2 == 0,
+            )
+            for i in range(options["rows"])
+        ]
+        data = {
+            "count": len(accounts),
+            "next": "http://testserver/api/auth/users/?page=2",
+            "previous": None,
+            "results": AccountSerializer(accounts, many=True).data,
+        }
+        repeat = options["repeat"]
+        reference = None
+
+        for name in options["formats"] or list(CONFIGURATIONS):
+            renderer_path, parser_path = CONFIGURATIONS[name]
+            renderer = import_string(renderer_path)()
+            parser = import_string(parser_path)()
+            media_type = renderer.media_type
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                content = renderer.render(data, media_type)
+            rendering = (time.perf_counter() - start) / repeat
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                parsed = parser.parse(io.BytesIO(content), media_type, {})
+            parsing = (time.perf_counter() - start) / repeat
+
+            if reference is None:
+                reference = parsed
+            self.stdout.write(
+                f"{name:<10}render {rendering * 1000:.2f}ms, "
+                f"parse {parsing * 1000:.2f}ms, {len(content)} bytes"
+                + ("" if parsed == reference else ", DIFFERENT DATA")
+            )
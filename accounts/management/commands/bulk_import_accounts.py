@@ -0,0 +1,73 @@
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.importers import AccountImporter
+from cfehome.parsers import read_csv, read_ndjson
+
+READERS = {"csv": read_csv, "ndjson": read_ndjson}
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports accounts from a CSV or NDJSON file. Rows whose email is "
+        "already taken are skipped, so an interrupted import can be re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help='File to import, "-" for stdin.')
+        parser.add_argument(
+            "--format",
+            choices=sorted(READERS),
+            help="Input format. Defaults to the extension of the file.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.BULK_IMPORT_CHUNK_SIZE,
+            help="Number of rows hashed and inserted at once.",
+        )
+        parser.add_argument(
+            "--encoding",
+            default="utf-8",
+            help="Encoding of the file.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        input_format = options["format"] or path.rpartition(".")[2].lower()
+        if input_format not in READERS:
+            raise CommandError("Unknown input format, use --format.")
+
+        self.start = time.perf_counter()
+        self.reported = None
+        importer = AccountImporter(
+            chunk_size=options["chunk_size"], progress=self.report
+        )
+
+        if path == "-":
+            result = importer.run(READERS[input_format](sys.stdin))
+        else:
+            with open(path, newline="", encoding=options["encoding"]) as lines:
+                result = importer.run(READERS[input_format](lines))
+
+        for error in result.errors:
+            self.stderr.write(f"Line {error['line']}: {error['message']}")
+        if result.error_count > len(result.errors):
+            self.stderr.write(
+                f"... and {result.error_count - len(result.errors)} more error(s)"
+            )
+        self.report(result)
+
+    def report(self, result):
+        if self.reported == result.rows:
+            return
+        self.reported = result.rows
+
+        elapsed = time.perf_counter() - self.start
+        self.stdout.write(
+            f"{result.rows} row(s) in {elapsed:.1f}s: {result.created} created, "
+            f"{result.duplicates} duplicate(s), {result.error_count} error(s)"
+        )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from accounts.models import RefreshTokenFamily
+
+
+class Command(BaseCommand):
+    help = "Deletes refresh token families that have expired or were revoked."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of rows deleted per statement.",
+        )
+
+    def handle(self, *args, **options):
+        deleted = RefreshTokenFamily.objects.delete_expired(
+            chunk_size=options["chunk_size"]
+        )
+        self.stdout.write(f"Deleted {deleted} expired or revoked token session(s)")
@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts.models import Account
+
+
+class Command(BaseCommand):
+    help = "Writes the logins buffered in the cache to Account.last_login in bulk."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.LOGIN_BUFFER_BATCH_SIZE,
+            help="Number of buffered logins written per UPDATE.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep flushing the buffer instead of exiting once it is drained.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=settings.LOGIN_BUFFER_FLUSH_INTERVAL,
+            help="Seconds to sleep between flushes when running with --loop.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            updated = Account.objects.flush_logins(batch_size=options["batch_size"])
+            if updated is None:
+                self.stdout.write("Another flush is in progress")
+            elif updated:
+                self.stdout.write(f"Updated the last login of {updated} account(s)")
+
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,31 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.schema import VARIANTS, generate_schema, schema_path
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes the staff and public OpenAPI schemas as JSON and YAML, to be "
+        "served as is instead of being generated by each process. Run it on "
+        "every build or deploy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output-dir",
+            default=settings.SCHEMA_DIR,
+            help="Directory the schema files are written to.",
+        )
+
+    def handle(self, *args, **options):
+        directory = Path(options["output_dir"])
+        directory.mkdir(parents=True, exist_ok=True)
+
+        for variant in VARIANTS:
+            for extension, content in generate_schema(variant).items():
+                path = schema_path(directory, extension, variant)
+                path.write_bytes(content)
+                self.stdout.write(f"Wrote {path}")
@@ -0,0 +1,72 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from cfehome.mail import send_queued_emails
+
+
+class Command(BaseCommand):
+    help = "Delivers queued outbound emails in batches over pooled SMTP connections."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.EMAIL_QUEUE_BATCH_SIZE,
+            help="Number of messages sent per SMTP connection.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.EMAIL_QUEUE_WORKERS,
+            help="Maximum number of batches delivered concurrently.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling the queue instead of exiting once it is drained.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=settings.EMAIL_QUEUE_POLL_INTERVAL,
+            help="Seconds to sleep between polls when running with --loop.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        workers = max(options["workers"], 1)
+
+        while True:
+            processed = self.drain(batch_size, workers)
+            if processed:
+                self.stdout.write(f"Processed {processed} queued email(s)")
+
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+    def drain(self, batch_size, workers):
+        if workers == 1:
+            return self.drain_worker(batch_size, close_connections=False)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self.drain_worker, batch_size) for _ in range(workers)
+            ]
+            return sum(future.result() for future in futures)
+
+    def drain_worker(self, batch_size, close_connections=True):
+        processed = 0
+        try:
+            while True:
+                claimed = send_queued_emails(batch_size=batch_size)
+                if not claimed:
+                    return processed
+                processed += claimed
+        finally:
+            if close_connections:
+                connections.close_all()
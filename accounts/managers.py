@@ -1,8 +1,17 @@
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
 from django.contrib.auth.models import BaseUserManager
+from django.core.cache import cache
+from django.db import connection, models, transaction
+from django.db.models import F, Q
+from django.utils import timezone
 
 
 class AccountManager(BaseUserManager):
-    def create_user(self, first_name, last_name, email, password=None, **extra_fields):
+    def _new_user(self, first_name, last_name, email, **extra_fields):
         extra_fields.setdefault("is_staff", False)
         extra_fields.setdefault("is_superuser", False)
 
@@ -15,20 +24,39 @@ class AccountManager(BaseUserManager):
         if not last_name:
             raise ValueError("Users must have a last name")
 
+        return self.model(
+            first_name=first_name,
+            last_name=last_name,
+            email=self.normalize_email(email),
+            **extra_fields,
+        )
+
+    def create_user(self, first_name, last_name, email, password=None, **extra_fields):
+        user = self._new_user(first_name, last_name, email, **extra_fields)
+
         user_exists = self.model.objects.filter(email=email).exists()
 
         if user_exists:
             raise ValueError("User with given email already exists")
 
-        email = self.normalize_email(email)
-        user = self.model(
-            first_name=first_name, last_name=last_name, email=email, **extra_fields
-        )
         user.set_password(password)
         user.save()
 
         return user
 
+    async def acreate_user(
+        self, first_name, last_name, email, password=None, **extra_fields
+    ):
+        user = self._new_user(first_name, last_name, email, **extra_fields)
+
+        if await self.model.objects.filter(email=email).aexists():
+            raise ValueError("User with given email already exists")
+
+        await user.aset_password(password)
+        await user.asave()
+
+        return user
+
     def create_superuser(
         self, first_name, last_name, email, password=None, **extra_fields
     ):
@@ -43,3 +71,387 @@ class AccountManager(BaseUserManager):
         user.save()
 
         return user
+
+    ACCOUNT_EXISTS_CACHE_KEY = "accounts:account_exists"
+    SUPERUSER_EXISTS_CACHE_KEY = "accounts:superuser_exists"
+
+    def _cached_exists(self, key, queryset):
+        exists = cache.get(key)
+        if exists is None:
+            exists = queryset.exists()
+            cache.set(key, exists, settings.BOOTSTRAP_CACHE_TIMEOUT)
+        return exists
+
+    async def _acached_exists(self, key, queryset):
+        exists = await cache.aget(key)
+        if exists is None:
+            exists = await queryset.aexists()
+            await cache.aset(key, exists, settings.BOOTSTRAP_CACHE_TIMEOUT)
+        return exists
+
+    def account_exists(self):
+        """
+        Whether any account exists, served from the cache when possible.
+        """
+        return self._cached_exists(self.ACCOUNT_EXISTS_CACHE_KEY, self.all())
+
+    async def aaccount_exists(self):
+        return await self._acached_exists(self.ACCOUNT_EXISTS_CACHE_KEY, self.all())
+
+    def superuser_exists(self):
+        """
+        Whether a superuser exists.
+
+        It gates the creation of the first superuser, so only a positive
+        answer is served from the cache: a cached "no" may be stale, e.g.
+        after `is_superuser` was set by an update that sends no signal.
+        """
+        if cache.get(self.SUPERUSER_EXISTS_CACHE_KEY):
+            return True
+
+        exists = self.filter(is_superuser=True).exists()
+        if exists:
+            cache.set(
+                self.SUPERUSER_EXISTS_CACHE_KEY, True, settings.BOOTSTRAP_CACHE_TIMEOUT
+            )
+        return exists
+
+    def account_saved(self, account, created, update_fields=None):
+        """
+        Keep the cached existence flags in line with a saved account.
+
+        Flags are cleared straight away and only set again once the
+        transaction commits, so a rolled back account is never reported.
+        """
+        if created:
+            self._reset_flag(self.ACCOUNT_EXISTS_CACHE_KEY, True)
+
+        if account.is_superuser:
+            self._reset_flag(self.SUPERUSER_EXISTS_CACHE_KEY, True)
+        elif update_fields is None or "is_superuser" in update_fields:
+            # The account may have just lost its superuser status
+            self._reset_flag(self.SUPERUSER_EXISTS_CACHE_KEY, None)
+
+    def accounts_imported(self):
+        """
+        Keep the cached existence flags in line with accounts inserted in
+        bulk, which send no post_save.
+        """
+        self._reset_flag(self.ACCOUNT_EXISTS_CACHE_KEY, True)
+
+    def account_deleted(self, account):
+        self._reset_flag(self.ACCOUNT_EXISTS_CACHE_KEY, None)
+        self._reset_flag(self.SUPERUSER_EXISTS_CACHE_KEY, None)
+
+    def _reset_flag(self, key, value):
+        cache.delete(key)
+
+        if value is None:
+            transaction.on_commit(lambda: cache.delete(key))
+        else:
+            transaction.on_commit(
+                lambda: cache.set(key, value, settings.BOOTSTRAP_CACHE_TIMEOUT)
+            )
+
+    LOGIN_SEQUENCE_CACHE_KEY = "accounts:logins:seq"
+    LOGIN_FLUSHED_CACHE_KEY = "accounts:logins:flushed"
+    LOGIN_FLUSH_LOCK_CACHE_KEY = "accounts:logins:lock"
+    LOGIN_HORIZON_CACHE_KEY = "accounts:logins:horizon"
+    # Seconds a taken sequence number may go without its login being stored
+    # before a flush gives up on it.
+    LOGIN_STORE_GRACE = 10
+
+    def record_login(self, user, when=None):
+        """
+        Buffer a login of `user` in the shared cache instead of updating its
+        row; `flush_logins` writes the buffered logins to `last_login`.
+
+        Every login takes the next number of a shared sequence (an atomic
+        `cache.incr`) and is stored under it, so logins from all processes
+        end up in one buffer without any read-modify-write.
+        """
+        when = when or timezone.now()
+        timeout = settings.LOGIN_BUFFER_TIMEOUT
+
+        cache.add(self.LOGIN_SEQUENCE_CACHE_KEY, 0, None)
+        seq = cache.incr(self.LOGIN_SEQUENCE_CACHE_KEY)
+        cache.set(f"accounts:logins:{seq}", (user.pk, when), timeout)
+
+    def flush_logins(self, batch_size=None):
+        """
+        Write the buffered logins to `last_login`, `batch_size` rows per
+        statement, keeping only the latest login of each account.
+
+        A login is stored just after its sequence number is taken, so a
+        missing number may belong to a login on its way. The flush stops at
+        the first one, unless the number was already taken at a previous
+        flush at least `LOGIN_STORE_GRACE` seconds ago: its login expired or
+        its process died before storing it.
+
+        Returns the number of updated accounts, or None if another flush is
+        running.
+        """
+        batch_size = batch_size or settings.LOGIN_BUFFER_BATCH_SIZE
+        if not cache.add(self.LOGIN_FLUSH_LOCK_CACHE_KEY, 1, 300):
+            return None
+
+        try:
+            now = time.time()
+            last = cache.get(self.LOGIN_SEQUENCE_CACHE_KEY, 0)
+            flushed = cache.get(self.LOGIN_FLUSHED_CACHE_KEY, 0)
+            horizon = cache.get(self.LOGIN_HORIZON_CACHE_KEY)
+            if last < flushed or (horizon and last < horizon[0]):
+                # The sequence was evicted and restarted.
+                flushed = 0
+                horizon = None
+
+            # Numbers up to `abandoned` were taken long enough ago.
+            abandoned = 0
+            if horizon is None or now - horizon[1] >= self.LOGIN_STORE_GRACE:
+                abandoned = horizon[0] if horizon else 0
+                cache.set(self.LOGIN_HORIZON_CACHE_KEY, (last, now), None)
+
+            updated = 0
+            start = flushed + 1
+            while start <= last:
+                end = min(start + batch_size, last + 1)
+                keys = [f"accounts:logins:{seq}" for seq in range(start, end)]
+                buffered = cache.get_many(keys)
+                logins = {}
+                for seq, key in zip(range(start, end), keys):
+                    if key not in buffered:
+                        if seq > abandoned:
+                            end = seq
+                            break
+                        continue
+                    user_id, when = buffered[key]
+                    if user_id not in logins or logins[user_id] < when:
+                        logins[user_id] = when
+
+                updated += self._update_last_logins(logins)
+                cache.set(self.LOGIN_FLUSHED_CACHE_KEY, end - 1, None)
+                cache.delete_many(keys[: end - start])
+
+                if end - start < len(keys):
+                    # Stopped at a login that may not be stored yet.
+                    break
+                start = end
+
+            return updated
+        finally:
+            cache.delete(self.LOGIN_FLUSH_LOCK_CACHE_KEY)
+
+    def _update_last_logins(self, logins):
+        if not logins:
+            return 0
+
+        if connection.vendor != "postgresql":
+            current = dict(self.filter(pk__in=logins).values_list("pk", "last_login"))
+            accounts = [
+                self.model(pk=user_id, last_login=when)
+                for user_id, when in logins.items()
+                if user_id in current
+                and (current[user_id] is None or current[user_id] < when)
+            ]
+            return self.bulk_update(accounts, ["last_login"])
+
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        values = ", ".join(["(%s, %s::timestamptz)"] * len(logins))
+        params = [param for login in logins.items() for param in login]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} AS account SET last_login = login.last_login "
+                f"FROM (VALUES {values}) AS login(id, last_login) "
+                "WHERE account.id = login.id "
+                "AND (account.last_login IS NULL "
+                "OR account.last_login < login.last_login)",
+                params,
+            )
+            return cursor.rowcount
+
+
+class OutboundEmailManager(models.Manager):
+    def enqueue(
+        self,
+        to_email,
+        subject,
+        body="",
+        html_body="",
+        from_email=None,
+        template_text="",
+        template_html="",
+        context=None,
+    ):
+        """
+        Queue an email, either with rendered bodies or with the templates
+        and JSON-serializable context the worker renders them from.
+        """
+        return self.create(
+            to_email=to_email,
+            from_email=from_email or settings.EMAIL_FROM,
+            subject=subject,
+            body=body,
+            html_body=html_body,
+            template_text=template_text,
+            template_html=template_html,
+            context=context or {},
+        )
+
+    def claimable(self, lock_timeout):
+        """
+        Messages that are due for delivery.
+
+        Messages stuck in the sending state for longer than `lock_timeout`
+        belong to a worker that died mid-send and are handed out again. Should
+        that worker still be alive, its claim no longer matches and it can't
+        record the outcome, see `OutboundEmail.mark_sent`.
+        """
+        now = timezone.now()
+        return self.filter(
+            Q(status=self.model.Status.PENDING, next_attempt_at__lte=now)
+            | Q(status=self.model.Status.SENDING, locked_at__lte=now - lock_timeout)
+        )
+
+    def claim_batch(self, batch_size, lock_timeout):
+        """
+        Lock up to `batch_size` due messages for the calling worker.
+
+        Rows locked by concurrent workers are skipped where the database
+        supports it, and the claiming update re-checks the due condition so
+        that two workers can never claim the same message.
+        """
+        token = uuid.uuid4().hex
+
+        with transaction.atomic():
+            ids = list(
+                self.claimable(lock_timeout)
+                .select_for_update(skip_locked=True)
+                .order_by("next_attempt_at", "pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not ids:
+                return []
+
+            self.claimable(lock_timeout).filter(pk__in=ids).update(
+                status=self.model.Status.SENDING,
+                locked_at=timezone.now(),
+                locked_by=token,
+            )
+
+        return list(self.filter(locked_by=token).order_by("next_attempt_at", "pk"))
+
+
+class BlacklistedTokenManager(models.Manager):
+    @staticmethod
+    def digest(token):
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def blacklist(self, token, expires_at):
+        self.bulk_create(
+            [self.model(digest=self.digest(token), expires_at=expires_at)],
+            ignore_conflicts=True,
+        )
+
+    async def ablacklist(self, token, expires_at):
+        await self.abulk_create(
+            [self.model(digest=self.digest(token), expires_at=expires_at)],
+            ignore_conflicts=True,
+        )
+
+    def is_blacklisted(self, token):
+        return self.filter(digest=self.digest(token)).exists()
+
+    async def ais_blacklisted(self, token):
+        return await self.filter(digest=self.digest(token)).aexists()
+
+    def delete_expired(self, chunk_size=1000):
+        """
+        Delete blacklist entries whose token has expired, `chunk_size` rows
+        per statement so the table is never locked for long.
+
+        Returns the number of deleted entries.
+        """
+        deleted = 0
+        while True:
+            ids = list(
+                self.filter(expires_at__lte=timezone.now()).values_list(
+                    "pk", flat=True
+                )[:chunk_size]
+            )
+            if not ids:
+                return deleted
+            count, _ = self.filter(pk__in=ids).delete()
+            deleted += count
+
+
+class RefreshTokenFamilyManager(models.Manager):
+    def start(self, user):
+        """
+        Start the family of refresh tokens of a new login session.
+        """
+        now = timezone.now()
+        return self.create(
+            user=user,
+            last_used_at=now,
+            expires_at=now + settings.SIMPLE_JWT["REFRESH_TOKEN_LIFETIME"],
+        )
+
+    def active(self):
+        return self.filter(revoked_at__isnull=True, expires_at__gt=timezone.now())
+
+    def is_current(self, family_id, generation):
+        return self.active().filter(pk=family_id, generation=generation).exists()
+
+    def rotate(self, family_id, generation):
+        """
+        Advance the family to its next generation, in a single conditional
+        UPDATE that only matches the current generation of an active family.
+
+        A stale generation means a refresh token was used twice, so the whole
+        family is revoked. Returns the new generation, or None if the token
+        was rejected.
+        """
+        now = timezone.now()
+        rotated = (
+            self.active()
+            .filter(pk=family_id, generation=generation)
+            .update(
+                generation=F("generation") + 1,
+                last_used_at=now,
+                expires_at=now + settings.SIMPLE_JWT["REFRESH_TOKEN_LIFETIME"],
+            )
+        )
+        if rotated:
+            return generation + 1
+
+        self.revoke(family_id)
+        return None
+
+    def revoke(self, family_id):
+        return self.filter(pk=family_id, revoked_at__isnull=True).update(
+            revoked_at=timezone.now()
+        )
+
+    def delete_expired(self, chunk_size=1000):
+        """
+        Delete expired and revoked families, `chunk_size` rows per statement
+        so the table is never locked for long.
+
+        Revoked families are kept until the access tokens issued for them
+        have expired, so the revocation still reaches every process.
+
+        Returns the number of deleted families.
+        """
+        deleted = 0
+        while True:
+            now = timezone.now()
+            revoked_before = now - settings.SIMPLE_JWT["ACCESS_TOKEN_LIFETIME"]
+            ids = list(
+                self.filter(
+                    Q(expires_at__lte=now) | Q(revoked_at__lte=revoked_before)
+                ).values_list("pk", flat=True)[:chunk_size]
+            )
+            if not ids:
+                return deleted
+            count, _ = self.filter(pk__in=ids).delete()
+            deleted += count
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:30
+
+import datetime
+import hashlib
+
+import jwt
+from django.conf import settings
+from django.db import migrations, models
+
+
+def hash_tokens(apps, schema_editor):
+    BlacklistedToken = apps.get_model("accounts", "BlacklistedToken")
+    seen = set()
+
+    for blacklisted in BlacklistedToken.objects.all().iterator():
+        digest = hashlib.sha256(blacklisted.token.encode()).hexdigest()
+        if digest in seen:
+            blacklisted.delete()
+            continue
+        seen.add(digest)
+
+        try:
+            exp = jwt.decode(
+                blacklisted.token, options={"verify_signature": False}
+            ).get("exp")
+        except jwt.InvalidTokenError:
+            exp = None
+
+        if exp:
+            expires_at = datetime.datetime.fromtimestamp(exp, tz=datetime.timezone.utc)
+        else:
+            expires_at = blacklisted.blacklisted_at + settings.EMAIL_VERIFICATION_EXPIRY
+
+        blacklisted.digest = digest
+        blacklisted.expires_at = expires_at
+        blacklisted.save(update_fields=["digest", "expires_at"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blacklistedtoken',
+            name='digest',
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='blacklistedtoken',
+            name='expires_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(hash_tokens, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='blacklistedtoken',
+            name='token',
+        ),
+        migrations.AlterField(
+            model_name='blacklistedtoken',
+            name='digest',
+            field=models.CharField(max_length=64, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='blacklistedtoken',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:05
+
+from django.db import migrations
+
+TRIGRAM_INDEXES = {
+    "accounts_account_email_trgm_idx": "email",
+    "accounts_account_first_name_trgm_idx": "first_name",
+    "accounts_account_last_name_trgm_idx": "last_name",
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # Trigram indexes only exist on PostgreSQL, other databases keep
+    # searching with plain scans. They are built concurrently, so writes to
+    # the accounts table aren't blocked for the length of the build.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON "accounts_account" '
+            f'USING gin ((UPPER("{column}"::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0010_hash_blacklisted_tokens'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:30
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+from cfehome.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # The indexes are built concurrently on PostgreSQL, which can't run inside
+    # a transaction.
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0011_account_trigram_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='account',
+            index=models.Index(fields=['-date_joined', 'id'], name='accounts_date_joined_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='account',
+            index=models.Index(fields=['first_name', 'id'], name='accounts_first_name_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='account',
+            index=models.Index(fields=['last_name', 'id'], name='accounts_last_name_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='account',
+            index=models.Index(django.db.models.functions.text.Upper('email'), name='accounts_email_upper_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='account',
+            index=models.Index(condition=models.Q(('is_superuser', True)), fields=['id'], name='accounts_superuser_idx'),
+        ),
+    ]
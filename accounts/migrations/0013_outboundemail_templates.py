@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:34
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_account_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboundemail',
+            name='context',
+            field=models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Template Context'),
+        ),
+        migrations.AddField(
+            model_name='outboundemail',
+            name='template_html',
+            field=models.CharField(blank=True, max_length=255, verbose_name='HTML Template'),
+        ),
+        migrations.AddField(
+            model_name='outboundemail',
+            name='template_text',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Plain Text Template'),
+        ),
+        migrations.AlterField(
+            model_name='outboundemail',
+            name='body',
+            field=models.TextField(blank=True, verbose_name='Plain Text Body'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0014_refreshtokenfamily'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='refreshtokenfamily',
+            name='revoked_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
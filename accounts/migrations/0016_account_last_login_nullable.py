@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0015_refreshtokenfamily_revoked_at_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='account',
+            name='last_login',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Last Login'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:20
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0016_account_last_login_nullable'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='version',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, verbose_name='Version'),
+        ),
+    ]
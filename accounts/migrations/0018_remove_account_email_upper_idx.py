@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:43
+
+from django.db import migrations
+
+from cfehome.operations import RemoveIndexConcurrently
+
+
+class Migration(migrations.Migration):
+    # DROP INDEX CONCURRENTLY can't run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0017_account_version'),
+    ]
+
+    operations = [
+        RemoveIndexConcurrently(
+            model_name='account',
+            name='accounts_email_upper_idx',
+        ),
+    ]
@@ -1,13 +1,23 @@
 from django.conf import settings
 import jwt
 from django.db import models
+from django.core.mail import EmailMultiAlternatives
+from django.core.serializers.json import DjangoJSONEncoder
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.utils.translation import gettext_lazy as _
 from django_rest_passwordreset.tokens import get_token_generator
 from django.utils import timezone
 import datetime
+import uuid
 
-from .managers import AccountManager
+from cfehome import hashing
+
+from .managers import (
+    AccountManager,
+    BlacklistedTokenManager,
+    OutboundEmailManager,
+    RefreshTokenFamilyManager,
+)
 
 
 TOKEN_GENERATOR_CLASS = get_token_generator()
@@ -21,13 +31,73 @@ class Account(AbstractBaseUser, PermissionsMixin):
     is_staff = models.BooleanField(_("Staff Status"), default=False)
     is_active = models.BooleanField(_("Active Status"), default=True)
     date_joined = models.DateTimeField(_("Date Joined"), auto_now_add=True)
-    last_login = models.DateTimeField(_("Last Login"), auto_now=True)
+    last_login = models.DateTimeField(_("Last Login"), blank=True, null=True)
+    # Replaced on every save, the ETag of the account's representation.
+    version = models.UUIDField(_("Version"), default=uuid.uuid4, editable=False)
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["first_name", "last_name"]
 
     objects = AccountManager()
 
+    class Meta:
+        indexes = [
+            # ListAccountsView's default ordering and keyset pagination
+            models.Index(
+                fields=["-date_joined", "id"], name="accounts_date_joined_id_idx"
+            ),
+            # Keyset pagination with ?ordering=first_name / last_name
+            models.Index(fields=["first_name", "id"], name="accounts_first_name_id_idx"),
+            models.Index(fields=["last_name", "id"], name="accounts_last_name_id_idx"),
+            # Superuser existence checks of the admin bootstrap views
+            models.Index(
+                fields=["id"],
+                condition=models.Q(is_superuser=True),
+                name="accounts_superuser_idx",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if (
+            update_fields is None
+            and not self._state.adding
+            and not kwargs.get("force_insert")
+        ):
+            # last_login is written by flush_login_buffer, a full save (maybe
+            # of a stale copy) mustn't move it back.
+            update_fields = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "last_login"
+            ]
+        if update_fields is not None:
+            if not update_fields:
+                return super().save(*args, **kwargs)
+            kwargs["update_fields"] = {*update_fields, "version"}
+
+        # Random rather than a counter, so a save from a stale copy (e.g. of
+        # the user cache) can't hand out a version that was already used.
+        self.version = uuid.uuid4()
+        super().save(*args, **kwargs)
+
+    def set_password(self, raw_password):
+        self.password = hashing.make_password(raw_password)
+        self._password = raw_password
+
+    async def aset_password(self, raw_password):
+        self.password = await hashing.amake_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        def setter(raw_password):
+            self.set_password(raw_password)
+            # Password hash upgrades shouldn't be considered password changes.
+            self._password = None
+            self.save(update_fields=["password"])
+
+        return hashing.check_password(raw_password, self.password, setter)
+
     def get_full_name(self):
         return f"{self.first_name} {self.last_name}"
 
@@ -39,8 +109,156 @@ class Account(AbstractBaseUser, PermissionsMixin):
 
 
 class BlacklistedToken(models.Model):
-    token = models.CharField(max_length=500)
+    digest = models.CharField(max_length=64, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
     blacklisted_at = models.DateTimeField(auto_now_add=True)
 
+    objects = BlacklistedTokenManager()
+
+    def __str__(self):
+        return self.digest
+
+
+class RefreshTokenFamily(models.Model):
+    """
+    One login session. Every refresh token issued for the session carries
+    the family id and its generation, and only the current generation can be
+    exchanged for new tokens.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        Account, on_delete=models.CASCADE, related_name="refresh_token_families"
+    )
+    generation = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField()
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    objects = RefreshTokenFamilyManager()
+
+    class Meta:
+        verbose_name_plural = "refresh token families"
+
+    def __str__(self):
+        return str(self.id)
+
+
+class OutboundEmail(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "pending", _("Pending")
+        SENDING = "sending", _("Sending")
+        SENT = "sent", _("Sent")
+        FAILED = "failed", _("Failed")
+
+    to_email = models.EmailField(_("Recipient"))
+    from_email = models.CharField(_("Sender"), max_length=255)
+    subject = models.CharField(_("Subject"), max_length=255)
+    body = models.TextField(_("Plain Text Body"), blank=True)
+    html_body = models.TextField(_("HTML Body"), blank=True)
+    template_text = models.CharField(_("Plain Text Template"), max_length=255, blank=True)
+    template_html = models.CharField(_("HTML Template"), max_length=255, blank=True)
+    context = models.JSONField(
+        _("Template Context"), default=dict, blank=True, encoder=DjangoJSONEncoder
+    )
+    status = models.CharField(
+        _("Status"), max_length=10, choices=Status.choices, default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(_("Attempts"), default=0)
+    last_error = models.TextField(_("Last Error"), blank=True)
+    next_attempt_at = models.DateTimeField(_("Next Attempt At"), default=timezone.now)
+    locked_at = models.DateTimeField(_("Locked At"), null=True, blank=True)
+    locked_by = models.CharField(_("Locked By"), max_length=32, blank=True)
+    created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
+    sent_at = models.DateTimeField(_("Sent At"), null=True, blank=True)
+
+    objects = OutboundEmailManager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"],
+                name="accounts_outboundemail_due_idx",
+            ),
+        ]
+
+    def to_message(self, connection=None):
+        """
+        Build the message to send. Bodies must already be rendered, see
+        `cfehome.mail.render_email` for messages queued with templates.
+        """
+        msg = EmailMultiAlternatives(
+            self.subject,
+            self.body,
+            self.from_email,
+            [self.to_email],
+            connection=connection,
+        )
+        if self.html_body:
+            msg.attach_alternative(self.html_body, "text/html")
+        return msg
+
+    def _finish(self, **fields):
+        """
+        Apply `fields` to the message, provided it is still claimed by this
+        worker: a worker that was too slow may have seen its claim expire
+        and the message handed to another one.
+
+        Returns whether the message was updated.
+        """
+        claimed = type(self).objects.filter(
+            pk=self.pk, status=self.Status.SENDING, locked_by=self.locked_by
+        )
+        if not claimed.update(**fields):
+            return False
+
+        for name, value in fields.items():
+            setattr(self, name, value)
+        return True
+
+    def mark_sent(self):
+        """
+        Record a successful delivery. The context, which may hold live links
+        (password reset, email verification), isn't needed anymore and is
+        cleared.
+        """
+        return self._finish(
+            status=self.Status.SENT,
+            sent_at=timezone.now(),
+            attempts=self.attempts + 1,
+            last_error="",
+            context={},
+            locked_at=None,
+            locked_by="",
+        )
+
+    def mark_failed(self, error, max_attempts, retry_backoff):
+        """
+        Record a failed delivery attempt.
+
+        The message is retried with exponential backoff until `max_attempts`
+        is reached, after which it is left in the failed state without its
+        context.
+        """
+        attempts = self.attempts + 1
+        fields = {
+            "attempts": attempts,
+            "last_error": str(error),
+            "locked_at": None,
+            "locked_by": "",
+        }
+
+        if attempts >= max_attempts:
+            fields.update(status=self.Status.FAILED, context={})
+        else:
+            fields.update(
+                status=self.Status.PENDING,
+                next_attempt_at=timezone.now()
+                + retry_backoff * (2 ** (attempts - 1)),
+            )
+
+        return self._finish(**fields)
+
     def __str__(self):
-        return self.token
+        return f"{self.subject} -> {self.to_email}"
@@ -1,10 +1,23 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission, Group
 from django.core import exceptions
 from django.contrib.auth.password_validation import validate_password
+from django.db import router, transaction
+from django.db.models.signals import m2m_changed
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.settings import api_settings
 
+from cfehome.revocation import revocation_filter
 from cfehome.serializers import MessageSerializer
+from cfehome.tokens import (
+    FAMILY_CLAIM,
+    GENERATION_CLAIM,
+    RefreshToken,
+    UntypedToken,
+)
+from .models import RefreshTokenFamily
 
 User = get_user_model()
 
@@ -13,6 +26,54 @@ class UserExistsMessageSerializer(MessageSerializer):
     exists = serializers.BooleanField()
 
 
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        # Buffered instead of SIMPLE_JWT's UPDATE_LAST_LOGIN, see
+        # AccountManager.record_login.
+        User.objects.record_login(self.user)
+        return data
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            refresh.rotate()
+        else:
+            refresh.check_family()
+
+        data = {"access": str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            data["refresh"] = str(refresh)
+
+        return data
+
+
+class TokenVerifySerializer(jwt_serializers.TokenVerifySerializer):
+    def validate(self, attrs):
+        token = UntypedToken(attrs["token"])
+
+        family = token.get(FAMILY_CLAIM)
+
+        if token.get(api_settings.TOKEN_TYPE_CLAIM) == RefreshToken.token_type:
+            revoked = not RefreshTokenFamily.objects.is_current(
+                family, token.get(GENERATION_CLAIM)
+            )
+        else:
+            revoked = family is not None and revocation_filter.is_revoked(family)
+
+        if revoked:
+            raise serializers.ValidationError("Token is blacklisted")
+
+        return {}
+
+
 class TokenObtainPairResponseSerializer(serializers.Serializer):
     access = serializers.CharField()
     refresh = serializers.CharField()
@@ -106,6 +167,19 @@ class AccountSerializer(serializers.ModelSerializer):
         )
 
 
+class ImportErrorSerializer(serializers.Serializer):
+    line = serializers.IntegerField()
+    message = serializers.CharField()
+
+
+class ImportResultSerializer(serializers.Serializer):
+    rows = serializers.IntegerField()
+    created = serializers.IntegerField()
+    duplicates = serializers.IntegerField()
+    error_count = serializers.IntegerField()
+    errors = ImportErrorSerializer(many=True)
+
+
 class GroupSerializer(serializers.ModelSerializer):
     class Meta:
         model = Group
@@ -116,6 +190,129 @@ class GroupSerializer(serializers.ModelSerializer):
         )
 
 
+class BulkRelationSerializer(serializers.Serializer):
+    """
+    Adds and removes many rows of a many-to-many relation of a group at
+    once, as one INSERT ... ON CONFLICT DO NOTHING and one DELETE ... IN
+    against the through table.
+
+    A single m2m_changed is sent per batch, so cached permissions are
+    invalidated once instead of once per row.
+    """
+
+    add = serializers.ListField(
+        child=serializers.IntegerField(),
+        default=list,
+        max_length=settings.BULK_ASSIGNMENT_MAX_ITEMS,
+        write_only=True,
+    )
+    remove = serializers.ListField(
+        child=serializers.IntegerField(),
+        default=list,
+        max_length=settings.BULK_ASSIGNMENT_MAX_ITEMS,
+        write_only=True,
+    )
+    added = serializers.IntegerField(read_only=True)
+    removed = serializers.IntegerField(read_only=True)
+
+    # The relation, as the field on the group's side of the through table,
+    # the field on the other side, and whether the group is its reverse side.
+    through = None
+    group_field = None
+    related_field = None
+    related_model = None
+    reverse = None
+
+    def validate(self, data):
+        errors = {}
+        ids = set(data["add"]) | set(data["remove"])
+        found = set(
+            self.related_model.objects.filter(pk__in=ids).values_list("pk", flat=True)
+        )
+
+        for field in ("add", "remove"):
+            missing = sorted(set(data[field]) - found)
+            if missing:
+                errors[field] = [f"Unknown ids: {', '.join(map(str, missing))}"]
+
+        if set(data["add"]) & set(data["remove"]):
+            errors.setdefault("remove", []).append(
+                "The same id can't be added and removed."
+            )
+
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        return data
+
+    def update(self, instance, validated_data):
+        with transaction.atomic():
+            instance.added = self.add_items(instance, set(validated_data["add"]))
+            instance.removed = self.remove_items(
+                instance, set(validated_data["remove"])
+            )
+        return instance
+
+    def send_changed(self, group, action, ids):
+        m2m_changed.send(
+            sender=self.through,
+            instance=group,
+            action=action,
+            reverse=self.reverse,
+            model=self.related_model,
+            pk_set=ids,
+            using=router.db_for_write(self.through, instance=group),
+        )
+
+    def add_items(self, group, ids):
+        rows = self.through.objects.filter(**{self.group_field: group.pk})
+        ids = ids - set(
+            rows.filter(**{f"{self.related_field}__in": ids}).values_list(
+                self.related_field, flat=True
+            )
+        )
+        if not ids:
+            return 0
+
+        self.send_changed(group, "pre_add", ids)
+        self.through.objects.bulk_create(
+            [
+                self.through(**{self.group_field: group.pk, self.related_field: pk})
+                for pk in ids
+            ],
+            ignore_conflicts=True,
+        )
+        self.send_changed(group, "post_add", ids)
+        return len(ids)
+
+    def remove_items(self, group, ids):
+        if not ids:
+            return 0
+
+        self.send_changed(group, "pre_remove", ids)
+        removed, _ = self.through.objects.filter(
+            **{self.group_field: group.pk, f"{self.related_field}__in": ids}
+        ).delete()
+        self.send_changed(group, "post_remove", ids)
+        return removed
+
+
+class GroupMembersSerializer(BulkRelationSerializer):
+    through = User.groups.through
+    group_field = "group_id"
+    related_field = "account_id"
+    related_model = User
+    reverse = True
+
+
+class GroupPermissionsSerializer(BulkRelationSerializer):
+    through = Group.permissions.through
+    group_field = "group_id"
+    related_field = "permission_id"
+    related_model = Permission
+    reverse = False
+
+
 class PermissionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Permission
@@ -1,14 +1,44 @@
 from django.conf import settings
+from django.contrib.auth.models import Group, Permission
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_migrate,
+    post_save,
+)
 from django.dispatch import receiver
 from django_rest_passwordreset.signals import reset_password_token_created
 from django.dispatch import Signal
 
+from cfehome.authentication import user_cache
+from cfehome.backends import (
+    invalidate_all_permissions,
+    invalidate_group_permissions,
+    invalidate_user_permissions,
+)
+from cfehome.pagination import invalidate_counts
 from cfehome.utils import Util
+from cfehome.views import invalidate_responses
+from .models import Account
 
 
 send_verification_mail = Signal()
 
 
+def email_context_user(user):
+    """
+    The fields of `user` available to email templates. Emails are rendered
+    by the queue worker, so the context has to be JSON-serializable.
+    """
+
+    return {
+        "id": user.id,
+        "email": user.email,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+    }
+
+
 @receiver(reset_password_token_created)
 def password_reset_token_created(
     sender, instance, reset_password_token, *args, **kwargs
@@ -26,7 +56,7 @@ def password_reset_token_created(
 
     # Send an email to the user
     context = {
-        "user": reset_password_token.user,
+        "user": email_context_user(reset_password_token.user),
         "reset_password_url": f"{settings.FRONTEND_URL}/auth/reset-password/{reset_password_token.key}",
     }
 
@@ -59,7 +89,8 @@ def send_email_verification_signal(sender, instance, user, *args, **kwargs):
 
     # Send an email to the user
     context = {
-        "current_user": user,
+        "user": email_context_user(user),
+        "current_user": email_context_user(user),
         "email_verification_url": f"{settings.FRONTEND_URL}/auth/verify-email/{token}",
     }
 
@@ -72,3 +103,125 @@ def send_email_verification_signal(sender, instance, user, *args, **kwargs):
         },
         context,
     )
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+def invalidate_cached_user(sender, instance, *args, **kwargs):
+    """
+    Drops the cached copy of an account used by JWT authentication whenever
+    the account (including its password) is changed or deleted.
+    """
+
+    user_cache.invalidate(instance.pk)
+    invalidate_user_permissions([instance.pk])
+
+
+@receiver(m2m_changed, sender=Account.groups.through)
+@receiver(m2m_changed, sender=Account.user_permissions.through)
+def invalidate_account_permissions(
+    sender, instance, action, reverse, pk_set, *args, **kwargs
+):
+    """
+    Invalidates the cached permissions of accounts whose groups or direct
+    permissions changed, from either side of the relation.
+    """
+
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        invalidate_user_permissions([instance.pk])
+    elif pk_set is not None:
+        invalidate_user_permissions(pk_set)
+    elif isinstance(instance, Group):
+        # Clearing a group's members doesn't report which accounts were
+        # affected, but all of them were cached against the group's stamp.
+        invalidate_group_permissions([instance.pk])
+    else:
+        invalidate_all_permissions()
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_group_permissions_on_change(
+    sender, instance, action, reverse, pk_set, *args, **kwargs
+):
+    """
+    Invalidates the cached permissions of every member of a group whose
+    permissions changed.
+    """
+
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    invalidate_responses([Group])
+
+    if not reverse:
+        invalidate_group_permissions([instance.pk])
+    elif pk_set is None:
+        invalidate_all_permissions()
+    else:
+        invalidate_group_permissions(pk_set)
+
+
+@receiver(post_delete, sender=Group)
+def invalidate_deleted_group_permissions(sender, instance, *args, **kwargs):
+    invalidate_group_permissions([instance.pk])
+
+
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def invalidate_changed_permission(sender, instance, *args, **kwargs):
+    # Superusers hold every permission, and deleting a permission also
+    # removes it from every group, without m2m_changed.
+    invalidate_all_permissions()
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def invalidate_cached_counts(sender, *args, **kwargs):
+    """
+    Drops the cached list counts of a model whenever one of its rows changes.
+    """
+
+    invalidate_counts(sender)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def invalidate_cached_responses(sender, *args, **kwargs):
+    # Deleting a permission also removes it from every group.
+    invalidate_responses([Group] if sender is Group else [Group, Permission])
+
+
+@receiver(post_migrate)
+def invalidate_caches_on_migrate(sender, *args, **kwargs):
+    """
+    Permissions are created on migrate with bulk inserts, which send no
+    post_save.
+    """
+
+    invalidate_counts(Permission)
+    invalidate_responses([Group, Permission])
+    invalidate_all_permissions()
+
+
+@receiver(post_save, sender=Account)
+def update_bootstrap_flags_on_save(sender, instance, created, update_fields, **kwargs):
+    """
+    Keeps the cached "account exists" and "superuser exists" flags used by
+    the admin bootstrap views up to date.
+    """
+
+    Account.objects.account_saved(instance, created, update_fields)
+
+
+@receiver(post_delete, sender=Account)
+def update_bootstrap_flags_on_delete(sender, instance, *args, **kwargs):
+    Account.objects.account_deleted(instance)
@@ -0,0 +1,231 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.core.cache import cache
+from io import StringIO
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import (
+    Account,
+    BlacklistedToken,
+    OutboundEmail,
+    RefreshTokenFamily,
+)
+from cfehome.utils import Util
+
+
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    EMAIL_QUEUE_MAX_ATTEMPTS=2,
+    EMAIL_QUEUE_RETRY_BACKOFF=timedelta(seconds=0),
+)
+class SendQueuedEmailsCommandTest(TestCase):
+    def setUp(self):
+        for i in range(3):
+            OutboundEmail.objects.enqueue(
+                f"user{i}@gmail.com", "Subject", "Body", html_body="<p>Body</p>"
+            )
+
+    def test_sends_queued_emails(self):
+        call_command("send_queued_emails", workers=1, batch_size=2)
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].alternatives, [("<p>Body</p>", "text/html")])
+        self.assertFalse(
+            OutboundEmail.objects.exclude(status=OutboundEmail.Status.SENT).exists()
+        )
+
+    def test_renders_templated_emails(self):
+        OutboundEmail.objects.all().delete()
+        Util.send_email(
+            "johndoe@gmail.com",
+            "Verify",
+            {
+                "html": "email/email_verification/email_verification_email.html",
+                "text": "email/email_verification/email_verification_email.txt",
+            },
+            {"user": {"first_name": "John"}, "email_verification_url": "https://x.y/z"},
+        )
+        queued = OutboundEmail.objects.get()
+        self.assertEqual(queued.body, "")
+
+        call_command("send_queued_emails", workers=1)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("John", mail.outbox[0].body)
+        self.assertIn("John", mail.outbox[0].alternatives[0][0])
+
+    def test_benchmark_rolls_back(self):
+        out = StringIO()
+
+        call_command("benchmark", "register", requests=2, warmup=0, stdout=out)
+
+        self.assertIn("p95", out.getvalue())
+        self.assertFalse(Account.objects.exists())
+
+    def test_benchmark_renderers(self):
+        out = StringIO()
+
+        call_command("benchmark_renderers", rows=10, repeat=1, stdout=out)
+
+        self.assertIn("orjson", out.getvalue())
+        self.assertNotIn("DIFFERENT", out.getvalue())
+
+    def test_benchmark_asgi_rolls_back(self):
+        out = StringIO()
+
+        call_command(
+            "benchmark",
+            "register",
+            requests=4,
+            warmup=0,
+            asgi=True,
+            concurrency=2,
+            memory=True,
+            stdout=out,
+        )
+
+        self.assertIn("heap/conn", out.getvalue())
+        self.assertFalse(Account.objects.exists())
+
+    def test_retries_and_fails_after_max_attempts(self):
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=ConnectionError("SMTP unavailable"),
+        ):
+            call_command("send_queued_emails", workers=1)
+
+        failed = OutboundEmail.objects.filter(status=OutboundEmail.Status.FAILED)
+        self.assertEqual(failed.count(), 3)
+        self.assertEqual(failed.first().attempts, 2)
+        self.assertEqual(failed.first().last_error, "SMTP unavailable")
+        self.assertEqual(len(mail.outbox), 0)
+
+
+class FlushExpiredVerificationTokensCommandTest(TestCase):
+    def test_flush_expired_tokens(self):
+        BlacklistedToken.objects.blacklist(
+            "expired.token.value", timezone.now() - timedelta(days=1)
+        )
+        BlacklistedToken.objects.blacklist(
+            "valid.token.value", timezone.now() + timedelta(days=1)
+        )
+        out = StringIO()
+
+        call_command("flush_expired_verification_tokens", stdout=out)
+
+        self.assertIn("Deleted 1 expired blacklisted token(s)", out.getvalue())
+        self.assertTrue(BlacklistedToken.objects.is_blacklisted("valid.token.value"))
+        self.assertFalse(
+            BlacklistedToken.objects.is_blacklisted("expired.token.value")
+        )
+
+
+class FlushExpiredRefreshTokensCommandTest(TestCase):
+    def test_flush_expired_refresh_tokens(self):
+        user = Account.objects.create_user(
+            first_name="John",
+            last_name="Doe",
+            email="johndoe@gmail.com",
+            password="NewPassword@2022",
+        )
+        expired = RefreshTokenFamily.objects.start(user)
+        RefreshTokenFamily.objects.filter(pk=expired.pk).update(
+            expires_at=timezone.now() - timedelta(days=1)
+        )
+        active = RefreshTokenFamily.objects.start(user)
+        out = StringIO()
+
+        call_command("flush_expired_refresh_tokens", stdout=out)
+
+        self.assertIn("Deleted 1 expired or revoked token session(s)", out.getvalue())
+        self.assertEqual(
+            list(RefreshTokenFamily.objects.values_list("pk", flat=True)), [active.pk]
+        )
+
+
+class FlushLoginBufferCommandTest(TestCase):
+    def test_flush_login_buffer(self):
+        cache.clear()
+        user = Account.objects.create_user(
+            first_name="John",
+            last_name="Doe",
+            email="johndoe@gmail.com",
+            password="NewPassword@2022",
+        )
+        Account.objects.record_login(user)
+        out = StringIO()
+
+        call_command("flush_login_buffer", stdout=out)
+
+        self.assertIn("Updated the last login of 1 account(s)", out.getvalue())
+        user.refresh_from_db()
+        self.assertIsNotNone(user.last_login)
+
+
+class BulkImportAccountsCommandTest(TestCase):
+    def test_bulk_import_accounts(self):
+        legacy_hash = make_password("NewPassword@2022", hasher="pbkdf2_sha256")
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+            f.write("email,first_name,last_name,password,password_hash\n")
+            f.write("jane@example.com,Jane,Doe,NewPassword@2022,\n")
+            f.write(f"mary@example.com,Mary,Doe,,{legacy_hash}\n")
+            f.write("john@example.com,John,,,\n")
+        self.addCleanup(os.remove, f.name)
+        out = StringIO()
+        err = StringIO()
+
+        call_command(
+            "bulk_import_accounts", f.name, chunk_size=1, stdout=out, stderr=err
+        )
+
+        self.assertIn("3 row(s)", out.getvalue())
+        self.assertIn("2 created, 0 duplicate(s), 1 error(s)", out.getvalue())
+        self.assertIn("Line 4: Missing last_name", err.getvalue())
+        self.assertTrue(
+            Account.objects.get(email="jane@example.com").check_password(
+                "NewPassword@2022"
+            )
+        )
+        self.assertEqual(
+            Account.objects.get(email="mary@example.com").password, legacy_hash
+        )
+
+        call_command("bulk_import_accounts", f.name, stdout=out, stderr=err)
+
+        self.assertIn("0 created, 2 duplicate(s)", out.getvalue())
+
+
+class GenerateSchemaCommandTest(TestCase):
+    def test_writes_schema(self):
+        with tempfile.TemporaryDirectory() as directory:
+            out = StringIO()
+            call_command("generate_schema", output_dir=directory, stdout=out)
+
+            self.assertEqual(
+                sorted(os.listdir(directory)),
+                [
+                    "openapi.json",
+                    "openapi.public.json",
+                    "openapi.public.yaml",
+                    "openapi.yaml",
+                ],
+            )
+            with open(os.path.join(directory, "openapi.json")) as f:
+                schema = json.load(f)
+            with open(os.path.join(directory, "openapi.public.json")) as f:
+                public_schema = json.load(f)
+
+        self.assertIn("/api/auth/me/", schema["paths"])
+        self.assertIn("/api/auth/users/", schema["paths"])
+        self.assertIn("/api/auth/me/", public_schema["paths"])
+        self.assertNotIn("/api/auth/users/", public_schema["paths"])
+        self.assertIn("openapi.yaml", out.getvalue())
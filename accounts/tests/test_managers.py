@@ -1,6 +1,16 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
 
-from accounts.models import Account
+from accounts.models import (
+    Account,
+    BlacklistedToken,
+    OutboundEmail,
+    RefreshTokenFamily,
+)
 
 
 class AccountManagerTest(TestCase):
@@ -101,3 +111,240 @@ class AccountManagerTest(TestCase):
                 email=self.email,
                 password="12345678",
             )
+
+
+class LoginBufferTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = Account.objects.create_user(
+            first_name="John",
+            last_name="Doe",
+            email="johndoe@gmail.com",
+            password="NewPassword@2022",
+        )
+
+    def test_save_does_not_touch_last_login(self):
+        self.user.first_name = "Jane"
+        self.user.save()
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.last_login)
+
+    def test_full_save_of_stale_copy_keeps_last_login(self):
+        stale = Account.objects.get(pk=self.user.pk)
+        Account.objects.record_login(self.user)
+        Account.objects.flush_logins()
+
+        stale.first_name = "Jane"
+        stale.save()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, "Jane")
+        self.assertIsNotNone(self.user.last_login)
+
+    def test_flush_keeps_latest_login(self):
+        now = timezone.now()
+        Account.objects.record_login(self.user, now - timedelta(minutes=1))
+        Account.objects.record_login(self.user, now)
+        Account.objects.record_login(self.user, now - timedelta(minutes=2))
+
+        self.assertEqual(Account.objects.flush_logins(batch_size=2), 1)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_login, now)
+
+        # Flushed logins are not written again, older ones never win.
+        self.assertEqual(Account.objects.flush_logins(), 0)
+        Account.objects.record_login(self.user, now - timedelta(hours=1))
+        Account.objects.flush_logins()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_login, now)
+
+    def test_flush_skips_running_flush(self):
+        Account.objects.record_login(self.user)
+        cache.set(Account.objects.LOGIN_FLUSH_LOCK_CACHE_KEY, 1)
+
+        self.assertIsNone(Account.objects.flush_logins())
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.last_login)
+
+
+class OutboundEmailManagerTest(TestCase):
+    def setUp(self):
+        self.email_manager = OutboundEmail.objects
+        self.lock_timeout = timedelta(minutes=10)
+
+    def enqueue(self):
+        return self.email_manager.enqueue(
+            "johndoe@gmail.com", "Subject", "Plain text body", html_body="<p>HTML</p>"
+        )
+
+    def test_enqueue(self):
+        email = self.enqueue()
+
+        self.assertEqual(email.status, OutboundEmail.Status.PENDING)
+        self.assertEqual(email.attempts, 0)
+        self.assertTrue(email.from_email)
+
+    def test_claim_batch(self):
+        for _ in range(3):
+            self.enqueue()
+
+        claimed = self.email_manager.claim_batch(2, self.lock_timeout)
+
+        self.assertEqual(len(claimed), 2)
+        for email in claimed:
+            self.assertEqual(email.status, OutboundEmail.Status.SENDING)
+            self.assertTrue(email.locked_by)
+
+        remaining = self.email_manager.claim_batch(2, self.lock_timeout)
+        self.assertEqual(len(remaining), 1)
+        self.assertEqual(self.email_manager.claim_batch(2, self.lock_timeout), [])
+
+    def test_claim_batch_skips_messages_not_due(self):
+        email = self.enqueue()
+        email.next_attempt_at = timezone.now() + timedelta(minutes=5)
+        email.save()
+
+        self.assertEqual(self.email_manager.claim_batch(10, self.lock_timeout), [])
+
+    def test_claim_batch_reclaims_stale_locks(self):
+        self.enqueue()
+        self.email_manager.claim_batch(10, self.lock_timeout)
+        self.email_manager.update(locked_at=timezone.now() - timedelta(minutes=11))
+
+        claimed = self.email_manager.claim_batch(10, self.lock_timeout)
+        self.assertEqual(len(claimed), 1)
+
+    def test_mark_sent_clears_context(self):
+        self.email_manager.enqueue(
+            "johndoe@gmail.com", "Subject", context={"url": "https://x.y/reset"}
+        )
+        (email,) = self.email_manager.claim_batch(10, self.lock_timeout)
+
+        self.assertTrue(email.mark_sent())
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.Status.SENT)
+        self.assertEqual(email.context, {})
+        self.assertEqual(email.attempts, 1)
+
+    def test_reclaimed_message_is_only_finished_by_its_new_worker(self):
+        self.enqueue()
+        (slow,) = self.email_manager.claim_batch(10, self.lock_timeout)
+        self.email_manager.update(locked_at=timezone.now() - timedelta(minutes=11))
+        (fast,) = self.email_manager.claim_batch(10, self.lock_timeout)
+
+        self.assertTrue(fast.mark_sent())
+        self.assertFalse(slow.mark_failed("Timeout", 5, timedelta(seconds=30)))
+
+        email = self.email_manager.get()
+        self.assertEqual(email.status, OutboundEmail.Status.SENT)
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual(email.last_error, "")
+
+
+class BlacklistedTokenManagerTest(TestCase):
+    def setUp(self):
+        self.token_manager = BlacklistedToken.objects
+        self.token = "header.payload.signature"
+
+    def test_blacklist(self):
+        self.token_manager.blacklist(self.token, timezone.now() + timedelta(days=1))
+
+        blacklisted = self.token_manager.get()
+        self.assertEqual(len(blacklisted.digest), 64)
+        self.assertNotEqual(blacklisted.digest, self.token)
+        self.assertTrue(self.token_manager.is_blacklisted(self.token))
+        self.assertFalse(self.token_manager.is_blacklisted("another.token.value"))
+
+    def test_blacklist_twice(self):
+        expires_at = timezone.now() + timedelta(days=1)
+        self.token_manager.blacklist(self.token, expires_at)
+        self.token_manager.blacklist(self.token, expires_at)
+
+        self.assertEqual(self.token_manager.count(), 1)
+
+    def test_delete_expired(self):
+        for i in range(5):
+            self.token_manager.blacklist(
+                f"expired.token.{i}", timezone.now() - timedelta(minutes=1)
+            )
+        self.token_manager.blacklist(self.token, timezone.now() + timedelta(days=1))
+
+        self.assertEqual(self.token_manager.delete_expired(chunk_size=2), 5)
+        self.assertTrue(self.token_manager.is_blacklisted(self.token))
+        self.assertEqual(self.token_manager.count(), 1)
+
+
+class RefreshTokenFamilyManagerTest(TestCase):
+    def setUp(self):
+        self.user = Account.objects.create_user(
+            first_name="John",
+            last_name="Doe",
+            email="johndoe@gmail.com",
+            password="NewPassword@2022",
+        )
+        self.family = RefreshTokenFamily.objects.start(self.user)
+
+    def test_rotate(self):
+        with self.assertNumQueries(1):
+            generation = RefreshTokenFamily.objects.rotate(self.family.pk, 0)
+
+        self.assertEqual(generation, 1)
+        self.assertTrue(RefreshTokenFamily.objects.is_current(self.family.pk, 1))
+        self.assertFalse(RefreshTokenFamily.objects.is_current(self.family.pk, 0))
+
+    def test_reuse_revokes_family(self):
+        RefreshTokenFamily.objects.rotate(self.family.pk, 0)
+
+        self.assertIsNone(RefreshTokenFamily.objects.rotate(self.family.pk, 0))
+
+        self.family.refresh_from_db()
+        self.assertIsNotNone(self.family.revoked_at)
+        self.assertIsNone(RefreshTokenFamily.objects.rotate(self.family.pk, 1))
+
+    def test_delete_expired(self):
+        RefreshTokenFamily.objects.filter(pk=self.family.pk).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        revoked = RefreshTokenFamily.objects.start(self.user)
+        RefreshTokenFamily.objects.filter(pk=revoked.pk).update(
+            revoked_at=timezone.now() - timedelta(hours=1)
+        )
+        recently_revoked = RefreshTokenFamily.objects.start(self.user)
+        RefreshTokenFamily.objects.revoke(recently_revoked.pk)
+        active = RefreshTokenFamily.objects.start(self.user)
+
+        self.assertEqual(RefreshTokenFamily.objects.delete_expired(chunk_size=1), 2)
+        self.assertEqual(
+            set(RefreshTokenFamily.objects.values_list("pk", flat=True)),
+            {recently_revoked.pk, active.pk},
+        )
+
+    def take_sequence_number(self):
+        # A login whose number is taken but that isn't stored yet
+        cache.add(Account.objects.LOGIN_SEQUENCE_CACHE_KEY, 0, None)
+        return cache.incr(Account.objects.LOGIN_SEQUENCE_CACHE_KEY)
+
+    def test_flush_waits_for_login_being_stored(self):
+        now = timezone.now()
+        seq = self.take_sequence_number()
+        Account.objects.record_login(self.user, now - timedelta(minutes=1))
+
+        self.assertEqual(Account.objects.flush_logins(), 0)
+
+        cache.set(f"accounts:logins:{seq}", (self.user.pk, now))
+        self.assertEqual(Account.objects.flush_logins(), 1)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_login, now)
+
+    @mock.patch("accounts.managers.time.time")
+    def test_flush_gives_up_on_login_never_stored(self, time):
+        time.return_value = 1000
+        self.take_sequence_number()
+        Account.objects.record_login(self.user)
+
+        self.assertEqual(Account.objects.flush_logins(), 0)
+
+        time.return_value = 1000 + Account.objects.LOGIN_STORE_GRACE
+        self.assertEqual(Account.objects.flush_logins(), 1)
+        self.assertEqual(Account.objects.flush_logins(), 0)
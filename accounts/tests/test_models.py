@@ -1,3 +1,4 @@
+from django.db import connection
 from django.test import TestCase
 
 from accounts.models import Account
@@ -27,3 +28,44 @@ class AccountModelTest(TestCase):
     def test_get_short_name(self):
         account = self.create_account()
         self.assertEqual(account.get_short_name(), "John")
+
+    def test_save_replaces_version(self):
+        account = self.create_account()
+        version = account.version
+
+        account.first_name = "Jane"
+        account.save(update_fields=["first_name"])
+
+        self.assertNotEqual(account.version, version)
+        self.assertEqual(Account.objects.get(pk=account.pk).version, account.version)
+
+
+class AccountIndexTest(TestCase):
+    def assertUsesIndex(self, queryset, index_name):
+        if connection.vendor == "postgresql":
+            # Tables are tiny in tests, make the planner prefer indexes
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+        self.assertIn(index_name, queryset.explain())
+
+    def test_default_ordering_uses_index(self):
+        self.assertUsesIndex(
+            Account.objects.order_by("-date_joined", "id")[:10],
+            "accounts_date_joined_id_idx",
+        )
+
+    def test_name_ordering_uses_index(self):
+        self.assertUsesIndex(
+            Account.objects.order_by("first_name", "id")[:10],
+            "accounts_first_name_id_idx",
+        )
+        self.assertUsesIndex(
+            Account.objects.order_by("last_name", "id")[:10],
+            "accounts_last_name_id_idx",
+        )
+
+    def test_superuser_lookup_uses_partial_index(self):
+        self.assertUsesIndex(
+            Account.objects.filter(is_superuser=True), "accounts_superuser_idx"
+        )
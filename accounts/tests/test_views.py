@@ -1,7 +1,26 @@
+import csv
+import datetime
+import json
+import time
+from unittest import mock
+
+import msgpack
+from asgiref.sync import sync_to_async
 from rest_framework.test import APITestCase
+from django.conf import settings
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.core.management.sql import emit_post_migrate_signal
+from django.test import AsyncClient, override_settings
 from django.urls import reverse
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
 
 from accounts.models import Account
+from cfehome import metrics
+from cfehome.pagination import invalidate_counts
+from cfehome.tokens import RefreshToken
+from cfehome.utils import Util
+from cfehome.views import response_cache, response_version_key
 
 user_data = {
     "first_name": "John",
@@ -13,6 +32,7 @@ user_data = {
 
 class AuthenticationViewsTest(APITestCase):
     def setUp(self):
+        cache.clear()
         self.user = Account.objects.create_user(**user_data)
 
         self.login_details = {
@@ -73,6 +93,13 @@ class AuthenticationViewsTest(APITestCase):
         self.assertTrue("access" in response.data)
         self.assertTrue("refresh" in response.data)
 
+    def test_login_buffers_last_login(self):
+        self.client.post(reverse("accounts:login"), self.login_details)
+        self.assertFalse(Account.objects.filter(last_login__isnull=False).exists())
+
+        Account.objects.flush_logins()
+        self.assertTrue(Account.objects.filter(last_login__isnull=False).exists())
+
     def test_refresh(self):
         _, refresh_token = self.get_tokens()
         refresh_url = reverse("accounts:refresh")
@@ -82,6 +109,35 @@ class AuthenticationViewsTest(APITestCase):
         self.assertTrue("access" in response.data)
         self.assertTrue("refresh" in response.data)
 
+    def test_refresh_is_a_single_update(self):
+        _, refresh_token = self.get_tokens()
+
+        with self.assertNumQueries(1):
+            response = self.client.post(
+                reverse("accounts:refresh"), {"refresh": refresh_token}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(OutstandingToken.objects.exists())
+
+    def test_refresh_token_reuse_revokes_session(self):
+        _, refresh_token = self.get_tokens()
+        refresh_url = reverse("accounts:refresh")
+        rotated = self.client.post(refresh_url, {"refresh": refresh_token})
+
+        response = self.client.post(refresh_url, {"refresh": refresh_token})
+        self.assertEqual(response.status_code, 401)
+
+        response = self.client.post(
+            refresh_url, {"refresh": rotated.data["refresh"]}
+        )
+        self.assertEqual(response.status_code, 401)
+
+        response = self.client.post(
+            reverse("accounts:verify_token"), {"token": rotated.data["refresh"]}
+        )
+        self.assertEqual(response.status_code, 400)
+
     def test_verify_token(self):
         access_token, _ = self.get_tokens()
         verify_url = reverse("accounts:verify_token")
@@ -89,6 +145,35 @@ class AuthenticationViewsTest(APITestCase):
         response = self.client.post(verify_url, verify_data)
         self.assertEqual(response.status_code, 200)
 
+    def test_msgpack(self):
+        access_token, _ = self.get_tokens()
+
+        response = self.client.post(
+            reverse("accounts:verify_token"),
+            msgpack.packb({"token": access_token}),
+            content_type="application/msgpack",
+            HTTP_ACCEPT="application/msgpack",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        self.assertEqual(msgpack.unpackb(response.content), {})
+
+        self.user.is_superuser = True
+        self.user.save()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.get_tokens()[0]}")
+        response = self.client.get(
+            reverse("accounts:list_users"), HTTP_ACCEPT="application/msgpack"
+        )
+
+        self.assertEqual(
+            msgpack.unpackb(response.content)["results"][0]["email"], user_data["email"]
+        )
+        self.assertEqual(
+            self.client.get(reverse("accounts:list_users"))["Content-Type"],
+            "application/json",
+        )
+
     def test_user_exists(self):
         url = reverse("accounts:admin_exists")
         response = self.client.get(url)
@@ -104,6 +189,32 @@ class AuthenticationViewsTest(APITestCase):
         self.assertTrue("exists" in response.data)
         self.assertFalse(response.data["exists"])
 
+    def test_user_exists_is_cached(self):
+        cache.clear()
+        url = reverse("accounts:admin_exists")
+        self.client.get(url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+
+        self.assertTrue(response.data["exists"])
+        self.assertIn("max-age", response["Cache-Control"])
+        self.assertTrue(response.has_header("ETag"))
+
+    def test_user_exists_not_modified(self):
+        url = reverse("accounts:admin_exists")
+        response = self.client.get(url)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_user_exists_after_account_is_created(self):
+        Account.objects.all().delete()
+        url = reverse("accounts:admin_exists")
+        self.assertFalse(self.client.get(url).data["exists"])
+
+        Account.objects.create_user(**user_data)
+        self.assertTrue(self.client.get(url).data["exists"])
+
     def test_admin_setup(self):
         Account.objects.all().delete()
         url = reverse("accounts:setup_admin")
@@ -137,6 +248,31 @@ class AuthenticationViewsTest(APITestCase):
         self.assertTrue("message" in response.data)
         self.assertEqual(response.data["message"], "Admin already exists")
 
+    def test_admin_setup_twice(self):
+        Account.objects.all().delete()
+        url = reverse("accounts:setup_admin")
+        data = user_data.copy()
+        data["password2"] = data["password"]
+        self.client.post(url, data)
+
+        data["email"] = "maryjane@gmail.com"
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["message"], "Admin already exists")
+
+    def test_admin_setup_ignores_cached_no_superuser(self):
+        self.assertFalse(Account.objects.superuser_exists())
+        # Sends no post_save, nothing resets the cached flag
+        Account.objects.update(is_superuser=True)
+
+        url = reverse("accounts:setup_admin")
+        data = user_data.copy()
+        data["email"] = "maryjane@gmail.com"
+        data["password2"] = data["password"]
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["message"], "Admin already exists")
+
     def test_admin_setup_with_different_passwords(self):
         Account.objects.all().delete()
         url = reverse("accounts:setup_admin")
@@ -215,6 +351,31 @@ class AuthenticationViewsTest(APITestCase):
         self.assertTrue("message" in response.data)
         self.assertEqual(response.data["message"], "Password changed successfully")
 
+    def test_writes_keep_fields_changed_behind_the_user_cache(self):
+        self.authenticate()
+        self.client.get(reverse("accounts:me"))
+        # Sends no post_save, so the cached user keeps is_staff=False
+        Account.objects.filter(pk=self.user.pk).update(is_staff=True)
+
+        response = self.client.patch(reverse("accounts:me"), {"first_name": "Jane"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["is_staff"])
+
+        response = self.client.post(
+            reverse("accounts:change_password"),
+            {
+                "old_password": user_data["password"],
+                "new_password": "NewPassword@2023",
+                "new_password2": "NewPassword@2023",
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_staff)
+        self.assertEqual(self.user.first_name, "Jane")
+        self.assertTrue(self.user.check_password("NewPassword@2023"))
+
     def test_change_password_with_different_passwords(self):
         self.authenticate()
         url = reverse("accounts:change_password")
@@ -262,3 +423,489 @@ class AuthenticationViewsTest(APITestCase):
             response.data["new_password"][0],
             "New password must be different from old password",
         )
+
+    def test_verify_email(self):
+        url = reverse("accounts:verify_email")
+        token = Util.generate_verification_token(self.user)
+        response = self.client.post(url, {"token": token})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["message"], "Email verified successfully")
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.email_verified)
+
+    def test_verify_email_with_used_token(self):
+        url = reverse("accounts:verify_email")
+        token = Util.generate_verification_token(self.user)
+        self.client.post(url, {"token": token})
+        response = self.client.post(url, {"token": token})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["message"], "Invalid token")
+
+    def test_verify_email_with_invalid_token(self):
+        url = reverse("accounts:verify_email")
+        response = self.client.post(url, {"token": "invalidtoken"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["message"], "Invalid token")
+
+
+class BulkImportAccountsViewTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = Account.objects.create_superuser(**user_data)
+        self.client.force_authenticate(self.user)
+        self.url = reverse("accounts:import_users")
+
+    def post_ndjson(self, *rows):
+        return self.client.generic(
+            "POST",
+            self.url,
+            "\n".join(json.dumps(row) for row in rows),
+            content_type="application/x-ndjson",
+        )
+
+    def test_import_ndjson(self):
+        response = self.post_ndjson(
+            {"email": "jane@example.com", "first_name": "Jane", "last_name": "Doe"},
+            {"email": "JANE@example.com", "first_name": "Jane", "last_name": "Doe"},
+            {"email": user_data["email"], "first_name": "John", "last_name": "Doe"},
+            {"email": "not-an-email", "first_name": "Bad", "last_name": "Row"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["rows"], 4)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(response.data["duplicates"], 2)
+        self.assertEqual(
+            response.data["errors"], [{"line": 4, "message": "Invalid email address"}]
+        )
+        self.assertFalse(
+            Account.objects.get(email="jane@example.com").has_usable_password()
+        )
+
+    def test_import_csv(self):
+        response = self.client.generic(
+            "POST",
+            self.url,
+            "email,first_name,last_name,password,email_verified\n"
+            "jane@example.com,Jane,Doe,NewPassword@2022,true\n",
+            content_type="text/csv",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        user = Account.objects.get(email="jane@example.com")
+        self.assertTrue(user.email_verified)
+        self.assertTrue(user.check_password("NewPassword@2022"))
+
+    def test_import_rejects_other_encodings(self):
+        response = self.client.generic(
+            "POST",
+            self.url,
+            "email,first_name,last_name\njosé@example.com,José,Doe\n".encode("latin-1"),
+            content_type="text/csv",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {"message": "File must be UTF-8 encoded"})
+
+    def test_import_is_limited(self):
+        with self.settings(BULK_IMPORT_MAX_ROWS=1):
+            response = self.post_ndjson(
+                {"email": "jane@example.com", "first_name": "Jane", "last_name": "Doe"},
+                {"email": "mary@example.com", "first_name": "Mary", "last_name": "Doe"},
+            )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Account.objects.filter(email="jane@example.com").exists())
+
+    def test_import_limits_plain_passwords(self):
+        rows = [
+            {
+                "email": f"user{i}@example.com",
+                "first_name": "Jane",
+                "last_name": "Doe",
+                "password": "NewPassword@2022",
+            }
+            for i in range(3)
+        ]
+
+        with self.settings(BULK_IMPORT_MAX_PASSWORDS=2):
+            with mock.patch("cfehome.hashing.make_passwords") as make_passwords:
+                response = self.post_ndjson(*rows)
+
+        self.assertEqual(response.status_code, 400)
+        make_passwords.assert_not_called()
+        self.assertFalse(Account.objects.filter(email="user0@example.com").exists())
+
+    def test_import_requires_permission(self):
+        self.user.is_superuser = False
+        self.user.save()
+
+        response = self.post_ndjson(
+            {"email": "jane@example.com", "first_name": "Jane", "last_name": "Doe"}
+        )
+
+        self.assertEqual(response.status_code, 403)
+
+
+class ExportAccountsViewTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = Account.objects.create_superuser(**user_data)
+        Account.objects.create_user(
+            first_name="Jane",
+            last_name="Roe",
+            email="janeroe@gmail.com",
+            password="NewPassword@2022",
+        )
+        self.client.force_authenticate(self.user)
+        self.url = reverse("accounts:export_users")
+
+    def test_export_csv(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(",")[:3], ["id", "email", "first_name"])
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[1].startswith(f"{Account.objects.last().pk},"))
+
+    def test_export_ndjson_with_filters(self):
+        response = self.client.get(
+            self.url, {"format": "ndjson", "search": "roe", "ordering": "email"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual([row["email"] for row in rows], ["janeroe@gmail.com"])
+        self.assertIsNone(rows[0]["last_login"])
+
+    def test_export_formats_datetimes_alike(self):
+        Account.objects.filter(email="janeroe@gmail.com").update(
+            last_login=datetime.datetime(
+                2024, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc
+            )
+        )
+        query = {"search": "janeroe"}
+
+        csv_response = self.client.get(self.url, query)
+        ndjson_response = self.client.get(self.url, {**query, "format": "ndjson"})
+
+        content = b"".join(csv_response.streaming_content).decode()
+        row = next(csv.DictReader(content.split("\r\n")))
+        record = json.loads(b"".join(ndjson_response.streaming_content))
+        self.assertEqual(record["last_login"], "2024-01-02T03:04:05.678Z")
+        self.assertEqual(row["last_login"], record["last_login"])
+        self.assertEqual(row["date_joined"], record["date_joined"])
+
+    @override_settings(ACCOUNT_EXPORT_CHUNK_SIZE=1)
+    async def test_export_streams_under_asgi(self):
+        refresh = await sync_to_async(RefreshToken.for_user)(self.user)
+        response = await AsyncClient().get(
+            self.url,
+            {"format": "ndjson"},
+            headers={"authorization": f"Bearer {refresh.access_token}"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(
+            {json.loads(chunk)["email"] for chunk in chunks},
+            {"janeroe@gmail.com", self.user.email},
+        )
+
+    def test_export_requires_permission(self):
+        self.client.force_authenticate(Account.objects.get(email="janeroe@gmail.com"))
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 403)
+
+
+class BulkGroupRelationViewTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = Account.objects.create_superuser(**user_data)
+        self.client.force_authenticate(self.user)
+        self.group = Group.objects.create(name="Editors")
+        self.members = [
+            Account.objects.create_user(
+                first_name="Jane",
+                last_name="Doe",
+                email=f"jane{i}@example.com",
+                password="NewPassword@2022",
+            )
+            for i in range(3)
+        ]
+        self.members_url = reverse(
+            "accounts:group_members", kwargs={"id": self.group.id}
+        )
+        self.permissions_url = reverse(
+            "accounts:group_permissions", kwargs={"id": self.group.id}
+        )
+
+    def test_add_and_remove_members(self):
+        self.group.user_set.add(self.members[0])
+
+        response = self.client.patch(
+            self.members_url,
+            {
+                "add": [self.members[0].id, self.members[1].id, self.members[2].id],
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"added": 2, "removed": 0})
+        self.assertEqual(self.group.user_set.count(), 3)
+
+        response = self.client.patch(
+            self.members_url,
+            {"remove": [self.members[0].id, self.members[1].id]},
+            format="json",
+        )
+
+        self.assertEqual(response.data, {"added": 0, "removed": 2})
+        self.assertEqual(list(self.group.user_set.all()), [self.members[2]])
+
+    def test_permissions_follow_members_and_group(self):
+        permission = Permission.objects.get(codename="view_group")
+        member = Account.objects.get(pk=self.members[0].pk)
+        self.assertFalse(member.has_perm("auth.view_group"))
+
+        self.client.patch(self.members_url, {"add": [member.id]}, format="json")
+        response = self.client.patch(
+            self.permissions_url, {"add": [permission.id]}, format="json"
+        )
+
+        self.assertEqual(response.data, {"added": 1, "removed": 0})
+        member = Account.objects.get(pk=member.pk)
+        self.assertTrue(member.has_perm("auth.view_group"))
+
+        self.client.patch(self.members_url, {"remove": [member.id]}, format="json")
+
+        member = Account.objects.get(pk=member.pk)
+        self.assertFalse(member.has_perm("auth.view_group"))
+
+    def test_unknown_ids(self):
+        response = self.client.patch(
+            self.members_url,
+            {"add": [self.members[0].id, 0], "remove": [self.members[0].id]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["add"], ["Unknown ids: 0"])
+        self.assertEqual(
+            response.data["remove"], ["The same id can't be added and removed."]
+        )
+        self.assertFalse(self.group.user_set.exists())
+
+    def test_unknown_group(self):
+        response = self.client.patch(
+            reverse("accounts:group_members", kwargs={"id": 0}),
+            {"add": [self.members[0].id]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_requires_permission(self):
+        self.client.force_authenticate(self.members[0])
+
+        response = self.client.patch(
+            self.members_url, {"add": [self.members[0].id]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(self.group.user_set.exists())
+
+
+class ConditionalRequestTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = Account.objects.create_superuser(**user_data)
+        self.client.force_authenticate(self.user)
+        self.group = Group.objects.create(name="Editors")
+        self.user_url = reverse("accounts:retrieve_user", kwargs={"id": self.user.id})
+        self.group_url = reverse("accounts:retrieve_group", kwargs={"id": self.group.id})
+
+    def test_not_modified(self):
+        etag = self.client.get(self.user_url)["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.user_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertFalse(response.content)
+
+    def test_update_changes_etag(self):
+        etag = self.client.get(self.user_url)["ETag"]
+
+        response = self.client.patch(self.user_url, {"first_name": "Jane"})
+        self.assertNotEqual(response["ETag"], etag)
+
+        response = self.client.get(self.user_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["first_name"], "Jane")
+
+    def test_if_match(self):
+        etag = self.client.get(self.user_url)["ETag"]
+
+        response = self.client.patch(
+            self.user_url, {"first_name": "Jane"}, HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.patch(
+            self.user_url, {"first_name": "Mary"}, HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(Account.objects.get(pk=self.user.pk).first_name, "Jane")
+
+    def test_me(self):
+        url = reverse("accounts:me")
+        etag = self.client.get(url)["ETag"]
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.patch(
+            url, {"first_name": "Jane"}, HTTP_IF_MATCH=self.client.get(url)["ETag"]
+        )
+        self.assertEqual(response.status_code, 200)
+        # force_authenticate keeps serving the instance it was given
+        self.client.force_authenticate(Account.objects.get(pk=self.user.pk))
+        self.assertEqual(self.client.get(url)["ETag"], response["ETag"])
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_group_etag_follows_permissions(self):
+        etag = self.client.get(self.group_url)["ETag"]
+        self.assertEqual(
+            self.client.get(self.group_url, HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+
+        self.group.permissions.add(Permission.objects.get(codename="view_group"))
+
+        response = self.client.get(self.group_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["permissions"]), 1)
+
+        response = self.client.patch(
+            self.group_url, {"name": "Writers"}, HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 412)
+
+    def test_group_etag_is_read_from_the_database(self):
+        permission = Permission.objects.get(codename="view_group")
+        self.group.permissions.add(permission)
+        etag = self.client.get(self.group_url)["ETag"]
+
+        # Another process, with nothing cached, agrees on the ETag
+        cache.clear()
+        self.assertEqual(self.client.get(self.group_url)["ETag"], etag)
+
+        # Changes that send no signal are seen as well
+        Group.permissions.through.objects.filter(group=self.group).delete()
+        self.assertNotEqual(self.client.get(self.group_url)["ETag"], etag)
+        self.group.permissions.add(permission)
+        self.assertEqual(self.client.get(self.group_url)["ETag"], etag)
+
+    def test_unknown_object(self):
+        response = self.client.get(
+            reverse("accounts:retrieve_group", kwargs={"id": 0}),
+            HTTP_IF_NONE_MATCH="*",
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+
+class CachedListViewTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        response_cache.clear()
+        metrics.reset()
+        self.user = Account.objects.create_superuser(**user_data)
+        self.client.force_authenticate(self.user)
+        self.permissions_url = reverse("accounts:list_permissions")
+        self.groups_url = reverse("accounts:list_groups")
+
+    def test_served_from_memory(self):
+        response = self.client.get(self.permissions_url, {"search": "group"})
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.permissions_url, {"search": "group"})
+
+        self.assertEqual(cached.status_code, 200)
+        self.assertEqual(cached.data, response.data)
+        self.assertEqual(cached["ETag"], response["ETag"])
+        self.assertEqual(metrics.snapshot()["response_cache.hit"], 1)
+
+    def test_not_modified(self):
+        etag = self.client.get(self.permissions_url)["ETag"]
+
+        response = self.client.get(self.permissions_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertNotEqual(
+            self.client.get(self.permissions_url, {"page": 2})["ETag"], etag
+        )
+
+    def test_writes_invalidate(self):
+        response = self.client.get(self.groups_url)
+        self.assertEqual(response.data["count"], 0)
+
+        group = Group.objects.create(name="Editors")
+        response = self.client.get(self.groups_url)
+        self.assertEqual(response.data["count"], 1)
+
+        group.permissions.add(Permission.objects.get(codename="view_group"))
+        response = self.client.get(self.groups_url)
+        self.assertEqual(len(response.data["results"][0]["permissions"]), 1)
+
+    def test_writes_of_other_processes_invalidate(self):
+        etag = self.client.get(self.groups_url)["ETag"]
+
+        # What another process's write leaves in the shared cache
+        cache.set(response_version_key(Group), "bumped elsewhere", None)
+
+        response = self.client.get(self.groups_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(metrics.snapshot()["response_cache.miss"], 2)
+
+    def test_writes_without_signals_are_stale_until_timeout(self):
+        self.client.get(self.groups_url)
+        Group.objects.bulk_create([Group(name="Editors")])
+
+        self.assertEqual(self.client.get(self.groups_url).data["results"], [])
+
+        # Counts are cached on their own, for PAGINATION_COUNT_CACHE_TIMEOUT
+        invalidate_counts(Group)
+        expired = time.monotonic() + settings.RESPONSE_CACHE_TIMEOUT
+        with mock.patch("cfehome.cache.time.monotonic", return_value=expired):
+            response = self.client.get(self.groups_url)
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_migrate_invalidates(self):
+        count = self.client.get(self.permissions_url).data["count"]
+        Permission.objects.filter(codename="view_group").delete()
+        self.assertEqual(self.client.get(self.permissions_url).data["count"], count - 1)
+
+        Permission.objects.filter(codename="add_group").update(codename="old_group")
+        emit_post_migrate_signal(0, False, "default")
+
+        self.assertEqual(self.client.get(self.permissions_url).data["count"], count + 1)
+
+    def test_filtered_groups_are_not_cached(self):
+        self.client.get(self.groups_url, {"search": "edit"})
+        self.client.get(self.groups_url, {"search": "edit"})
+
+        self.assertNotIn("response_cache.hit", metrics.snapshot())
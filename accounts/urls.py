@@ -28,6 +28,8 @@ urlpatterns = [
         name="validate_reset_password_token",
     ),
     path("users/", views.ListAccountsView.as_view(), name="list_users"),
+    path("users/import/", views.BulkImportAccountsView.as_view(), name="import_users"),
+    path("users/export/", views.ExportAccountsView.as_view(), name="export_users"),
     path(
         "users/<int:id>/",
         views.RetrieveUpdateAccountView.as_view(),
@@ -44,6 +46,16 @@ urlpatterns = [
         views.RetrieveUpdateDestroyGroupView.as_view(),
         name="retrieve_group",
     ),
+    path(
+        "groups/<int:id>/members/",
+        views.UpdateGroupMembersView.as_view(),
+        name="group_members",
+    ),
+    path(
+        "groups/<int:id>/permissions/",
+        views.UpdateGroupPermissionsView.as_view(),
+        name="group_permissions",
+    ),
     path("permissions/", views.ListPermissionView.as_view(), name="list_permissions"),
     path(
         "send-email-verification/",
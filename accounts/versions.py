@@ -0,0 +1,12 @@
+import hashlib
+import json
+
+
+def get_group_version(group_id, name, permission_ids):
+    """
+    Return the version of a group's representation, a digest of its name and
+    permissions. It is computed from the stored rows rather than kept
+    anywhere, so every process agrees on it.
+    """
+    content = json.dumps([name, sorted(permission_ids)])
+    return f"{group_id}.{hashlib.sha256(content.encode()).hexdigest()[:32]}"
@@ -1,9 +1,20 @@
+from asgiref.sync import sync_to_async
+import csv
+import itertools
+
+from django.conf import settings
 from django.contrib.auth.models import Group, Permission
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
 from rest_framework import generics
 from rest_framework import permissions
 from rest_framework.response import Response
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
+from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
@@ -12,10 +23,12 @@ from rest_framework_simplejwt.views import (
 )
 from rest_framework import status
 from django.contrib.auth import update_session_auth_hash
+from django.db import transaction
 
 from cfehome.serializers import MessageSerializer, StatusSerializer
 from cfehome.utils import Util
-from .models import Account, BlacklistedToken
+from .importers import AccountImporter
+from .models import Account
 from .serializers import (
     RegisterAccountSerializer,
     AccountSerializer,
@@ -23,13 +36,22 @@ from .serializers import (
     TokenRefreshResponseSerializer,
     TokenVerifyResponseSerializer,
     UserExistsMessageSerializer,
+    GroupMembersSerializer,
+    GroupPermissionsSerializer,
     GroupSerializer,
+    ImportResultSerializer,
     PermissionSerializer,
     ChangePasswordSerializer,
     ResendVerificationEmailSerializer,
     VerifyEmailSerializer,
 )
+from cfehome.filters import TrigramSearchFilter
+from cfehome.pagination import EstimatedCountPagination
+from cfehome.parsers import CSVParser, NDJSONParser
+from cfehome.renderers import CSVRenderer, NDJSONRenderer
 from cfehome.permissions import IsEntityManager
+from cfehome.throttling import CREDENTIAL_THROTTLES, GlobalThrottle, IPThrottle
+from cfehome.views import AsyncAPIView, CachedListMixin, ConditionalMixin
 
 from django_rest_passwordreset.views import (
     ResetPasswordConfirm,
@@ -37,11 +59,14 @@ from django_rest_passwordreset.views import (
     ResetPasswordRequestToken,
 )
 from .signals import send_verification_mail
+from .versions import get_group_version
 
 
 class DecoratedTokenObtainPairView(TokenObtainPairView):
     api_tags = ["Authentication"]
     api_operation_id = "get_auth_tokens"
+    throttle_classes = CREDENTIAL_THROTTLES
+    throttle_scope = "login"
 
     @swagger_auto_schema(
         responses={
@@ -84,7 +109,7 @@ class DecoratedTokenVerifyView(TokenVerifyView):
         return super().post(request, *args, **kwargs)
 
 
-class AdminExistsView(generics.GenericAPIView):
+class AdminExistsView(AsyncAPIView, generics.GenericAPIView):
     api_tags = ["User"]
     api_operation_id = "check_if_user_exists"
     api_summary = "Check if user exists"
@@ -98,22 +123,31 @@ class AdminExistsView(generics.GenericAPIView):
             status.HTTP_200_OK: UserExistsMessageSerializer,
         },
     )
-    def get(reqests, *args, **kwargs):
-        admin = Account.objects.first()
-
-        if admin:
-            return Response(
+    async def get(self, request, *args, **kwargs):
+        exists = await Account.objects.aaccount_exists()
+        etag = quote_etag(f"admin-exists-{int(exists)}")
+
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        elif exists:
+            response = Response(
                 UserExistsMessageSerializer(
                     {"message": "Admin exists", "exists": True}
                 ).data
             )
         else:
-            return Response(
+            response = Response(
                 UserExistsMessageSerializer(
                     {"message": "No admin exists", "exists": False}
                 ).data
             )
 
+        response["ETag"] = etag
+        patch_cache_control(
+            response, public=True, max_age=settings.ADMIN_EXISTS_MAX_AGE
+        )
+        return response
+
 
 class SetupAdminView(generics.CreateAPIView):
     api_tags = ["User"]
@@ -125,9 +159,7 @@ class SetupAdminView(generics.CreateAPIView):
     permission_classes = [permissions.AllowAny]
 
     def post(self, request, *args, **kwargs):
-        admin = Account.objects.filter(is_superuser=True).first()
-
-        if admin:
+        if Account.objects.superuser_exists():
             return Response(
                 MessageSerializer({"message": "Admin already exists"}).data,
                 status=status.HTTP_400_BAD_REQUEST,
@@ -136,7 +168,7 @@ class SetupAdminView(generics.CreateAPIView):
         serializer = self.serializer_class(data=request.data)
 
         if serializer.is_valid(raise_exception=True):
-            validated_data = serializer.validate(data=request.data)
+            validated_data = dict(serializer.validated_data)
 
             del validated_data["password2"]
             admin = Account.objects.create_superuser(**validated_data)
@@ -144,7 +176,9 @@ class SetupAdminView(generics.CreateAPIView):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
-class MeUpdateRetrieveView(generics.RetrieveUpdateAPIView):
+class MeUpdateRetrieveView(
+    ConditionalMixin, AsyncAPIView, generics.RetrieveUpdateAPIView
+):
     """
     Returns the current user's information.
 
@@ -153,9 +187,26 @@ class MeUpdateRetrieveView(generics.RetrieveUpdateAPIView):
 
     serializer_class = AccountSerializer
     permission_classes = [permissions.IsAuthenticated]
+    etag_prefix = "account"
 
     def get_object(self):
-        return self.request.user
+        if self.request.method in permissions.SAFE_METHODS:
+            return self.request.user
+        # The user may come from the user cache, so writes start from the
+        # stored row rather than saving stale fields back.
+        return Account.objects.get(pk=self.request.user.pk)
+
+    def get_version(self, lock=False):
+        user = self.request.user
+        if lock or self.request.method not in permissions.SAFE_METHODS:
+            # Check the stored row, as for get_object.
+            queryset = Account.objects.filter(pk=user.pk)
+            if lock:
+                queryset = queryset.select_for_update()
+            version = queryset.values_list("version", flat=True).get()
+        else:
+            version = user.version
+        return f"{user.pk}.{version.hex}"
 
     api_tags = ["User"]
 
@@ -164,8 +215,12 @@ class MeUpdateRetrieveView(generics.RetrieveUpdateAPIView):
         operation_summary="Get current user information",
         operation_description="Returns the current user's information.",
     )
-    def get(self, request, *args, **kwargs):
-        return super().get(request, *args, **kwargs)
+    async def get(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request,
+            self.get_etag(self.get_version()),
+            lambda: Response(self.get_serializer(self.get_object()).data),
+        )
 
     @swagger_auto_schema(
         operation_id="partially_update_current_user",
@@ -184,7 +239,7 @@ class MeUpdateRetrieveView(generics.RetrieveUpdateAPIView):
         return super().put(request, *args, **kwargs)
 
 
-class RegisterView(generics.CreateAPIView):
+class RegisterView(AsyncAPIView, generics.CreateAPIView):
     """
     Register a new user.
 
@@ -196,28 +251,33 @@ class RegisterView(generics.CreateAPIView):
 
     api_tags = ["User"]
     api_operation_id = "register_user"
+    throttle_classes = [IPThrottle, GlobalThrottle]
+    throttle_scope = "register"
 
     @swagger_auto_schema(
         operation_summary="Register user",
         operation_description="Registers a new user.",
         operation_id="register_user",
     )
-    def post(self, request, *args, **kwargs):
+    async def post(self, request, *args, **kwargs):
 
         serializer = self.serializer_class(data=request.data)
 
-        if serializer.is_valid(raise_exception=True):
-            validated_data = serializer.validate(data=request.data)
+        # The unique email validator queries the database.
+        if await sync_to_async(serializer.is_valid)(raise_exception=True):
+            validated_data = dict(serializer.validated_data)
 
             del validated_data["password2"]
-            user = Account.objects.create_user(**validated_data)
-            send_verification_mail.send(sender=self.__class__, instance=self, user=user)
+            user = await Account.objects.acreate_user(**validated_data)
+            await sync_to_async(send_verification_mail.send)(
+                sender=self.__class__, instance=self, user=user
+            )
 
             serializer = self.serializer_class(user)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
-class ResendVerificationEmailView(generics.GenericAPIView):
+class ResendVerificationEmailView(AsyncAPIView, generics.GenericAPIView):
     serializer_class = ResendVerificationEmailSerializer
     permission_classes = [permissions.AllowAny]
 
@@ -225,6 +285,8 @@ class ResendVerificationEmailView(generics.GenericAPIView):
     api_operation_id = "resend_verification_email"
     api_summary = "Resend verification email"
     api_description = "Resends the email verification email to the user."
+    throttle_classes = CREDENTIAL_THROTTLES
+    throttle_scope = "email"
 
     @swagger_auto_schema(
         operation_summary="Resend verification email",
@@ -235,12 +297,12 @@ class ResendVerificationEmailView(generics.GenericAPIView):
             status.HTTP_400_BAD_REQUEST: MessageSerializer,
         },
     )
-    def post(self, request, *args, **kwargs):
+    async def post(self, request, *args, **kwargs):
         serializer = self.serializer_class(data=request.data)
 
         if serializer.is_valid(raise_exception=True):
             data = serializer.validated_data
-            user = Account.objects.get(email=data["email"])
+            user = await Account.objects.aget(email=data["email"])
 
             if user.email_verified:
                 return Response(
@@ -248,7 +310,9 @@ class ResendVerificationEmailView(generics.GenericAPIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            send_verification_mail.send(sender=self.__class__, instance=self, user=user)
+            await sync_to_async(send_verification_mail.send)(
+                sender=self.__class__, instance=self, user=user
+            )
 
             return Response(
                 MessageSerializer(
@@ -258,7 +322,7 @@ class ResendVerificationEmailView(generics.GenericAPIView):
             )
 
 
-class VerifyEmailView(generics.GenericAPIView):
+class VerifyEmailView(AsyncAPIView, generics.GenericAPIView):
     serializer_class = VerifyEmailSerializer
     permission_classes = [permissions.AllowAny]
 
@@ -276,14 +340,14 @@ class VerifyEmailView(generics.GenericAPIView):
             status.HTTP_400_BAD_REQUEST: MessageSerializer,
         },
     )
-    def post(self, request, *args, **kwargs):
+    async def post(self, request, *args, **kwargs):
         serializer = self.serializer_class(data=request.data)
 
         if serializer.is_valid(raise_exception=True):
             data = serializer.validated_data
             token = data["token"]
 
-            payload = Util.validate_verification_token(token)
+            payload = await Util.avalidate_verification_token(token)
 
             if not payload:
                 return Response(
@@ -291,9 +355,9 @@ class VerifyEmailView(generics.GenericAPIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            user = Account.objects.get(id=payload["user_id"])
+            user = await Account.objects.aget(id=payload["user_id"])
 
-            BlacklistedToken.objects.create(token=token)
+            await Util.ablacklist_verification_token(token, payload)
 
             if user.email_verified:
                 return Response(
@@ -302,7 +366,7 @@ class VerifyEmailView(generics.GenericAPIView):
                 )
 
             user.email_verified = True
-            user.save()
+            await user.asave()
 
             return Response(
                 MessageSerializer({"message": "Email verified successfully"}).data,
@@ -321,24 +385,146 @@ class ListAccountsView(generics.ListAPIView):
 
     permission_classes = [IsEntityManager]
     queryset = serializer_class.Meta.model.objects.all().order_by("-date_joined")
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    pagination_class = EstimatedCountPagination
+    filter_backends = [DjangoFilterBackend, TrigramSearchFilter, OrderingFilter]
     filterset_fields = ["email", "first_name", "last_name"]
     search_fields = ["email", "first_name", "last_name"]
     ordering_fields = ["email", "first_name", "last_name"]
+    keyset_ordering = ["-date_joined", "id"]
 
     api_tags = ["User"]
     api_operation_id = "list_users"
 
 
-class RetrieveUpdateAccountView(generics.RetrieveUpdateAPIView):
+class ExportAccountsView(ListAccountsView):
+    """
+    Streams every user matching the filters, search and ordering of
+    `ListAccountsView` as CSV or NDJSON (`Accept` header or `?format=`).
+
+    Rows are read through a server-side cursor on PostgreSQL, so memory use
+    doesn't grow with the number of users. Under ASGI, which reads a sync
+    iterator whole before sending it, they are read `ACCOUNT_EXPORT_CHUNK_SIZE`
+    at a time through `sync_to_async` instead. Only staff users with the
+    `accounts.view_account` permission can access this view.
+    """
+
+    pagination_class = None
+    renderer_classes = [CSVRenderer, NDJSONRenderer]
+    export_fields = (
+        "id",
+        "email",
+        "first_name",
+        "last_name",
+        "email_verified",
+        "is_staff",
+        "is_active",
+        "is_superuser",
+        "date_joined",
+        "last_login",
+    )
+
+    api_operation_id = "export_users"
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.values_list(*self.export_fields).iterator(
+            chunk_size=settings.ACCOUNT_EXPORT_CHUNK_SIZE
+        )
+
+        renderer = request.accepted_renderer
+        content = renderer.stream(rows, self.export_fields)
+        if isinstance(request._request, ASGIRequest):
+            content = self.aiter_chunks(content)
+
+        response = StreamingHttpResponse(
+            content,
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="accounts.{renderer.format}"'
+        )
+        return response
+
+    @staticmethod
+    async def aiter_chunks(lines):
+        read_chunk = sync_to_async(
+            lambda: b"".join(
+                itertools.islice(lines, settings.ACCOUNT_EXPORT_CHUNK_SIZE)
+            )
+        )
+        while chunk := await read_chunk():
+            yield chunk
+
+
+class BulkImportAccountsView(generics.GenericAPIView):
+    """
+    Imports accounts from a CSV or NDJSON request body, streamed row by row.
+
+    Only staff users with the `accounts.add_account` permission can access
+    this view. A request imports at most `BULK_IMPORT_MAX_ROWS` rows, of which
+    `BULK_IMPORT_MAX_PASSWORDS` with plain passwords, all or nothing; larger
+    imports go through the `bulk_import_accounts` command.
+    """
+
+    serializer_class = ImportResultSerializer
+    permission_classes = [IsEntityManager]
+    queryset = Account.objects.all()
+    parser_classes = [CSVParser, NDJSONParser]
+
+    api_tags = ["User"]
+
+    @swagger_auto_schema(
+        operation_summary="Import users",
+        operation_description="Imports users from CSV or NDJSON rows of email, first_name, last_name, password or password_hash, email_verified and is_active. Rows whose email is already taken are skipped.",
+        operation_id="import_users",
+        request_body=openapi.Schema(
+            type=openapi.TYPE_STRING, format=openapi.FORMAT_BINARY
+        ),
+        responses={
+            status.HTTP_200_OK: ImportResultSerializer,
+            status.HTTP_400_BAD_REQUEST: MessageSerializer,
+        },
+    )
+    def post(self, request, *args, **kwargs):
+        importer = AccountImporter(
+            max_rows=settings.BULK_IMPORT_MAX_ROWS,
+            max_passwords=settings.BULK_IMPORT_MAX_PASSWORDS,
+        )
+
+        try:
+            with transaction.atomic():
+                result = importer.run(request.data)
+        except UnicodeDecodeError:
+            return Response(
+                MessageSerializer({"message": "File must be UTF-8 encoded"}).data,
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except (ValueError, csv.Error) as e:
+            return Response(
+                MessageSerializer({"message": str(e)}).data,
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(ImportResultSerializer(result).data, status=status.HTTP_200_OK)
+
+
+class RetrieveUpdateAccountView(ConditionalMixin, generics.RetrieveUpdateAPIView):
     serializer_class = AccountSerializer
 
     permission_classes = [IsEntityManager]
     queryset = serializer_class.Meta.model.objects.all()
     lookup_field = "id"
+    etag_prefix = "account"
 
     api_tags = ["User"]
 
+    def get_version(self, lock=False):
+        queryset = self.get_queryset().filter(id=self.kwargs["id"])
+        if lock:
+            queryset = queryset.select_for_update()
+        version = get_object_or_404(queryset.values_list("version", flat=True))
+        return f"{self.kwargs['id']}.{version.hex}"
+
     @swagger_auto_schema(
         operation_summary="Get user information",
         operation_description="Returns the user's information.",
@@ -364,9 +550,13 @@ class RetrieveUpdateAccountView(generics.RetrieveUpdateAPIView):
         return super().patch(request, *args, **kwargs)
 
 
-class CreateListGroupView(generics.ListCreateAPIView):
+class CreateListGroupView(CachedListMixin, generics.ListCreateAPIView):
     serializer_class = GroupSerializer
     permission_classes = [IsEntityManager]
+    pagination_class = EstimatedCountPagination
+    response_cache_models = [Group]
+    # Filtered listings are too varied to be worth caching.
+    response_cache_params = {"limit", "page", "pagination", "cursor", "ordering"}
 
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ["name"]
@@ -393,9 +583,11 @@ class CreateListGroupView(generics.ListCreateAPIView):
         return super().get(request, *args, **kwargs)
 
 
-class ListPermissionView(generics.ListAPIView):
+class ListPermissionView(CachedListMixin, generics.ListAPIView):
     serializer_class = PermissionSerializer
     permission_classes = [IsEntityManager]
+    pagination_class = EstimatedCountPagination
+    response_cache_models = [Permission]
 
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ["name", "codename"]
@@ -409,15 +601,31 @@ class ListPermissionView(generics.ListAPIView):
     api_description = "Returns a list of all permissions."
 
 
-class RetrieveUpdateDestroyGroupView(generics.RetrieveUpdateDestroyAPIView):
+class RetrieveUpdateDestroyGroupView(
+    ConditionalMixin, generics.RetrieveUpdateDestroyAPIView
+):
     serializer_class = GroupSerializer
     permission_classes = [IsEntityManager]
 
     lookup_field = "id"
     queryset = Group.objects.all()
+    etag_prefix = "group"
 
     api_tags = ["Groups"]
 
+    def get_version(self, lock=False):
+        queryset = self.get_queryset().filter(id=self.kwargs["id"])
+        if lock:
+            # Only the group's row, the permissions are outer joined.
+            queryset = queryset.select_for_update(of=("self",))
+        rows = list(queryset.values_list("id", "name", "permissions"))
+        if not rows:
+            raise Http404
+        group_id, name, _ = rows[0]
+        return get_group_version(
+            group_id, name, [pk for _, _, pk in rows if pk is not None]
+        )
+
     @swagger_auto_schema(
         operation_summary="Get group information",
         operation_description="Returns the group's information.",
@@ -451,6 +659,45 @@ class RetrieveUpdateDestroyGroupView(generics.RetrieveUpdateDestroyAPIView):
         return super().delete(request, *args, **kwargs)
 
 
+class BulkGroupRelationView(generics.GenericAPIView):
+    permission_classes = [IsEntityManager]
+
+    lookup_field = "id"
+    queryset = Group.objects.all()
+
+    api_tags = ["Groups"]
+
+    def patch(self, request, *args, **kwargs):
+        serializer = self.get_serializer(self.get_object(), data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data)
+
+
+class UpdateGroupMembersView(BulkGroupRelationView):
+    serializer_class = GroupMembersSerializer
+
+    @swagger_auto_schema(
+        operation_summary="Add and remove group members",
+        operation_description="Adds and removes many users to and from the group in one request.",
+        operation_id="update_group_members",
+    )
+    def patch(self, request, *args, **kwargs):
+        return super().patch(request, *args, **kwargs)
+
+
+class UpdateGroupPermissionsView(BulkGroupRelationView):
+    serializer_class = GroupPermissionsSerializer
+
+    @swagger_auto_schema(
+        operation_summary="Add and remove group permissions",
+        operation_description="Adds and removes many permissions to and from the group in one request.",
+        operation_id="update_group_permissions",
+    )
+    def patch(self, request, *args, **kwargs):
+        return super().patch(request, *args, **kwargs)
+
+
 class ChangePasswordView(generics.GenericAPIView):
     serializer_class = ChangePasswordSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -474,7 +721,9 @@ class ChangePasswordView(generics.GenericAPIView):
             user = self.request.user
             if user.check_password(serializer.data.get("old_password")):
                 user.set_password(validated_data["new_password"])
-                user.save()
+                # The user may come from the user cache, only write the
+                # password.
+                user.save(update_fields=["password"])
                 update_session_auth_hash(request, user)
 
                 return Response(
@@ -508,6 +757,8 @@ class ResetPasswordValidateTokenView(ResetPasswordValidateToken):
 class ForgotPasswordView(ResetPasswordRequestToken):
     api_tags = ["Authentication"]
     api_operation_id = "forgot_password"
+    throttle_classes = CREDENTIAL_THROTTLES
+    throttle_scope = "email"
 
     @swagger_auto_schema(
         responses={
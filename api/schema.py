@@ -0,0 +1,113 @@
+import functools
+import gzip
+import hashlib
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import HttpRequest
+from drf_yasg import openapi
+from drf_yasg.app_settings import swagger_settings
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from rest_framework.request import Request
+
+schema_info = openapi.Info(
+    title=f"{settings.PROJECT_NAME}",
+    default_version=f"{settings.PROJECT_VERSION}",
+    description=f"""
+    This is the API documentation for {settings.PROJECT_NAME}.
+
+    {settings.PROJECT_DESCRIPTION}
+
+    Filter, search and order fields are available for all endpoints that return a list of objects.
+
+    To filter, search or order, append the following query parameters to the endpoint URL:
+    - `?field_name=<value>` to filter by a specific field
+    - `?search=<search_term>` to search for a specific term
+    - `?ordering=<field_name>` to order by a specific field
+    """,
+    contact=openapi.Contact(email="oluwaseyifunmi@mafflle.com.ng"),
+)
+
+FORMATS = {
+    "json": ("application/json", OpenAPICodecJson),
+    "yaml": ("application/yaml", OpenAPICodecYaml),
+}
+
+# Staff get the schema of every endpoint, everyone else only that of the
+# endpoints a regular user can access.
+VARIANTS = ("staff", "public")
+
+
+class SchemaDocument:
+    """
+    One encoding of the schema, with its gzipped form and ETag.
+    """
+
+    def __init__(self, media_type, content):
+        self.media_type = media_type
+        self.content = content
+        self.gzipped = gzip.compress(content, mtime=0)
+        self.etag = hashlib.sha256(content).hexdigest()[:32]
+
+
+def regular_user_request():
+    """
+    A request of an active user without staff status or permissions, against
+    which the endpoints of the public schema are checked.
+    """
+    request = Request(HttpRequest())
+    request.user = get_user_model()(is_active=True)
+    return request
+
+
+def generate_schema(variant):
+    """
+    Generate the `variant` of the schema and return it encoded in each of
+    `FORMATS`.
+    """
+    # Without a URL, the generator would take the host from the request.
+    generator = swagger_settings.DEFAULT_GENERATOR_CLASS(info=schema_info, url="")
+    if variant == "staff":
+        schema = generator.get_schema(request=None, public=True)
+    else:
+        schema = generator.get_schema(request=regular_user_request(), public=False)
+    return {
+        extension: codec(validators=[]).encode(schema)
+        for extension, (_, codec) in FORMATS.items()
+    }
+
+
+def schema_path(directory, extension, variant):
+    if variant == "staff":
+        return Path(directory) / f"openapi.{extension}"
+    return Path(directory) / f"openapi.{variant}.{extension}"
+
+
+@functools.lru_cache(maxsize=None)
+def get_schema_documents(variant):
+    """
+    The `variant` of the schema in each of `FORMATS`, read from the files
+    written by the `generate_schema` command into `SCHEMA_DIR`, or generated
+    on first use when there are none.
+    """
+    try:
+        contents = {
+            extension: schema_path(settings.SCHEMA_DIR, extension, variant).read_bytes()
+            for extension in FORMATS
+        }
+    except FileNotFoundError:
+        contents = generate_schema(variant)
+
+    return {
+        extension: SchemaDocument(FORMATS[extension][0], content)
+        for extension, content in contents.items()
+    }
+
+
+@receiver(setting_changed)
+def reset_schema_documents(*, setting, **kwargs):
+    if setting == "SCHEMA_DIR":
+        get_schema_documents.cache_clear()
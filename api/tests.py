@@ -1,3 +1,132 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import tempfile
 
-# Create your tests here.
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from accounts.models import Account
+from api.schema import get_schema_documents
+from cfehome import metrics
+
+
+class MetricsViewTest(APITestCase):
+    def setUp(self):
+        metrics.reset()
+        self.url = reverse("metrics")
+
+    def test_metrics_requires_staff(self):
+        user = Account.objects.create_user(
+            first_name="John",
+            last_name="Doe",
+            email="johndoe@gmail.com",
+            password="NewPassword@2022",
+        )
+        self.client.force_authenticate(user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+    def test_metrics(self):
+        admin = Account.objects.create_superuser(
+            first_name="John",
+            last_name="Doe",
+            email="johndoe@gmail.com",
+            password="NewPassword@2022",
+        )
+        metrics.incr("example")
+        self.client.force_authenticate(admin)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"example": 1})
+
+
+class SchemaViewTest(APITestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        for name, content in [
+            ("openapi.public.json", b'{"swagger": "2.0"}'),
+            ("openapi.public.yaml", b"swagger: '2.0'\n"),
+            ("openapi.json", b'{"swagger": "2.0", "paths": {}}'),
+            ("openapi.yaml", b"swagger: '2.0'\npaths: {}\n"),
+        ]:
+            with open(os.path.join(self.directory.name, name), "wb") as f:
+                f.write(content)
+
+        settings = override_settings(SCHEMA_DIR=self.directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.url = reverse("openapi_schema", kwargs={"format": "json"})
+
+    def test_serves_prebuilt_schema(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(response.content, b'{"swagger": "2.0"}')
+
+        response = self.client.get(reverse("openapi_schema", kwargs={"format": "yaml"}))
+        self.assertEqual(response.content, b"swagger: '2.0'\n")
+
+    def test_serves_full_schema_to_staff(self):
+        public = self.client.get(self.url)
+        self.client.force_login(
+            Account.objects.create_superuser(
+                first_name="John",
+                last_name="Doe",
+                email="johndoe@gmail.com",
+                password="NewPassword@2022",
+            )
+        )
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.content, b'{"swagger": "2.0", "paths": {}}')
+        self.assertNotEqual(response["ETag"], public["ETag"])
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIn("Cookie", response["Vary"])
+
+    def test_gzip(self):
+        plain = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), b'{"swagger": "2.0"}')
+        self.assertNotEqual(response["ETag"], plain["ETag"])
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+    def test_not_modified(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_generated_without_prebuilt_schema(self):
+        with override_settings(SCHEMA_DIR=os.path.join(self.directory.name, "none")):
+            response = self.client.get(self.url)
+            self.assertIs(
+                get_schema_documents("public"), get_schema_documents("public")
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("/api/auth/me/", json.loads(response.content)["paths"])
+
+    def test_public_schema_leaves_out_staff_endpoints(self):
+        with override_settings(SCHEMA_DIR=os.path.join(self.directory.name, "none")):
+            response = self.client.get(self.url)
+
+        paths = json.loads(response.content)["paths"]
+        self.assertIn("/api/auth/login/", paths)
+        for path in [
+            "/api/auth/users/",
+            "/api/auth/users/import/",
+            "/api/auth/users/export/",
+            "/api/auth/groups/{id}/members/",
+            "/api/auth/groups/{id}/permissions/",
+            "/api/metrics/",
+        ]:
+            self.assertNotIn(path, paths)
@@ -1,9 +1,15 @@
-from django.urls import path
+from django.urls import path, re_path
 
 from . import views
 
 urlpatterns = [
     path("", views.HealthCheckView.as_view(), name="health_check"),
+    path("metrics/", views.MetricsView.as_view(), name="metrics"),
+    re_path(
+        r"^schema\.(?P<format>json|yaml)$",
+        views.SchemaView.as_view(),
+        name="openapi_schema",
+    ),
     path(
         "swagger/",
         views.schema_view.with_ui("swagger", cache_timeout=0),
@@ -1,6 +1,12 @@
 from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+from django.utils.regex_helper import _lazy_re_compile
+from django.views import View
 from rest_framework import generics
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework import permissions
 from rest_framework.authentication import SessionAuthentication
 from rest_framework import status
@@ -8,8 +14,15 @@ from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 
+from cfehome import metrics
+from cfehome.jwks import get_key_ring
 from cfehome.serializers import MessageSerializer
 
+from .schema import get_schema_documents, schema_info
+
+# As in django.middleware.gzip
+re_accepts_gzip = _lazy_re_compile(r"\bgzip\b")
+
 
 class HealthCheckView(generics.GenericAPIView):
     api_tags = ["Health Check"]
@@ -29,25 +42,85 @@ class HealthCheckView(generics.GenericAPIView):
         return Response(MessageSerializer({"message": "OK"}).data)
 
 
+class MetricsView(APIView):
+    api_tags = ["Health Check"]
+    api_operation_id = "metrics"
+    api_summary = "Metrics"
+    api_description = "Returns the counters recorded by the process serving the request."
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        responses={
+            status.HTTP_200_OK: openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                additional_properties=openapi.Schema(type=openapi.TYPE_INTEGER),
+            ),
+        },
+    )
+    def get(self, request):
+        return Response(metrics.snapshot())
+
+
 schema_view = get_schema_view(
-    openapi.Info(
-        title=f"{settings.PROJECT_NAME}",
-        default_version=f"{settings.PROJECT_VERSION}",
-        description=f"""
-        This is the API documentation for {settings.PROJECT_NAME}.
-
-        {settings.PROJECT_DESCRIPTION}
-
-        Filter, search and order fields are available for all endpoints that return a list of objects.
-
-        To filter, search or order, append the following query parameters to the endpoint URL:
-        - `?field_name=<value>` to filter by a specific field
-        - `?search=<search_term>` to search for a specific term
-        - `?ordering=<field_name>` to order by a specific field
-        """,
-        contact=openapi.Contact(email="oluwaseyifunmi@mafflle.com.ng"),
-    ),
+    schema_info,
     public=False,
     permission_classes=(permissions.AllowAny,),
     authentication_classes=(SessionAuthentication,),
 )
+
+
+class JWKSView(View):
+    """
+    Public keys JWTs are signed with, as a JSON Web Key Set.
+
+    The document is built once per key ring and served from memory, so
+    other services can verify tokens locally and cache the keys.
+    """
+
+    def get(self, request):
+        ring = get_key_ring()
+        etag = quote_etag(ring.etag)
+
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(ring.jwks, content_type="application/json")
+
+        response["ETag"] = etag
+        patch_cache_control(response, public=True, max_age=settings.JWKS_MAX_AGE)
+        return response
+
+
+class SchemaView(View):
+    """
+    The OpenAPI schema of the API, as JSON or YAML.
+
+    The schema is generated at deploy time by the `generate_schema` command,
+    or on the first request otherwise, and served from memory, gzipped for
+    clients that accept it. Staff signed in to the admin, as in the UIs, get
+    the schema of every endpoint, everyone else only that of the endpoints
+    regular users can access.
+    """
+
+    def get(self, request, format):
+        staff = request.user.is_staff
+        document = get_schema_documents("staff" if staff else "public")[format]
+        gzipped = re_accepts_gzip.search(request.headers.get("Accept-Encoding", ""))
+        # Each encoding is a different representation.
+        etag = quote_etag(f"{document.etag}-gzip" if gzipped else document.etag)
+
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+        elif gzipped:
+            response = HttpResponse(document.gzipped, content_type=document.media_type)
+            response["Content-Encoding"] = "gzip"
+        else:
+            response = HttpResponse(document.content, content_type=document.media_type)
+
+        response["ETag"] = etag
+        patch_vary_headers(response, ["Accept-Encoding", "Cookie"])
+        if staff:
+            patch_cache_control(response, private=True, no_cache=True)
+        else:
+            patch_cache_control(response, public=True, no_cache=True)
+        return response
@@ -0,0 +1,188 @@
+import copy
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from . import metrics
+from .cache import LocalTTLCache
+from .revocation import revocation_filter
+from .tokens import FAMILY_CLAIM
+
+
+class UserCache:
+    """
+    Two-tier cache of user instances keyed by id.
+
+    Lookups go to a small per-process LRU first and then to the shared
+    Django cache. Writes to an account invalidate both tiers in this process
+    and the shared tier everywhere; other processes may serve their local
+    copy for at most `USER_CACHE_LOCAL_TTL` seconds.
+    """
+
+    def __init__(self):
+        self.local = LocalTTLCache(
+            maxsize=settings.USER_CACHE_LOCAL_SIZE, ttl=settings.USER_CACHE_LOCAL_TTL
+        )
+
+    @staticmethod
+    def key(user_id):
+        return f"auth:user:{user_id}"
+
+    def get(self, user_id):
+        key = self.key(user_id)
+
+        user = self.local.get(key)
+        if user is not None:
+            metrics.incr("user_cache.local_hit")
+            return copy.copy(user)
+
+        user = cache.get(key)
+        if user is not None:
+            metrics.incr("user_cache.shared_hit")
+            self.local.set(key, user)
+            return copy.copy(user)
+
+        metrics.incr("user_cache.miss")
+        return None
+
+    async def aget(self, user_id):
+        key = self.key(user_id)
+
+        user = self.local.get(key)
+        if user is not None:
+            metrics.incr("user_cache.local_hit")
+            return copy.copy(user)
+
+        user = await cache.aget(key)
+        if user is not None:
+            metrics.incr("user_cache.shared_hit")
+            self.local.set(key, user)
+            return copy.copy(user)
+
+        metrics.incr("user_cache.miss")
+        return None
+
+    def set(self, user_id, user):
+        key = self.key(user_id)
+        user = copy.copy(user)
+        self.local.set(key, user)
+        cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+
+    async def aset(self, user_id, user):
+        key = self.key(user_id)
+        user = copy.copy(user)
+        self.local.set(key, user)
+        await cache.aset(key, user, settings.USER_CACHE_TIMEOUT)
+
+    def invalidate(self, user_id):
+        def delete():
+            key = self.key(user_id)
+            self.local.delete(key)
+            cache.delete(key)
+
+        # Delete now, and again once the change is visible to other
+        # connections, so a concurrent request can't re-cache the old row.
+        delete()
+        transaction.on_commit(delete)
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that resolves the token's user through `user_cache`
+    instead of querying the database on every request.
+
+    Tokens of a revoked login session are rejected, as checked by the
+    in-memory `revocation_filter`. `aauthenticate` is the same for async
+    views, where a cached user and an unrevoked session need no I/O at all.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+
+        family = validated_token.get(FAMILY_CLAIM)
+        if family is not None and revocation_filter.is_revoked(family):
+            raise InvalidToken(_("Token is invalid or expired"))
+
+        return validated_token
+
+    async def aget_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+
+        family = validated_token.get(FAMILY_CLAIM)
+        if family is not None and await revocation_filter.ais_revoked(family):
+            raise InvalidToken(_("Token is invalid or expired"))
+
+        return validated_token
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        user = user_cache.get(user_id)
+
+        if user is None:
+            try:
+                user = self.user_model.objects.get(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+            user_cache.set(user_id, user)
+
+        return self.check_user(user, validated_token)
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        user = await user_cache.aget(user_id)
+
+        if user is None:
+            try:
+                user = await self.user_model.objects.aget(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+            await user_cache.aset(user_id, user)
+
+        return self.check_user(user, validated_token)
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = await self.aget_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    def check_user(self, user, validated_token):
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
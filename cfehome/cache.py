@@ -0,0 +1,94 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+class LocalTTLCache:
+    """
+    Thread-safe, size-bounded LRU cache for a single process.
+
+    Entries expire `ttl` seconds after they were set; once `maxsize` entries
+    are stored the least recently used one is evicted.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                expires_at, value = self._data[key]
+            except KeyError:
+                return default
+
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def get_versions(keys):
+    """
+    Return the current version stamp of each key in `keys`.
+
+    Version stamps live in the shared Django cache and never expire; a key
+    that has no stamp yet (or whose stamp was evicted) is given a fresh one.
+    Stamps are random rather than counters so that an evicted key can never
+    come back with a value that was handed out before.
+    """
+    keys = list(keys)
+    versions = cache.get_many(keys)
+
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid.uuid4().hex, None)
+            versions[key] = cache.get(key)
+
+    return versions
+
+
+def bump_versions(keys):
+    """
+    Give every key in `keys` a new version stamp, invalidating anything that
+    was cached against the old one.
+
+    The stamps are replaced again once the current transaction commits, so
+    values recomputed from not yet committed data are invalidated as well.
+    """
+    keys = list(keys)
+    if not keys:
+        return
+
+    def bump():
+        cache.set_many({key: uuid.uuid4().hex for key in keys}, None)
+
+    bump()
+    transaction.on_commit(bump)
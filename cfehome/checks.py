@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Backends whose entries are only visible to the process that wrote them
+PROCESS_LOCAL_CACHE_BACKENDS = {
+    "django.core.cache.backends.dummy.DummyCache",
+    "django.core.cache.backends.locmem.LocMemCache",
+}
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Refuse to deploy with a process-local default cache.
+
+    Invalidations of the user cache, permission and response version stamps,
+    throttling buckets and buffered logins must reach every process, which a
+    local-memory cache can't do.
+    """
+    backend = settings.CACHES["default"]["BACKEND"]
+    if backend not in PROCESS_LOCAL_CACHE_BACKENDS:
+        return []
+
+    return [
+        Error(
+            f"The default cache ({backend}) isn't shared between processes.",
+            hint=(
+                "Set CACHE_URL to a shared cache, e.g. redis://localhost:6379/0, "
+                "or silence this check if the application runs in a single "
+                "process."
+            ),
+            id="cfehome.E001",
+        )
+    ]
@@ -0,0 +1,222 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from . import metrics
+
+
+class PasswordHashingUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _("Too many password operations in progress, try again later.")
+    default_code = "password_hashing_unavailable"
+
+
+def _setup_worker():
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cfehome.settings")
+    django.setup()
+
+
+def _encode(password, algorithm):
+    return hashers.make_password(password, hasher=algorithm)
+
+
+def _verify(password, encoded, harden):
+    hasher = hashers.identify_hasher(encoded)
+    is_correct = hasher.verify(password, encoded)
+    if not is_correct and harden:
+        hasher.harden_runtime(password, encoded)
+    return is_correct
+
+
+class HashingExecutor:
+    """
+    Runs password hashing in a pool of `PASSWORD_HASHING_WORKERS` processes,
+    so hashing can only ever use that many cores per application process.
+    By default each of the host's `WEB_CONCURRENCY` application processes
+    gets an equal share of its cores, at least one.
+
+    At most `PASSWORD_HASHING_QUEUE_SIZE` operations wait for a free worker;
+    past that, callers wait up to `PASSWORD_HASHING_QUEUE_TIMEOUT` seconds
+    for a slot and then get a 503. With no workers, hashing runs in the
+    calling thread, still subject to the queue limit.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pool = None
+        self.slots = None
+
+    @property
+    def workers(self):
+        if settings.PASSWORD_HASHING_WORKERS is not None:
+            return settings.PASSWORD_HASHING_WORKERS
+
+        cores = os.cpu_count() or 1
+        processes = settings.WEB_CONCURRENCY or cores
+        return max(cores // processes, 1)
+
+    def get_slots(self):
+        with self.lock:
+            if self.slots is None:
+                self.slots = threading.BoundedSemaphore(
+                    self.workers + settings.PASSWORD_HASHING_QUEUE_SIZE
+                )
+            return self.slots
+
+    def get_pool(self):
+        with self.lock:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_setup_worker,
+                )
+            return self.pool
+
+    def run(self, fn, *args):
+        slots = self.get_slots()
+        if not slots.acquire(timeout=settings.PASSWORD_HASHING_QUEUE_TIMEOUT):
+            metrics.incr("password_hashing.rejected")
+            raise PasswordHashingUnavailable()
+
+        try:
+            if not self.workers:
+                return fn(*args)
+
+            try:
+                return self.get_pool().submit(fn, *args).result()
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for memory); start a new pool.
+                self.shutdown()
+                return self.get_pool().submit(fn, *args).result()
+        finally:
+            slots.release()
+
+    async def arun(self, fn, *args):
+        """
+        `run` for async callers: waiting for a slot or a worker suspends the
+        calling coroutine instead of blocking the event loop.
+        """
+        slots = self.get_slots()
+        if not slots.acquire(blocking=False) and not await self._aacquire(slots):
+            metrics.incr("password_hashing.rejected")
+            raise PasswordHashingUnavailable()
+
+        try:
+            if not self.workers:
+                return await asyncio.to_thread(fn, *args)
+
+            try:
+                return await asyncio.wrap_future(self.get_pool().submit(fn, *args))
+            except BrokenProcessPool:
+                self.shutdown()
+                return await asyncio.wrap_future(self.get_pool().submit(fn, *args))
+        finally:
+            slots.release()
+
+    @staticmethod
+    async def _aacquire(slots):
+        acquiring = asyncio.ensure_future(
+            asyncio.to_thread(
+                slots.acquire, timeout=settings.PASSWORD_HASHING_QUEUE_TIMEOUT
+            )
+        )
+        try:
+            return await asyncio.shield(acquiring)
+        except asyncio.CancelledError:
+            # The thread keeps waiting; give back the slot it may still get.
+            acquiring.add_done_callback(
+                lambda future: future.result() and slots.release()
+            )
+            raise
+
+    def map(self, fn, *iterables):
+        """
+        Run `fn` over the arguments in the pool, spread over all workers, for
+        batch jobs. Unlike `run` it doesn't take queue slots.
+        """
+        iterables = [list(iterable) for iterable in iterables]
+        count = min(map(len, iterables), default=0)
+        if not self.workers or not count:
+            return list(map(fn, *iterables))
+
+        chunksize = max(count // (self.workers * 4), 1)
+        return list(self.get_pool().map(fn, *iterables, chunksize=chunksize))
+
+    def shutdown(self):
+        with self.lock:
+            pool, self.pool, self.slots = self.pool, None, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+executor = HashingExecutor()
+
+
+@receiver(setting_changed)
+def reset_executor(*, setting, **kwargs):
+    if setting.startswith("PASSWORD_HASHING_"):
+        executor.shutdown()
+
+
+def make_password(password):
+    """
+    `django.contrib.auth.hashers.make_password`, hashed by the executor.
+    """
+    if password is None:
+        return hashers.make_password(None)
+
+    return executor.run(_encode, password, hashers.get_hasher().algorithm)
+
+
+async def amake_password(password):
+    if password is None:
+        return hashers.make_password(None)
+
+    return await executor.arun(_encode, password, hashers.get_hasher().algorithm)
+
+
+def make_passwords(passwords):
+    """
+    Hash a batch of passwords at once, see `HashingExecutor.map`.
+    """
+    passwords = list(passwords)
+    algorithm = hashers.get_hasher().algorithm
+    return executor.map(_encode, passwords, [algorithm] * len(passwords))
+
+
+def check_password(password, encoded, setter=None):
+    """
+    `django.contrib.auth.hashers.check_password`, verified by the executor.
+    """
+    if password is None or not hashers.is_password_usable(encoded):
+        return False
+
+    preferred = hashers.get_hasher()
+    try:
+        hasher = hashers.identify_hasher(encoded)
+    except ValueError:
+        return False
+
+    hasher_changed = hasher.algorithm != preferred.algorithm
+    must_update = hasher_changed or preferred.must_update(encoded)
+    is_correct = executor.run(
+        _verify, password, encoded, not hasher_changed and must_update
+    )
+
+    if setter and is_correct and must_update:
+        setter(password)
+    return is_correct
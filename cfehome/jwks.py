@@ -0,0 +1,176 @@
+import functools
+import hashlib
+import json
+from pathlib import Path
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from cryptography.hazmat.primitives.serialization import (
+    load_pem_private_key,
+    load_pem_public_key,
+)
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import TokenBackendError
+from rest_framework_simplejwt.settings import api_settings
+
+
+class SigningKey:
+    """
+    An asymmetric JWT key identified by its RFC 7638 thumbprint.
+
+    `private_key` is None for keys that are only used to verify tokens.
+    """
+
+    def __init__(self, key):
+        if isinstance(key, (rsa.RSAPrivateKey, ed25519.Ed25519PrivateKey)):
+            self.private_key = key
+            self.public_key = key.public_key()
+        elif isinstance(key, (rsa.RSAPublicKey, ed25519.Ed25519PublicKey)):
+            self.private_key = None
+            self.public_key = key
+        else:
+            raise ImproperlyConfigured("JWT keys must be RSA or Ed25519 keys.")
+
+        if isinstance(self.public_key, rsa.RSAPublicKey):
+            self.algorithm = "RS256"
+            jwk = RSAAlgorithm.to_jwk(self.public_key, as_dict=True)
+            required = ("e", "kty", "n")
+        else:
+            self.algorithm = "EdDSA"
+            jwk = OKPAlgorithm.to_jwk(self.public_key, as_dict=True)
+            required = ("crv", "kty", "x")
+
+        thumbprint = json.dumps(
+            {name: jwk[name] for name in required}, separators=(",", ":")
+        )
+        self.kid = jwt.utils.base64url_encode(
+            hashlib.sha256(thumbprint.encode()).digest()
+        ).decode()
+        self.jwk = {**jwk, "kid": self.kid, "alg": self.algorithm, "use": "sig"}
+
+    @classmethod
+    def load(cls, value):
+        """
+        Load a key from PEM text or from the path of a PEM file.
+        """
+        pem = value if "-----BEGIN" in value else Path(value).read_text()
+        pem = pem.encode()
+
+        if b"PRIVATE KEY" in pem:
+            return cls(load_pem_private_key(pem, password=None))
+        return cls(load_pem_public_key(pem))
+
+
+class KeyRing:
+    """
+    The keys tokens are signed and verified with.
+
+    The first key signs new tokens. Every key is accepted when verifying, so
+    keys can be rotated with an overlap: publish the next key before signing
+    with it, and keep the previous one until the tokens it signed expire.
+    """
+
+    def __init__(self, keys):
+        self.keys = {key.kid: key for key in keys}
+        self.signing_key = keys[0] if keys else None
+
+        if self.signing_key and self.signing_key.private_key is None:
+            raise ImproperlyConfigured(
+                "The first key of JWT_SIGNING_KEY_FILES must be a private key."
+            )
+
+        self.jwks = json.dumps(
+            {"keys": [key.jwk for key in keys]}, separators=(",", ":")
+        ).encode()
+        self.etag = hashlib.sha256(self.jwks).hexdigest()[:32]
+
+    def get(self, kid):
+        return self.keys.get(kid)
+
+
+@functools.lru_cache(maxsize=None)
+def get_key_ring():
+    return KeyRing(
+        [SigningKey.load(value) for value in settings.JWT_SIGNING_KEY_FILES]
+    )
+
+
+@receiver(setting_changed)
+def reset_key_ring(*, setting, **kwargs):
+    if setting == "JWT_SIGNING_KEY_FILES":
+        get_key_ring.cache_clear()
+
+
+class KeyRingTokenBackend(TokenBackend):
+    """
+    Token backend signing with the active key of the key ring.
+
+    Tokens carry the id of their key in the `kid` header, which is how they
+    are matched with a key when verified, here or by any service reading
+    the JWKS. Without configured keys, the `SIMPLE_JWT` HMAC settings are
+    used unchanged.
+    """
+
+    def encode(self, payload):
+        key = get_key_ring().signing_key
+        if key is None:
+            return super().encode(payload)
+
+        jwt_payload = payload.copy()
+        if self.audience is not None:
+            jwt_payload["aud"] = self.audience
+        if self.issuer is not None:
+            jwt_payload["iss"] = self.issuer
+
+        return jwt.encode(
+            jwt_payload,
+            key.private_key,
+            algorithm=key.algorithm,
+            headers={"kid": key.kid},
+            json_encoder=self.json_encoder,
+        )
+
+    def decode(self, token, verify=True):
+        ring = get_key_ring()
+        if ring.signing_key is None:
+            return super().decode(token, verify=verify)
+
+        try:
+            key = ring.get(jwt.get_unverified_header(token).get("kid"))
+            if key is None:
+                raise TokenBackendError(_("Token is invalid or expired"))
+
+            return jwt.decode(
+                token,
+                key.public_key,
+                algorithms=[key.algorithm],
+                audience=self.audience,
+                issuer=self.issuer,
+                leeway=self.get_leeway(),
+                options={
+                    "verify_aud": self.audience is not None,
+                    "verify_signature": verify,
+                },
+            )
+        except jwt.InvalidAlgorithmError as ex:
+            raise TokenBackendError(_("Invalid algorithm specified")) from ex
+        except jwt.InvalidTokenError as ex:
+            raise TokenBackendError(_("Token is invalid or expired")) from ex
+
+
+token_backend = KeyRingTokenBackend(
+    api_settings.ALGORITHM,
+    api_settings.SIGNING_KEY,
+    api_settings.VERIFYING_KEY,
+    api_settings.AUDIENCE,
+    api_settings.ISSUER,
+    None,
+    api_settings.LEEWAY,
+    api_settings.JSON_ENCODER,
+)
@@ -0,0 +1,92 @@
+import functools
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.template import Engine
+
+from accounts.models import OutboundEmail
+
+
+@functools.lru_cache(maxsize=None)
+def get_email_engine():
+    """
+    Template engine used to render queued emails.
+
+    It always uses the cached loader, so each email template is read and
+    compiled once per worker process regardless of DEBUG.
+    """
+    return Engine(
+        dirs=[settings.BASE_DIR / "templates"],
+        loaders=[
+            (
+                "django.template.loaders.cached.Loader",
+                [
+                    "django.template.loaders.filesystem.Loader",
+                    "django.template.loaders.app_directories.Loader",
+                ],
+            ),
+        ],
+    )
+
+
+def render_email(email):
+    """
+    Render the bodies of an email that was queued with templates.
+    """
+    engine = get_email_engine()
+
+    if email.template_text:
+        email.body = engine.render_to_string(email.template_text, email.context)
+    if email.template_html:
+        email.html_body = engine.render_to_string(email.template_html, email.context)
+
+
+def send_queued_emails(
+    batch_size=None, max_attempts=None, retry_backoff=None, lock_timeout=None
+):
+    """
+    Claim one batch of queued emails and deliver it over a single connection.
+
+    Returns the number of messages that were claimed, so callers can keep
+    draining until the queue is empty.
+    """
+    batch_size = batch_size or settings.EMAIL_QUEUE_BATCH_SIZE
+    max_attempts = max_attempts or settings.EMAIL_QUEUE_MAX_ATTEMPTS
+    retry_backoff = retry_backoff or settings.EMAIL_QUEUE_RETRY_BACKOFF
+    lock_timeout = lock_timeout or settings.EMAIL_QUEUE_LOCK_TIMEOUT
+
+    emails = OutboundEmail.objects.claim_batch(batch_size, lock_timeout)
+    if not emails:
+        return 0
+
+    connection = get_connection(fail_silently=False)
+
+    try:
+        connection.open()
+    except Exception as e:
+        for email in emails:
+            email.mark_failed(e, max_attempts, retry_backoff)
+        return len(emails)
+
+    try:
+        for email in emails:
+            try:
+                render_email(email)
+                sent = connection.send_messages([email.to_message(connection)])
+            except Exception as e:
+                # Drop the (possibly broken) connection, the next message
+                # reopens it.
+                connection.close()
+                email.mark_failed(e, max_attempts, retry_backoff)
+                continue
+
+            if sent:
+                email.mark_sent()
+            else:
+                email.mark_failed(
+                    "Backend did not accept the message", max_attempts, retry_backoff
+                )
+    finally:
+        connection.close()
+
+    return len(emails)
@@ -0,0 +1,52 @@
+from django.contrib.postgres import operations
+from django.db.migrations import AddIndex, RemoveIndex
+
+
+class AddIndexConcurrently(operations.AddIndexConcurrently):
+    """
+    Build an index without blocking writes to the table: CREATE INDEX
+    CONCURRENTLY on PostgreSQL, a plain AddIndex on other databases.
+
+    The migration must set `atomic = False`.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            AddIndex.database_forwards(
+                self, app_label, schema_editor, from_state, to_state
+            )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            AddIndex.database_backwards(
+                self, app_label, schema_editor, from_state, to_state
+            )
+
+
+class RemoveIndexConcurrently(operations.RemoveIndexConcurrently):
+    """
+    Drop an index with DROP INDEX CONCURRENTLY on PostgreSQL, a plain
+    RemoveIndex on other databases.
+
+    The migration must set `atomic = False`.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            RemoveIndex.database_forwards(
+                self, app_label, schema_editor, from_state, to_state
+            )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            RemoveIndex.database_backwards(
+                self, app_label, schema_editor, from_state, to_state
+            )
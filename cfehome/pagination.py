@@ -1,8 +1,452 @@
-from rest_framework.pagination import PageNumberPagination
+import datetime
+import decimal
+import hashlib
+import json
+import uuid
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.compat import coreapi, coreschema
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    Cursor,
+    CursorPagination,
+    PageNumberPagination,
+    _reverse_ordering,
+)
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .cache import bump_versions, get_versions
+
+
+def count_version_key(model):
+    return f"pagination:count:version:{model._meta.label_lower}"
+
+
+def invalidate_counts(model):
+    """
+    Invalidate every cached count of `model`, called whenever rows of the
+    model are written.
+    """
+    bump_versions([count_version_key(model)])
+
+
+def estimate_count(queryset):
+    """
+    Return the planner's row estimate for `queryset`, or None when the
+    database can't provide one.
+
+    Unfiltered querysets use the table statistics in `pg_class`; filtered
+    ones use the row estimate of the top node of the query plan.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [connection.ops.quote_name(queryset.model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+            # reltuples is -1 for tables that were never analyzed
+            return row[0] if row and row[0] >= 0 else None
+
+        sql, params = queryset.query.sql_with_params()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]["Plan"]["Plan Rows"]
+
+
+def cached_count(queryset, timeout):
+    """
+    Return the exact count of `queryset`, cached per query for `timeout`
+    seconds and until the model's rows are next written.
+    """
+    version = get_versions([count_version_key(queryset.model)])
+    sql, params = queryset.query.sql_with_params()
+    signature = hashlib.sha1(repr((queryset.db, sql, params)).encode()).hexdigest()
+    key = f"pagination:count:{queryset.model._meta.label_lower}:{signature}"
+
+    entry = cache.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    count = queryset.count()
+    cache.set(key, (version, count), timeout)
+    return count
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination that seeks on every column of the ordering.
+
+    DRF's CursorPagination only positions on the first ordering field and
+    falls back to an OFFSET inside runs of equal values. Here the cursor
+    carries the value of every ordering field, with the primary key appended
+    as a tie-breaker, so each page is a range scan over the matching index
+    and no COUNT or OFFSET is ever issued.
+
+    The ordering is taken from the view's OrderingFilter, then from the
+    view's `keyset_ordering` attribute, then from `ordering` below.
+    """
+
+    page_size = 10
+    page_size_query_param = "limit"
+    max_page_size = 1000
+    ordering = ("-pk",)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.fields = [
+            self._get_field(queryset.model, order.lstrip("-"))
+            for order in self.ordering
+        ]
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None:
+            queryset = queryset.filter(self._seek(ordering, self.cursor.position))
+
+        results = list(queryset[: self.page_size + 1])
+        self.page = results[: self.page_size]
+        has_more = len(results) > self.page_size
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        ordering = None
+        for filter_cls in getattr(view, "filter_backends", []):
+            if hasattr(filter_cls, "get_ordering"):
+                ordering = filter_cls().get_ordering(request, queryset, view)
+                break
+
+        if not ordering:
+            ordering = getattr(view, "keyset_ordering", None) or self.ordering
+
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        ordering = tuple(ordering)
+
+        assert not any("__" in order for order in ordering), (
+            "Keyset pagination does not support double underscore lookups "
+            "for orderings."
+        )
+
+        pk_name = queryset.model._meta.pk.name
+        if not {"pk", pk_name} & {order.lstrip("-") for order in ordering}:
+            ordering += ("-pk",) if ordering[0].startswith("-") else ("pk",)
+
+        return ordering
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+
+        cursor = Cursor(
+            offset=0, reverse=False, position=self._get_position(self.page[-1])
+        )
+        return self.encode_cursor(cursor)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+
+        cursor = Cursor(
+            offset=0, reverse=True, position=self._get_position(self.page[0])
+        )
+        return self.encode_cursor(cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            tokens = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            reverse = bool(tokens.get("r", False))
+            values = tokens["p"]
+
+            if len(values) != len(self.fields):
+                raise ValueError("Cursor does not match the ordering")
+
+            position = [
+                field.to_python(value) for field, value in zip(self.fields, values)
+            ]
+        except (TypeError, ValueError, KeyError, AttributeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return Cursor(offset=0, reverse=reverse, position=position)
+
+    def encode_cursor(self, cursor):
+        tokens = {"p": [self._encode_value(value) for value in cursor.position]}
+        if cursor.reverse:
+            tokens["r"] = 1
+
+        encoded = urlsafe_b64encode(
+            json.dumps(tokens, separators=(",", ":")).encode()
+        ).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _get_field(self, model, name):
+        if name == "pk":
+            return model._meta.pk
+        return model._meta.get_field(name)
+
+    def _get_position(self, instance):
+        return [getattr(instance, field.attname) for field in self.fields]
+
+    def _seek(self, ordering, position):
+        """
+        Build `(a, b, ...) > (x, y, ...)` for mixed sort directions:
+        `a > x OR (a = x AND b > y) OR ...`.
+        """
+        condition = Q()
+        equal = Q()
+
+        for order, field, value in zip(ordering, self.fields, position):
+            lookup = "lt" if order.startswith("-") else "gt"
+            condition |= equal & Q(**{f"{field.name}__{lookup}": value})
+            equal &= Q(**{field.name: value})
+
+        return condition
+
+    @staticmethod
+    def _encode_value(value):
+        if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+            return value.isoformat()
+        if isinstance(value, (decimal.Decimal, uuid.UUID)):
+            return str(value)
+        return value
+
+
+class EstimatedCountPage(Page):
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class EstimatedCountPaginator(DjangoPaginator):
+    """
+    Paginator that reports the planner's estimate instead of counting
+    results that are larger than `estimate_threshold`.
+
+    Smaller results are counted exactly and the count is cached. When the
+    count is an estimate the page bounds can't be trusted, so pages past the
+    estimate are still served and `has_next` is decided by fetching one extra
+    row.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.estimate_threshold = settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD
+        self.count_timeout = settings.PAGINATION_COUNT_CACHE_TIMEOUT
+        self._count_exact = True
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not hasattr(queryset, "query"):
+            return super().count
+
+        estimate = estimate_count(queryset)
+        if estimate is not None and estimate >= self.estimate_threshold:
+            self._count_exact = False
+            return estimate
+
+        return cached_count(queryset, self.count_timeout)
+
+    @property
+    def count_exact(self):
+        self.count
+        return self._count_exact
+
+    def validate_number(self, number):
+        if self.count_exact:
+            return super().validate_number(number)
+
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages["invalid_page"])
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if self.count_exact:
+            return super().page(number)
+
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom : bottom + self.per_page + 1])
+        return EstimatedCountPage(
+            rows[: self.per_page], number, self, has_next=len(rows) > self.per_page
+        )
 
 
 class StandardResultPagination(PageNumberPagination):
+    """
+    Page number pagination, with keyset pagination available on request.
+
+    Passing `?pagination=cursor` (or following a `cursor` link) switches the
+    request to `KeysetPagination`, which avoids the COUNT and deep OFFSET
+    queries of page numbers on large tables. Views that should always use
+    keyset pagination can set `pagination_class = KeysetPagination`.
+    """
+
     page_size = 10
     page_size_query_param = "limit"
     page_query_param = "page"
     max_page_size = 1000
+
+    keyset_pagination_class = KeysetPagination
+    pagination_mode_query_param = "pagination"
+    keyset_pagination_mode = "cursor"
+
+    keyset = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_keyset_pagination(request):
+            self.keyset = self.keyset_pagination_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+
+        return super().paginate_queryset(queryset, request, view)
+
+    def use_keyset_pagination(self, request):
+        return (
+            request.query_params.get(self.pagination_mode_query_param)
+            == self.keyset_pagination_mode
+            or self.keyset_pagination_class.cursor_query_param in request.query_params
+        )
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_html_context(self):
+        if self.keyset is not None:
+            return self.keyset.get_html_context()
+        return super().get_html_context()
+
+    def to_html(self):
+        if self.keyset is not None:
+            return self.keyset.to_html()
+        return super().to_html()
+
+    def get_schema_fields(self, view):
+        assert coreapi is not None, "coreapi must be installed to use `get_schema_fields()`"
+        assert coreschema is not None, "coreschema must be installed to use `get_schema_fields()`"
+
+        return super().get_schema_fields(view) + [
+            coreapi.Field(
+                name=self.pagination_mode_query_param,
+                required=False,
+                location="query",
+                schema=coreschema.Enum(
+                    [self.keyset_pagination_mode],
+                    title="Pagination mode",
+                    description="Set to `cursor` to use cursor pagination.",
+                ),
+            ),
+            coreapi.Field(
+                name=self.keyset_pagination_class.cursor_query_param,
+                required=False,
+                location="query",
+                schema=coreschema.String(
+                    title="Cursor",
+                    description=str(
+                        self.keyset_pagination_class.cursor_query_description
+                    ),
+                ),
+            ),
+        ]
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                "name": self.pagination_mode_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to `cursor` to use cursor pagination.",
+                "schema": {"type": "string", "enum": [self.keyset_pagination_mode]},
+            },
+            {
+                "name": self.keyset_pagination_class.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": str(
+                    self.keyset_pagination_class.cursor_query_description
+                ),
+                "schema": {"type": "string"},
+            },
+        ]
+
+
+class EstimatedCountPagination(StandardResultPagination):
+    """
+    Page number pagination that doesn't run an exact COUNT on large results.
+
+    Results estimated above `PAGINATION_COUNT_ESTIMATE_THRESHOLD` rows report
+    the planner's estimate; smaller ones are counted and cached per query.
+    The `count_exact` field of the response tells clients which one they got.
+    """
+
+    django_paginator_class = EstimatedCountPaginator
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return super().get_paginated_response(data)
+
+        return Response(
+            OrderedDict(
+                [
+                    ("count", self.page.paginator.count),
+                    ("count_exact", self.page.paginator.count_exact),
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count_exact"] = {
+            "type": "boolean",
+            "example": True,
+        }
+        return response_schema
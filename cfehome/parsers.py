@@ -0,0 +1,97 @@
+import codecs
+import csv
+import io
+import json
+
+import msgpack
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+
+def read_csv(lines):
+    """
+    Yield (line number, row dict) for each record of a CSV file with a
+    header row.
+    """
+    reader = csv.DictReader(lines)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def read_ndjson(lines):
+    """
+    Yield (line number, value) for each non-blank line of a newline
+    delimited JSON file; lines that aren't valid JSON yield None.
+    """
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError:
+            yield number, None
+
+
+class StreamingParser(BaseParser):
+    """
+    Parses the request body lazily: `request.data` is a generator over its
+    records, read from the body stream as it is consumed.
+    """
+
+    reader = None
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+
+        if stream is None:
+            return iter(())
+        return self.reader(codecs.getreader(encoding)(stream))
+
+
+class CSVParser(StreamingParser):
+    media_type = "text/csv"
+    reader = staticmethod(read_csv)
+
+
+class NDJSONParser(StreamingParser):
+    media_type = "application/x-ndjson"
+    reader = staticmethod(read_ndjson)
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSONParser decoding UTF-8 bodies with orjson. Bodies orjson rejects are
+    handed to JSONParser, which accepts a few more (e.g. integers over 64
+    bits) and reports the errors.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        body = stream.read()
+
+        if codecs.lookup(encoding).name == "utf-8":
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+
+        return super().parse(io.BytesIO(body), media_type, parser_context)
+
+
+class MessagePackParser(BaseParser):
+    """
+    Parses MessagePack request bodies. Timestamps are read as timezone-aware
+    datetimes.
+    """
+
+    media_type = "application/msgpack"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), timestamp=3)
+        except (ValueError, TypeError, msgpack.UnpackException) as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
@@ -0,0 +1,133 @@
+import csv
+import datetime
+
+import msgpack
+import orjson
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+
+class Echo:
+    """
+    File-like object whose `write` returns what it is given, so a
+    `csv.writer` produces one line at a time.
+    """
+
+    def write(self, value):
+        return value
+
+
+class StreamingRenderer(BaseRenderer):
+    """
+    Renders rows of `fields` as they are produced: `stream` returns an
+    iterator of encoded lines for a StreamingHttpResponse. Regular response
+    data, e.g. errors, is rendered as a single record.
+    """
+
+    charset = "utf-8"
+
+    def stream(self, rows, fields):
+        raise NotImplementedError
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        records = data if isinstance(data, list) else [data]
+        fields = list(records[0]) if records else []
+        rows = ([record.get(field) for field in fields] for record in records)
+        return b"".join(self.stream(rows, fields))
+
+
+class CSVRenderer(StreamingRenderer):
+    """
+    Renders rows as CSV. Text cells that a spreadsheet would read as a
+    formula are prefixed with a quote (CSV injection).
+    """
+
+    media_type = "text/csv"
+    format = "csv"
+    formula_prefixes = ("=", "+", "-", "@", "\t", "\r")
+
+    def format_value(self, value):
+        # Datetimes are written as in JSON responses and NDJSON.
+        if isinstance(value, datetime.datetime):
+            return DjangoJSONEncoder().default(value)
+        if isinstance(value, str) and value.startswith(self.formula_prefixes):
+            return f"'{value}"
+        return value
+
+    def stream(self, rows, fields):
+        writer = csv.writer(Echo())
+        yield writer.writerow(fields).encode(self.charset)
+        for row in rows:
+            yield writer.writerow([self.format_value(value) for value in row]).encode(
+                self.charset
+            )
+
+
+class NDJSONRenderer(StreamingRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def stream(self, rows, fields):
+        encoder = DjangoJSONEncoder()
+        for row in rows:
+            yield (encoder.encode(dict(zip(fields, row))) + "\n").encode(self.charset)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson.
+
+    The output is the same as JSONRenderer's: datetimes, dates and times are
+    handed to DRF's encoder rather than orjson's own (which writes UTC as
+    "+00:00" instead of "Z"), and so are Decimals, lazy strings and the
+    other types orjson doesn't know. Indented, ASCII-only and non-compact output, and
+    anything orjson can't encode (e.g. integers over 64 bits), go through
+    JSONRenderer itself.
+    """
+
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default, option=self.options
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # As JSONRenderer, escape the line terminators JavaScript doesn't
+        # allow in strings.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renders MessagePack, for service-to-service clients that ask for it.
+
+    Values MessagePack has no type for (datetimes, Decimals, UUIDs, lazy
+    strings) are converted as for JSON, so both formats carry the same data.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        return msgpack.packb(data, default=encoders.JSONEncoder().default)
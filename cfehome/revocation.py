@@ -0,0 +1,125 @@
+import threading
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from accounts.models import RefreshTokenFamily
+
+from . import metrics
+from .bloom import BloomFilter
+
+
+class RevocationFilter:
+    """
+    Per-process Bloom filter of revoked refresh token families.
+
+    A miss means the family is definitely not revoked and costs no query.
+    A hit is confirmed against the database, since it may be a false
+    positive. The filter is built from the database on first use and then
+    synced incrementally, at most every `REVOCATION_FILTER_SYNC_INTERVAL`
+    seconds, with the families revoked since the last sync. Revocations made
+    by this process are added immediately.
+    """
+
+    # Families revoked by transactions that committed after a sync may
+    # carry a slightly older timestamp, so every sync looks back this far.
+    overlap = timedelta(seconds=30)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bloom = None
+        self.count = 0
+        self.watermark = None
+        self.synced_at = 0
+
+    def rebuild(self):
+        revoked = RefreshTokenFamily.objects.filter(revoked_at__isnull=False)
+        capacity = max(settings.REVOCATION_FILTER_CAPACITY, revoked.count() * 2)
+
+        self.bloom = BloomFilter(capacity, settings.REVOCATION_FILTER_ERROR_RATE)
+        self.count = 0
+        self.watermark = None
+        self.load(revoked)
+        metrics.incr("revocation_filter.rebuild")
+
+    def load(self, queryset):
+        since = self.watermark
+        for pk, revoked_at in queryset.values_list("pk", "revoked_at").iterator():
+            self.bloom.add(str(pk))
+            # Rows of the overlap window were already added and counted.
+            if since is None or revoked_at > since:
+                self.count += 1
+            if self.watermark is None or revoked_at > self.watermark:
+                self.watermark = revoked_at
+
+    def sync_due(self):
+        interval = settings.REVOCATION_FILTER_SYNC_INTERVAL
+        return self.bloom is None or time.monotonic() - self.synced_at >= interval
+
+    def sync(self, force=False):
+        now = time.monotonic()
+        if not force and not self.sync_due():
+            return
+
+        with self.lock:
+            if self.bloom is None or self.count > self.bloom.capacity:
+                self.rebuild()
+            elif self.watermark is None:
+                self.load(RefreshTokenFamily.objects.filter(revoked_at__isnull=False))
+            else:
+                self.load(
+                    RefreshTokenFamily.objects.filter(
+                        revoked_at__gte=self.watermark - self.overlap
+                    )
+                )
+            self.synced_at = now
+
+    def add(self, family_id):
+        with self.lock:
+            if self.bloom is not None:
+                self.bloom.add(str(family_id))
+
+    def might_be_revoked(self, family_id):
+        metrics.incr("revocation_filter.lookup")
+        if str(family_id) not in self.bloom:
+            return False
+
+        metrics.incr("revocation_filter.positive")
+        return True
+
+    def is_revoked(self, family_id):
+        self.sync()
+        if not self.might_be_revoked(family_id):
+            return False
+
+        if RefreshTokenFamily.objects.active().filter(pk=family_id).exists():
+            metrics.incr("revocation_filter.false_positive")
+            return False
+        return True
+
+    async def ais_revoked(self, family_id):
+        """
+        `is_revoked` for async callers; only syncs and positives leave the
+        event loop.
+        """
+        if self.sync_due():
+            await sync_to_async(self.sync)()
+        if not self.might_be_revoked(family_id):
+            return False
+
+        if await RefreshTokenFamily.objects.active().filter(pk=family_id).aexists():
+            metrics.incr("revocation_filter.false_positive")
+            return False
+        return True
+
+    def clear(self):
+        with self.lock:
+            self.bloom = None
+            self.count = 0
+            self.watermark = None
+            self.synced_at = 0
+
+
+revocation_filter = RevocationFilter()
@@ -122,10 +122,48 @@ DATABASES = {
     "default": env.db(),
 }
 
+# Cache shared by all processes, e.g. redis://localhost:6379/0. The user,
+# permission and response caches, throttling and the login buffer keep their
+# state in it, so the process-local default is only fit for development; see
+# cfehome.checks.
+CACHES = {
+    "default": env.cache_url("CACHE_URL", default="locmemcache://"),
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
+# Hasher of new passwords: "argon2" (Argon2id) or "pbkdf2". Hashes made with
+# the other one are still accepted and upgraded on the next login.
+PASSWORD_HASHER = env("PASSWORD_HASHER", default="argon2")
+PASSWORD_HASHERS = [
+    "cfehome.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+]
+if PASSWORD_HASHER == "pbkdf2":
+    PASSWORD_HASHERS.reverse()
+# Extra hashers, e.g. of a legacy system's password hashes imported with
+# bulk_import_accounts; they are upgraded on the next login.
+PASSWORD_HASHERS += env.list("LEGACY_PASSWORD_HASHERS", default=[])
+
+# Argon2id cost parameters (memory in KiB)
+ARGON2_TIME_COST = env("ARGON2_TIME_COST", cast=int, default=2)
+ARGON2_MEMORY_COST = env("ARGON2_MEMORY_COST", cast=int, default=19456)
+ARGON2_PARALLELISM = env("ARGON2_PARALLELISM", cast=int, default=1)
+
+# Number of application processes per host (gunicorn reads it too). Unset,
+# one per core is assumed.
+WEB_CONCURRENCY = env("WEB_CONCURRENCY", cast=int, default=None)
+# Process pool passwords are hashed in, see cfehome.hashing.HashingExecutor.
+# Defaults to each application process's share of the cores, i.e.
+# cores // WEB_CONCURRENCY and at least 1; 0 hashes in the request thread.
+PASSWORD_HASHING_WORKERS = env("PASSWORD_HASHING_WORKERS", cast=int, default=None)
+PASSWORD_HASHING_QUEUE_SIZE = env("PASSWORD_HASHING_QUEUE_SIZE", cast=int, default=32)
+PASSWORD_HASHING_QUEUE_TIMEOUT = env(
+    "PASSWORD_HASHING_QUEUE_TIMEOUT", cast=float, default=2
+)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -170,19 +208,51 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "cfehome.authentication.CachedJWTAuthentication",
+    ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "cfehome.renderers.ORJSONRenderer",
+        "cfehome.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "cfehome.parsers.ORJSONParser",
+        "cfehome.parsers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ),
     "DEFAULT_PAGINATION_CLASS": "cfehome.pagination.StandardResultPagination",
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
     "DEFAULT_SCHEMA_CLASS": "rest_framework.schemas.coreapi.AutoSchema",
+    # Token bucket rates of cfehome.throttling, as "<throttle_scope>.<kind>"
+    "DEFAULT_THROTTLE_RATES": {
+        "login.ip": env("THROTTLE_LOGIN_IP", default="20/min"),
+        "login.email": env("THROTTLE_LOGIN_EMAIL", default="10/min"),
+        "login.global": env("THROTTLE_LOGIN_GLOBAL", default="600/min"),
+        "register.ip": env("THROTTLE_REGISTER_IP", default="10/hour"),
+        "register.global": env("THROTTLE_REGISTER_GLOBAL", default="120/min"),
+        "email.ip": env("THROTTLE_EMAIL_IP", default="10/hour"),
+        "email.email": env("THROTTLE_EMAIL_EMAIL", default="3/hour"),
+        "email.global": env("THROTTLE_EMAIL_GLOBAL", default="120/min"),
+    },
+    # Number of proxies in front of the application. Client IPs are only read
+    # from X-Forwarded-For when it is set, since clients can send the header
+    # themselves.
+    "NUM_PROXIES": env("NUM_PROXIES", cast=int, default=0),
 }
 
+# Count strategy of cfehome.pagination.EstimatedCountPagination
+PAGINATION_COUNT_ESTIMATE_THRESHOLD = env(
+    "PAGINATION_COUNT_ESTIMATE_THRESHOLD", cast=int, default=100000
+)
+PAGINATION_COUNT_CACHE_TIMEOUT = env("PAGINATION_COUNT_CACHE_TIMEOUT", cast=int, default=30)
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": True,
-    "BLACKLIST_AFTER_ROTATION": True,
-    "UPDATE_LAST_LOGIN": True,
+    "BLACKLIST_AFTER_ROTATION": False,
+    "UPDATE_LAST_LOGIN": False,
     "ALGORITHM": "HS256",
     "SIGNING_KEY": SECRET_KEY,
     "AUDIENCE": "spek-n-boonen.be",
@@ -192,10 +262,69 @@ SIMPLE_JWT = {
     "USER_ID_FIELD": "id",
     "USER_ID_CLAIM": "user_id",
     "USER_AUTHENTICATION_RULE": "rest_framework_simplejwt.authentication.default_user_authentication_rule",
+    "AUTH_TOKEN_CLASSES": ("cfehome.tokens.AccessToken",),
+    "TOKEN_OBTAIN_SERIALIZER": "accounts.serializers.TokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "accounts.serializers.TokenRefreshSerializer",
+    "TOKEN_VERIFY_SERIALIZER": "accounts.serializers.TokenVerifySerializer",
 }
 
+# RSA/Ed25519 keys (PEM text or file paths) JWTs are signed with, see
+# cfehome.jwks.KeyRing. The first one signs, the others are only accepted for
+# verification during a rotation. Without keys, SIMPLE_JWT's HS256 is used.
+JWT_SIGNING_KEY_FILES = env.list("JWT_SIGNING_KEY_FILES", default=[])
+JWKS_MAX_AGE = env("JWKS_MAX_AGE", cast=int, default=3600)
+
 AUTH_USER_MODEL = "accounts.Account"
 
+AUTHENTICATION_BACKENDS = ["cfehome.backends.CachedModelBackend"]
+
+# Cache of authenticated users, see cfehome.authentication.UserCache
+USER_CACHE_TIMEOUT = env("USER_CACHE_TIMEOUT", cast=int, default=300)
+USER_CACHE_LOCAL_TTL = env("USER_CACHE_LOCAL_TTL", cast=int, default=5)
+USER_CACHE_LOCAL_SIZE = env("USER_CACHE_LOCAL_SIZE", cast=int, default=1024)
+
+# In-memory filter of revoked token sessions, see cfehome.revocation
+REVOCATION_FILTER_CAPACITY = env("REVOCATION_FILTER_CAPACITY", cast=int, default=100000)
+REVOCATION_FILTER_ERROR_RATE = env(
+    "REVOCATION_FILTER_ERROR_RATE", cast=float, default=0.001
+)
+REVOCATION_FILTER_SYNC_INTERVAL = env(
+    "REVOCATION_FILTER_SYNC_INTERVAL", cast=int, default=5
+)
+
+# Cached "account exists" / "superuser exists" flags of the admin bootstrap views
+BOOTSTRAP_CACHE_TIMEOUT = env("BOOTSTRAP_CACHE_TIMEOUT", cast=int, default=3600)
+ADMIN_EXISTS_MAX_AGE = env("ADMIN_EXISTS_MAX_AGE", cast=int, default=30)
+
+# Cache of resolved permission sets, see cfehome.backends.CachedModelBackend.
+# Entries are invalidated on every change; the timeout only bounds how long a
+# change made behind the signals' back (e.g. in SQL) goes unnoticed.
+PERMISSION_CACHE_TIMEOUT = env("PERMISSION_CACHE_TIMEOUT", cast=int, default=300)
+
+# In-process cache of near-static list responses, see cfehome.views.CachedListMixin
+RESPONSE_CACHE_TIMEOUT = env("RESPONSE_CACHE_TIMEOUT", cast=int, default=300)
+RESPONSE_CACHE_SIZE = env("RESPONSE_CACHE_SIZE", cast=int, default=256)
+
+# Account imports, see accounts.importers.AccountImporter. Rows per chunk, and
+# the most rows a single request to the import endpoint may send.
+BULK_IMPORT_CHUNK_SIZE = env("BULK_IMPORT_CHUNK_SIZE", cast=int, default=1000)
+BULK_IMPORT_MAX_ROWS = env("BULK_IMPORT_MAX_ROWS", cast=int, default=10000)
+# Most plain text passwords a request may send, hashed in the shared pool
+# without going through its queue.
+BULK_IMPORT_MAX_PASSWORDS = env("BULK_IMPORT_MAX_PASSWORDS", cast=int, default=100)
+
+# Most ids a single bulk group membership or permission request may send
+BULK_ASSIGNMENT_MAX_ITEMS = env("BULK_ASSIGNMENT_MAX_ITEMS", cast=int, default=10000)
+
+# Rows fetched per round trip by the streaming account export
+ACCOUNT_EXPORT_CHUNK_SIZE = env("ACCOUNT_EXPORT_CHUNK_SIZE", cast=int, default=2000)
+
+# Shared cache buffer of logins written to Account.last_login by flush_login_buffer,
+# see AccountManager.record_login. Logins not flushed in time are lost.
+LOGIN_BUFFER_TIMEOUT = env("LOGIN_BUFFER_TIMEOUT", cast=int, default=86400)
+LOGIN_BUFFER_BATCH_SIZE = env("LOGIN_BUFFER_BATCH_SIZE", cast=int, default=1000)
+LOGIN_BUFFER_FLUSH_INTERVAL = env("LOGIN_BUFFER_FLUSH_INTERVAL", cast=int, default=60)
+
 
 SWAGGER_SETTINGS = {
     "SECURITY_DEFINITIONS": {
@@ -208,8 +337,18 @@ SWAGGER_SETTINGS = {
     "LOGIN_URL": "admin:login",
     "LOGOUT_URL": "admin:logout",
     "DEFAULT_AUTO_SCHEMA_CLASS": "cfehome.swagger.CustomAutoSchema",
+    # The UIs load the prebuilt schema, see api.views.SchemaView
+    "SPEC_URL": ("openapi_schema", {"format": "json"}),
+}
+
+REDOC_SETTINGS = {
+    "SPEC_URL": ("openapi_schema", {"format": "json"}),
 }
 
+# Where `python manage.py generate_schema` writes the OpenAPI schema served by
+# api.views.SchemaView. Without it, the schema is generated on first request.
+SCHEMA_DIR = env("SCHEMA_DIR", cast=str, default=str(BASE_DIR / "schema"))
+
 # Email Backend Configuration
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 EMAIL_HOST = env("EMAIL_HOST", cast=str, default="")
@@ -219,6 +358,18 @@ EMAIL_PORT = env("EMAIL_PORT", cast=int, default=587)
 EMAIL_USE_TLS = env("EMAIL_USE_TLS", cast=bool, default=True)
 EMAIL_FROM = env("EMAIL_FROM")
 
+# Outbound email queue, drained by `python manage.py send_queued_emails`
+EMAIL_QUEUE_BATCH_SIZE = env("EMAIL_QUEUE_BATCH_SIZE", cast=int, default=50)
+EMAIL_QUEUE_WORKERS = env("EMAIL_QUEUE_WORKERS", cast=int, default=2)
+EMAIL_QUEUE_MAX_ATTEMPTS = env("EMAIL_QUEUE_MAX_ATTEMPTS", cast=int, default=5)
+EMAIL_QUEUE_RETRY_BACKOFF = timedelta(
+    seconds=env("EMAIL_QUEUE_RETRY_BACKOFF_SECONDS", cast=int, default=30)
+)
+EMAIL_QUEUE_LOCK_TIMEOUT = timedelta(
+    seconds=env("EMAIL_QUEUE_LOCK_TIMEOUT_SECONDS", cast=int, default=600)
+)
+EMAIL_QUEUE_POLL_INTERVAL = env("EMAIL_QUEUE_POLL_INTERVAL", cast=int, default=5)
+
 
 if not DEBUG:
     AWS_ACCESS_KEY_ID = env("AWS_ACCESS_KEY_ID")
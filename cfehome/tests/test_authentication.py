@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from accounts.models import Account
+from cfehome import metrics
+from cfehome.authentication import user_cache
+
+
+class CachedJWTAuthenticationTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        user_cache.local.clear()
+        metrics.reset()
+
+        self.user = Account.objects.create_user(
+            first_name="John",
+            last_name="Doe",
+            email="johndoe@gmail.com",
+            password="NewPassword@2022",
+        )
+        response = self.client.post(
+            reverse("accounts:login"),
+            {"email": "johndoe@gmail.com", "password": "NewPassword@2022"},
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.url = reverse("accounts:me")
+
+    def test_user_is_cached(self):
+        self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["id"], self.user.id)
+        self.assertEqual(metrics.snapshot()["user_cache.local_hit"], 1)
+
+    def test_shared_cache_is_used_when_local_cache_is_cold(self):
+        self.client.get(self.url)
+        user_cache.local.clear()
+
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        self.assertEqual(metrics.snapshot()["user_cache.shared_hit"], 1)
+
+    def test_cache_is_invalidated_on_save(self):
+        self.client.get(self.url)
+
+        self.user.first_name = "Jane"
+        self.user.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["first_name"], "Jane")
+
+    def test_inactive_user_is_rejected(self):
+        self.client.get(self.url)
+
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,118 @@
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.core.management.sql import emit_post_migrate_signal
+from django.test import TestCase
+
+from accounts.models import Account
+
+
+class CachedModelBackendTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = Account.objects.create_user(
+            first_name="John",
+            last_name="Doe",
+            email="johndoe@gmail.com",
+            password="NewPassword@2022",
+            is_staff=True,
+        )
+        self.group = Group.objects.create(name="Managers")
+        self.view_account = Permission.objects.get(codename="view_account")
+        self.change_account = Permission.objects.get(codename="change_account")
+        self.group.permissions.add(self.view_account)
+        self.user.groups.add(self.group)
+
+    def fetch_user(self):
+        # A fresh instance, as built by authentication on every request
+        return Account.objects.get(pk=self.user.pk)
+
+    def test_permissions_are_cached(self):
+        self.assertTrue(self.fetch_user().has_perm("accounts.view_account"))
+
+        user = self.fetch_user()
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_perm("accounts.view_account"))
+            self.assertFalse(user.has_perm("accounts.change_account"))
+
+    def test_group_permission_change_invalidates_cache(self):
+        self.assertFalse(self.fetch_user().has_perm("accounts.change_account"))
+
+        self.group.permissions.add(self.change_account)
+        self.assertTrue(self.fetch_user().has_perm("accounts.change_account"))
+
+        self.change_account.group_set.remove(self.group)
+        self.assertFalse(self.fetch_user().has_perm("accounts.change_account"))
+
+    def test_group_membership_change_invalidates_cache(self):
+        self.assertTrue(self.fetch_user().has_perm("accounts.view_account"))
+
+        self.group.user_set.remove(self.user)
+        self.assertFalse(self.fetch_user().has_perm("accounts.view_account"))
+
+        self.group.user_set.add(self.user)
+        self.assertTrue(self.fetch_user().has_perm("accounts.view_account"))
+
+        self.group.user_set.clear()
+        self.assertFalse(self.fetch_user().has_perm("accounts.view_account"))
+
+    def test_user_permission_change_invalidates_cache(self):
+        self.assertFalse(self.fetch_user().has_perm("accounts.change_account"))
+
+        self.user.user_permissions.add(self.change_account)
+        self.assertTrue(self.fetch_user().has_perm("accounts.change_account"))
+
+        self.change_account.user_set.clear()
+        self.assertFalse(self.fetch_user().has_perm("accounts.change_account"))
+
+    def test_group_deletion_invalidates_cache(self):
+        self.assertTrue(self.fetch_user().has_perm("accounts.view_account"))
+
+        self.group.delete()
+        self.assertFalse(self.fetch_user().has_perm("accounts.view_account"))
+
+    def test_inactive_user_has_no_permissions(self):
+        self.assertTrue(self.fetch_user().has_perm("accounts.view_account"))
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertFalse(self.fetch_user().has_perm("accounts.view_account"))
+
+    def test_new_permission_invalidates_cache(self):
+        self.user.is_superuser = True
+        self.user.save()
+        self.assertNotIn(
+            "accounts.export_account", self.fetch_user().get_all_permissions()
+        )
+
+        permission = Permission.objects.create(
+            codename="export_account",
+            name="Can export account",
+            content_type=self.view_account.content_type,
+        )
+        self.assertIn(
+            "accounts.export_account", self.fetch_user().get_all_permissions()
+        )
+
+        self.group.permissions.add(permission)
+        permission.codename = "download_account"
+        permission.save()
+        self.assertTrue(self.fetch_user().has_perm("accounts.download_account"))
+
+    def test_migrate_invalidates_cache(self):
+        self.user.is_superuser = True
+        self.user.save()
+        self.fetch_user().get_all_permissions()
+
+        Permission.objects.bulk_create(
+            [
+                Permission(
+                    codename="export_account",
+                    name="Can export account",
+                    content_type=self.view_account.content_type,
+                )
+            ]
+        )
+        emit_post_migrate_signal(0, False, "default")
+        self.assertIn(
+            "accounts.export_account", self.fetch_user().get_all_permissions()
+        )
@@ -0,0 +1,39 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from cfehome.cache import LocalTTLCache
+
+
+class LocalTTLCacheTest(SimpleTestCase):
+    def test_get_and_set(self):
+        cache = LocalTTLCache()
+        cache.set("key", "value")
+        self.assertEqual(cache.get("key"), "value")
+        self.assertIsNone(cache.get("missing"))
+
+    def test_delete(self):
+        cache = LocalTTLCache()
+        cache.set("key", "value")
+        cache.delete("key")
+        self.assertIsNone(cache.get("key"))
+
+    def test_evicts_least_recently_used(self):
+        cache = LocalTTLCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_expires_entries(self):
+        cache = LocalTTLCache(ttl=10)
+        with mock.patch("cfehome.cache.time.monotonic", return_value=100):
+            cache.set("key", "value")
+        with mock.patch("cfehome.cache.time.monotonic", return_value=109):
+            self.assertEqual(cache.get("key"), "value")
+        with mock.patch("cfehome.cache.time.monotonic", return_value=110):
+            self.assertIsNone(cache.get("key"))
@@ -0,0 +1,24 @@
+from django.test import SimpleTestCase, override_settings
+
+from cfehome.checks import check_shared_cache
+
+
+class SharedCacheCheckTest(SimpleTestCase):
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_local_memory_cache(self):
+        errors = check_shared_cache(None)
+
+        self.assertEqual([error.id for error in errors], ["cfehome.E001"])
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.redis.RedisCache",
+                "LOCATION": "redis://localhost:6379/0",
+            }
+        }
+    )
+    def test_shared_cache(self):
+        self.assertEqual(check_shared_cache(None), [])
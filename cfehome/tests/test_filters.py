@@ -0,0 +1,39 @@
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from accounts.models import Account
+from accounts.views import ListAccountsView
+from cfehome.filters import TrigramSearchFilter
+
+
+class TrigramSearchFilterTest(TestCase):
+    def setUp(self):
+        for first_name, email in [("John", "johndoe@gmail.com"), ("Mary", "mary@gmail.com")]:
+            Account.objects.create(
+                first_name=first_name, last_name="Doe", email=email, password="x"
+            )
+        self.view = ListAccountsView()
+        self.queryset = Account.objects.order_by("-date_joined")
+
+    def filter(self, params):
+        request = Request(APIRequestFactory().get("/", params))
+        return TrigramSearchFilter().filter_queryset(request, self.queryset, self.view)
+
+    def test_falls_back_to_search_filter(self):
+        queryset = self.filter({"search": "john"})
+
+        self.assertEqual([a.email for a in queryset], ["johndoe@gmail.com"])
+        self.assertNotIn("SIMILARITY", str(queryset.query).upper())
+
+    def test_without_search_terms(self):
+        self.assertEqual(self.filter({}).count(), 2)
+
+    def test_ranks_by_similarity_on_postgresql(self):
+        with mock.patch.object(TrigramSearchFilter, "use_trigrams", return_value=True):
+            queryset = self.filter({"search": "john"})
+
+        self.assertIn("SIMILARITY", str(queryset.query).upper())
+        self.assertEqual(queryset.query.order_by, ("-search_rank", "-date_joined"))
@@ -0,0 +1,113 @@
+import asyncio
+from unittest import mock
+
+from django.contrib.auth.hashers import make_password as django_make_password
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from accounts.models import Account
+from cfehome import hashing, metrics
+
+
+@override_settings(PASSWORD_HASHING_WORKERS=0)
+class PasswordHashingTest(TestCase):
+    def test_make_and_check_password(self):
+        encoded = hashing.make_password("NewPassword@2022")
+
+        self.assertTrue(encoded.startswith("argon2$argon2id$"))
+        self.assertTrue(hashing.check_password("NewPassword@2022", encoded))
+        self.assertFalse(hashing.check_password("WrongPassword@2022", encoded))
+        self.assertFalse(hashing.check_password(None, encoded))
+
+    def test_pbkdf2_hash_is_upgraded_on_login(self):
+        user = Account.objects.create_user(
+            first_name="John",
+            last_name="Doe",
+            email="johndoe@gmail.com",
+        )
+        user.password = django_make_password(
+            "NewPassword@2022", hasher="pbkdf2_sha256"
+        )
+        user.save()
+
+        self.assertTrue(user.check_password("NewPassword@2022"))
+
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("argon2$"))
+
+
+class HashingExecutorTest(SimpleTestCase):
+    @override_settings(PASSWORD_HASHING_WORKERS=None)
+    def test_default_workers_share_the_cores(self):
+        executor = hashing.HashingExecutor()
+
+        with mock.patch("os.cpu_count", return_value=8):
+            with self.settings(WEB_CONCURRENCY=None):
+                self.assertEqual(executor.workers, 1)
+            with self.settings(WEB_CONCURRENCY=2):
+                self.assertEqual(executor.workers, 4)
+            with self.settings(WEB_CONCURRENCY=17):
+                self.assertEqual(executor.workers, 1)
+
+    @override_settings(PASSWORD_HASHING_WORKERS=3, WEB_CONCURRENCY=8)
+    def test_configured_workers(self):
+        self.assertEqual(hashing.HashingExecutor().workers, 3)
+
+    @override_settings(
+        PASSWORD_HASHING_WORKERS=0,
+        PASSWORD_HASHING_QUEUE_SIZE=1,
+        PASSWORD_HASHING_QUEUE_TIMEOUT=5,
+    )
+    async def test_cancelled_wait_gives_its_slot_back(self):
+        executor = hashing.HashingExecutor()
+        slots = executor.get_slots()
+        slots.acquire()
+
+        task = asyncio.ensure_future(executor.arun(str, 1))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        # The waiting thread gets the slot once it is free, and returns it.
+        slots.release()
+        await asyncio.sleep(0.1)
+        self.assertTrue(slots.acquire(blocking=False))
+
+
+class PasswordHashingQueueTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        Account.objects.create_user(
+            first_name="John",
+            last_name="Doe",
+            email="johndoe@gmail.com",
+            password="NewPassword@2022",
+        )
+
+    @override_settings(
+        PASSWORD_HASHING_WORKERS=0,
+        PASSWORD_HASHING_QUEUE_SIZE=0,
+        PASSWORD_HASHING_QUEUE_TIMEOUT=0,
+    )
+    def test_full_queue_returns_503(self):
+        response = self.client.post(
+            reverse("accounts:login"),
+            {"email": "johndoe@gmail.com", "password": "NewPassword@2022"},
+        )
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.data["detail"].code, "password_hashing_unavailable")
+        self.assertEqual(metrics.snapshot()["password_hashing.rejected"], 1)
+
+    def test_login_hashes_in_process_pool(self):
+        response = self.client.post(
+            reverse("accounts:login"),
+            {"email": "johndoe@gmail.com", "password": "NewPassword@2022"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(hashing.executor.pool)
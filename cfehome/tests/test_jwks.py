@@ -0,0 +1,120 @@
+import json
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.exceptions import TokenError
+
+from accounts.models import Account
+from cfehome.jwks import get_key_ring
+from cfehome.tokens import AccessToken, RefreshToken
+
+
+def private_pem(key):
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+
+
+def public_pem(key):
+    return (
+        key.public_key()
+        .public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        .decode()
+    )
+
+
+RSA_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+ED25519_KEY = ed25519.Ed25519PrivateKey.generate()
+
+
+class KeyRingTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = Account.objects.create_user(
+            first_name="John",
+            last_name="Doe",
+            email="johndoe@gmail.com",
+            password="NewPassword@2022",
+        )
+
+    @override_settings(JWT_SIGNING_KEY_FILES=[private_pem(RSA_KEY)])
+    def test_tokens_are_signed_with_key_id(self):
+        token = str(RefreshToken.for_user(self.user).access_token)
+        header = jwt.get_unverified_header(token)
+
+        self.assertEqual(header["alg"], "RS256")
+        self.assertEqual(header["kid"], get_key_ring().signing_key.kid)
+        self.assertEqual(AccessToken(token)["user_id"], self.user.id)
+
+    def test_rotation_keeps_previous_key_for_verification(self):
+        with self.settings(JWT_SIGNING_KEY_FILES=[private_pem(RSA_KEY)]):
+            token = str(RefreshToken.for_user(self.user).access_token)
+
+        with self.settings(
+            JWT_SIGNING_KEY_FILES=[private_pem(ED25519_KEY), public_pem(RSA_KEY)]
+        ):
+            self.assertEqual(AccessToken(token)["user_id"], self.user.id)
+            new_token = str(RefreshToken.for_user(self.user).access_token)
+            self.assertEqual(jwt.get_unverified_header(new_token)["alg"], "EdDSA")
+
+        with self.settings(JWT_SIGNING_KEY_FILES=[private_pem(ED25519_KEY)]):
+            with self.assertRaises(TokenError):
+                AccessToken(token)
+
+    @override_settings(JWT_SIGNING_KEY_FILES=[private_pem(ED25519_KEY)])
+    def test_login_issues_tokens_verifiable_with_jwks(self):
+        response = self.client.post(
+            reverse("accounts:login"),
+            {"email": "johndoe@gmail.com", "password": "NewPassword@2022"},
+        )
+        access = response.data["access"]
+
+        jwks = json.loads(self.client.get(reverse("jwks")).content)
+        key = jwt.PyJWK(jwks["keys"][0])
+        payload = jwt.decode(
+            access, key.key, algorithms=["EdDSA"], audience="spek-n-boonen.be"
+        )
+        self.assertEqual(payload["user_id"], self.user.id)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        self.assertEqual(self.client.get(reverse("accounts:me")).status_code, 200)
+
+        response = self.client.post(
+            reverse("accounts:refresh"), {"refresh": response.data["refresh"]}
+        )
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.post(
+            reverse("accounts:verify_token"), {"token": response.data["access"]}
+        )
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(
+        JWT_SIGNING_KEY_FILES=[private_pem(ED25519_KEY), public_pem(RSA_KEY)],
+        JWKS_MAX_AGE=600,
+    )
+    def test_jwks_view(self):
+        response = self.client.get(reverse("jwks"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertIn("max-age=600", response["Cache-Control"])
+        self.assertIn("public", response["Cache-Control"])
+        keys = json.loads(response.content)["keys"]
+        self.assertEqual([key["alg"] for key in keys], ["EdDSA", "RS256"])
+        self.assertFalse(any("d" in key for key in keys))
+
+        response = self.client.get(
+            reverse("jwks"), HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, 304)
@@ -0,0 +1,138 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from accounts.models import Account
+
+
+class PaginationTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = Account.objects.create_superuser(
+            first_name="Admin",
+            last_name="User",
+            email="admin@gmail.com",
+            password="NewPassword@2022",
+        )
+        for i in range(6):
+            Account.objects.create_user(
+                first_name=f"User{i}",
+                last_name="Doe",
+                email=f"user{5 - i}@gmail.com",
+                password="NewPassword@2022",
+            )
+        self.client.force_authenticate(self.admin)
+        self.url = reverse("accounts:list_users")
+
+    def count_queries(self, queries):
+        return [
+            query
+            for query in queries.captured_queries
+            if "COUNT(" in query["sql"].upper()
+        ]
+
+
+class KeysetPaginationTest(PaginationTestCase):
+    def collect(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(user["id"] for user in response.data["results"])
+            url = response.data["next"]
+        return ids
+
+    def test_page_number_pagination_is_the_default(self):
+        response = self.client.get(self.url, {"limit": 2})
+        self.assertEqual(response.data["count"], 7)
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_cursor_pagination(self):
+        expected = list(
+            Account.objects.order_by("-date_joined", "id").values_list("id", flat=True)
+        )
+
+        self.assertEqual(
+            self.collect(f"{self.url}?pagination=cursor&limit=2"), expected
+        )
+
+    def test_cursor_pagination_does_not_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {"pagination": "cursor", "limit": 2})
+
+        self.assertNotIn("count", response.data)
+        self.assertEqual(self.count_queries(queries), [])
+
+    def test_cursor_pagination_with_ordering(self):
+        expected = list(
+            Account.objects.order_by("email", "pk").values_list("id", flat=True)
+        )
+
+        self.assertEqual(
+            self.collect(f"{self.url}?pagination=cursor&limit=4&ordering=email"),
+            expected,
+        )
+
+    def test_previous_link(self):
+        first = self.client.get(self.url, {"pagination": "cursor", "limit": 3})
+        self.assertIsNone(first.data["previous"])
+
+        second = self.client.get(first.data["next"])
+        previous = self.client.get(second.data["previous"])
+
+        self.assertEqual(previous.data["results"], first.data["results"])
+        self.assertIsNone(previous.data["previous"])
+        self.assertEqual(previous.data["next"], first.data["next"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {"cursor": "invalid"})
+        self.assertEqual(response.status_code, 404)
+
+
+class EstimatedCountPaginationTest(PaginationTestCase):
+    def test_exact_count(self):
+        response = self.client.get(self.url, {"limit": 2})
+        self.assertEqual(response.data["count"], 7)
+        self.assertTrue(response.data["count_exact"])
+
+    def test_exact_count_is_cached(self):
+        self.client.get(self.url, {"limit": 2})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {"limit": 2, "page": 2})
+
+        self.assertEqual(response.data["count"], 7)
+        self.assertEqual(self.count_queries(queries), [])
+
+    def test_cached_count_is_invalidated_on_write(self):
+        self.client.get(self.url, {"limit": 2})
+        Account.objects.create_user(
+            first_name="Jane",
+            last_name="Doe",
+            email="janedoe@gmail.com",
+            password="NewPassword@2022",
+        )
+
+        response = self.client.get(self.url, {"limit": 2})
+        self.assertEqual(response.data["count"], 8)
+
+    def test_estimated_count(self):
+        with mock.patch(
+            "cfehome.pagination.estimate_count", return_value=1000000
+        ), CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {"limit": 5})
+            last_page = self.client.get(self.url, {"limit": 5, "page": 2})
+            past_the_end = self.client.get(self.url, {"limit": 5, "page": 3})
+
+        self.assertEqual(response.data["count"], 1000000)
+        self.assertFalse(response.data["count_exact"])
+        self.assertIsNotNone(response.data["next"])
+        self.assertEqual(len(last_page.data["results"]), 2)
+        self.assertIsNone(last_page.data["next"])
+        self.assertEqual(past_the_end.status_code, 200)
+        self.assertEqual(past_the_end.data["results"], [])
+        self.assertEqual(self.count_queries(queries), [])
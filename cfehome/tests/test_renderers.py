@@ -0,0 +1,130 @@
+import datetime
+import decimal
+import io
+import uuid
+
+import msgpack
+from django.test import SimpleTestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from cfehome.parsers import MessagePackParser, ORJSONParser
+from cfehome.renderers import CSVRenderer, MessagePackRenderer, ORJSONRenderer
+
+
+class CSVRendererTest(SimpleTestCase):
+    def test_formulas_are_escaped(self):
+        content = CSVRenderer().render(
+            [
+                {"first_name": "=HYPERLINK(\"http://x.y\")", "last_name": "+1"},
+                {"first_name": "-2", "last_name": "@SUM(A1)"},
+                {"first_name": "\tTab", "last_name": "\rReturn"},
+                {"first_name": "Jane", "last_name": -3},
+            ]
+        )
+
+        self.assertEqual(
+            content.decode().split("\r\n")[:-1],
+            [
+                "first_name,last_name",
+                "\"'=HYPERLINK(\"\"http://x.y\"\")\",'+1",
+                "'-2,'@SUM(A1)",
+                "'\tTab,\"'\rReturn\"",
+                "Jane,-3",
+            ],
+        )
+
+
+class ORJSONRendererTest(SimpleTestCase):
+    def assertRendersLikeJSONRenderer(self, data, media_type="application/json"):
+        self.assertEqual(
+            ORJSONRenderer().render(data, media_type),
+            JSONRenderer().render(data, media_type),
+        )
+
+    def test_same_output(self):
+        self.assertRendersLikeJSONRenderer(
+            {
+                "id": 1,
+                "email": "jöhn@example.com",
+                "active": True,
+                "last_login": None,
+                "date_joined": datetime.datetime(
+                    2023, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc
+                ),
+                "local": timezone.make_aware(datetime.datetime(2023, 1, 2, 3, 4, 5)),
+                "date": datetime.date(2023, 1, 2),
+                "time": datetime.time(3, 4, 5, 678901),
+                "balance": decimal.Decimal("1.10"),
+                "label": _("Email Address"),
+                "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+                "ids": [1, 2, 3],
+                "separator": "a\u2028b\u2029c",
+                1: "int key",
+            }
+        )
+
+    def test_indent_and_big_integers(self):
+        self.assertRendersLikeJSONRenderer(
+            {"a": [1, 2]}, "application/json; indent=4"
+        )
+        self.assertRendersLikeJSONRenderer({"a": 2**70})
+
+    def test_none(self):
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+
+class ORJSONParserTest(SimpleTestCase):
+    def parse(self, parser, body):
+        return parser.parse(io.BytesIO(body), "application/json", {})
+
+    def test_same_result(self):
+        for body in (
+            '{"email": "jöhn@example.com", "ids": [1, 2.5], "none": null}'.encode(),
+            b'{"big": 1180591620717411303424}',
+        ):
+            self.assertEqual(
+                self.parse(ORJSONParser(), body), self.parse(JSONParser(), body)
+            )
+
+    def test_invalid(self):
+        for body in (b"", b"{", b'{"a": NaN}'):
+            with self.assertRaises(ParseError):
+                self.parse(ORJSONParser(), body)
+
+
+class MessagePackTest(SimpleTestCase):
+    def test_round_trip(self):
+        data = {
+            "id": 1,
+            "email": "jöhn@example.com",
+            "ids": [1, 2],
+            "last_login": None,
+            "date_joined": datetime.datetime(
+                2023, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc
+            ),
+            "label": _("Email Address"),
+        }
+
+        content = MessagePackRenderer().render(data)
+        parsed = MessagePackParser().parse(io.BytesIO(content))
+
+        self.assertEqual(parsed["date_joined"], "2023-01-02T03:04:05.678901Z")
+        self.assertEqual(parsed["label"], "Email Address")
+        self.assertEqual(parsed["ids"], [1, 2])
+
+    def test_timestamps_are_datetimes(self):
+        when = datetime.datetime(2023, 1, 2, tzinfo=datetime.timezone.utc)
+        content = msgpack.packb({"when": when}, datetime=True)
+
+        parsed = MessagePackParser().parse(io.BytesIO(content))
+
+        self.assertEqual(parsed["when"], when)
+
+    def test_invalid(self):
+        for body in (b"", b"\x92\x01", b"\xc1"):
+            with self.assertRaises(ParseError):
+                MessagePackParser().parse(io.BytesIO(body))
@@ -0,0 +1,91 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from accounts.models import Account, RefreshTokenFamily
+from cfehome import metrics
+from cfehome.authentication import user_cache
+from cfehome.bloom import BloomFilter
+from cfehome.revocation import revocation_filter
+from cfehome.tokens import FAMILY_CLAIM, AccessToken
+
+
+class BloomFilterTest(SimpleTestCase):
+    def test_contains_added_items(self):
+        bloom = BloomFilter(1000, 0.01)
+        items = [f"item-{i}" for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+
+        self.assertTrue(all(item in bloom for item in items))
+
+    def test_false_positive_rate(self):
+        bloom = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f"item-{i}")
+
+        false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives / 10000, 0.02)
+
+
+@override_settings(REVOCATION_FILTER_SYNC_INTERVAL=0)
+class RevocationFilterTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        user_cache.local.clear()
+        revocation_filter.clear()
+        metrics.reset()
+
+        Account.objects.create_user(
+            first_name="John",
+            last_name="Doe",
+            email="johndoe@gmail.com",
+            password="NewPassword@2022",
+        )
+        response = self.client.post(
+            reverse("accounts:login"),
+            {"email": "johndoe@gmail.com", "password": "NewPassword@2022"},
+        )
+        self.access = response.data["access"]
+        self.refresh = response.data["refresh"]
+        self.family = AccessToken(self.access)[FAMILY_CLAIM]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access}")
+
+    @override_settings(REVOCATION_FILTER_SYNC_INTERVAL=60)
+    def test_active_session_needs_no_query(self):
+        self.client.get(reverse("accounts:me"))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("accounts:me"))
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_refresh_token_reuse_revokes_access_tokens(self):
+        refresh_url = reverse("accounts:refresh")
+        self.client.post(refresh_url, {"refresh": self.refresh})
+        self.client.post(refresh_url, {"refresh": self.refresh})
+
+        response = self.client.get(reverse("accounts:me"))
+        self.assertEqual(response.status_code, 401)
+
+        response = self.client.post(
+            reverse("accounts:verify_token"), {"token": self.access}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_revocations_of_other_processes_are_synced(self):
+        self.assertEqual(self.client.get(reverse("accounts:me")).status_code, 200)
+
+        RefreshTokenFamily.objects.revoke(self.family)
+
+        self.assertEqual(self.client.get(reverse("accounts:me")).status_code, 401)
+
+    def test_false_positive_is_confirmed_with_database(self):
+        with mock.patch.object(BloomFilter, "__contains__", return_value=True):
+            response = self.client.get(reverse("accounts:me"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(metrics.snapshot()["revocation_filter.false_positive"], 1)
@@ -0,0 +1,125 @@
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from accounts.models import Account
+from cfehome import metrics
+from cfehome.throttling import TokenBucket
+
+
+@mock.patch("cfehome.throttling.time.time")
+class TokenBucketTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.bucket = TokenBucket("throttle:test", rate=1, burst=3)
+
+    def test_burst_then_refill(self, time):
+        time.return_value = 1000
+
+        self.assertEqual(
+            [self.bucket.consume()[0] for _ in range(4)], [True, True, True, False]
+        )
+        self.assertEqual(self.bucket.consume(), (False, 1))
+
+        time.return_value = 1001
+        self.assertEqual(self.bucket.consume(), (True, 0))
+        self.assertFalse(self.bucket.consume()[0])
+
+    def test_idle_bucket_is_full_again(self, time):
+        time.return_value = 1000
+        for _ in range(3):
+            self.bucket.consume()
+
+        time.return_value = 1100
+        self.assertEqual(
+            [self.bucket.consume()[0] for _ in range(4)], [True, True, True, False]
+        )
+
+
+def throttle_rates(**rates):
+    return {**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": rates}
+
+
+class CredentialThrottleTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        Account.objects.create_user(
+            first_name="John",
+            last_name="Doe",
+            email="johndoe@gmail.com",
+            password="NewPassword@2022",
+        )
+        self.url = reverse("accounts:login")
+
+    def test_login_is_throttled_by_email_before_hashing(self):
+        rest_framework = throttle_rates(
+            **{"login.ip": "100/min", "login.email": "2/min"}
+        )
+        credentials = {"email": "johndoe@gmail.com", "password": "Wrong@2022"}
+
+        with self.settings(REST_FRAMEWORK=rest_framework):
+            for ip in ("10.0.0.1", "10.0.0.2"):
+                response = self.client.post(self.url, credentials, REMOTE_ADDR=ip)
+                self.assertEqual(response.status_code, 401)
+
+            with mock.patch("cfehome.hashing.executor.run") as run:
+                response = self.client.post(
+                    self.url,
+                    {"email": "JohnDoe@gmail.com", "password": "Wrong@2022"},
+                    REMOTE_ADDR="10.0.0.3",
+                )
+            run.assert_not_called()
+
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+        self.assertEqual(metrics.snapshot()["throttle.login.email.rejected"], 1)
+
+    def test_register_is_throttled_by_ip(self):
+        data = {
+            "first_name": "Jane",
+            "last_name": "Doe",
+            "password": "NewPassword@2022",
+            "password2": "NewPassword@2022",
+        }
+        url = reverse("accounts:register")
+
+        with self.settings(REST_FRAMEWORK=throttle_rates(**{"register.ip": "1/hour"})):
+            response = self.client.post(url, {**data, "email": "jane@gmail.com"})
+            self.assertEqual(response.status_code, 201)
+
+            response = self.client.post(url, {**data, "email": "jane2@gmail.com"})
+            self.assertEqual(response.status_code, 429)
+        self.assertEqual(metrics.snapshot()["throttle.register.ip.rejected"], 1)
+
+    def test_spoofed_forwarded_for_does_not_reset_ip_bucket(self):
+        credentials = {"password": "Wrong@2022"}
+        with self.settings(REST_FRAMEWORK=throttle_rates(**{"login.ip": "2/min"})):
+            for i in range(3):
+                response = self.client.post(
+                    self.url,
+                    {**credentials, "email": f"user{i}@gmail.com"},
+                    REMOTE_ADDR="10.0.0.1",
+                    HTTP_X_FORWARDED_FOR=f"192.168.0.{i}",
+                )
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(metrics.snapshot()["throttle.login.ip.rejected"], 1)
+
+    def test_forwarded_for_of_trusted_proxy(self):
+        credentials = {"email": "johndoe@gmail.com", "password": "Wrong@2022"}
+        rest_framework = throttle_rates(**{"login.ip": "1/min"})
+
+        with self.settings(REST_FRAMEWORK={**rest_framework, "NUM_PROXIES": 1}):
+            for client_ip in ("192.168.0.1", "192.168.0.2"):
+                response = self.client.post(
+                    self.url,
+                    credentials,
+                    REMOTE_ADDR="10.0.0.1",
+                    HTTP_X_FORWARDED_FOR=f"1.2.3.4, {client_ip}",
+                )
+                self.assertEqual(response.status_code, 401)
@@ -0,0 +1,85 @@
+import json
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models import Account, OutboundEmail
+from cfehome import metrics
+from cfehome.authentication import user_cache
+
+
+class AsyncAPIViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_cache.local.clear()
+        metrics.reset()
+
+        self.user = Account.objects.create_user(
+            first_name="John",
+            last_name="Doe",
+            email="johndoe@gmail.com",
+            password="NewPassword@2022",
+        )
+        response = self.client.post(
+            reverse("accounts:login"),
+            {"email": "johndoe@gmail.com", "password": "NewPassword@2022"},
+        )
+        self.headers = {"Authorization": f"Bearer {response.data['access']}"}
+
+    async def test_authenticates_from_user_cache(self):
+        url = reverse("accounts:me")
+        await self.async_client.get(url, headers=self.headers)
+
+        response = await self.async_client.get(url, headers=self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)["id"], self.user.id)
+        self.assertEqual(metrics.snapshot()["user_cache.local_hit"], 1)
+
+    async def test_permission_denied(self):
+        response = await self.async_client.get(reverse("accounts:me"))
+
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("WWW-Authenticate", response.headers)
+
+    async def test_sync_handlers_run_next_to_async_ones(self):
+        response = await self.async_client.patch(
+            reverse("accounts:me"),
+            {"first_name": "Jane"},
+            content_type="application/json",
+            headers=self.headers,
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((await Account.objects.aget(pk=self.user.pk)).first_name, "Jane")
+
+    async def test_register(self):
+        response = await self.async_client.post(
+            reverse("accounts:register"),
+            {
+                "email": "janedoe@gmail.com",
+                "first_name": "Jane",
+                "last_name": "Doe",
+                "password": "NewPassword@2022",
+                "password2": "NewPassword@2022",
+            },
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        user = await Account.objects.aget(email="janedoe@gmail.com")
+        self.assertTrue(user.check_password("NewPassword@2022"))
+        self.assertTrue(
+            await OutboundEmail.objects.filter(to_email="janedoe@gmail.com").aexists()
+        )
+
+    async def test_register_validates_input(self):
+        response = await self.async_client.post(
+            reverse("accounts:register"),
+            {"email": "johndoe@gmail.com"},
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("first_name", json.loads(response.content))
@@ -0,0 +1,151 @@
+import hashlib
+import math
+import time
+
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from . import metrics
+
+
+def parse_rate(rate):
+    """
+    Parse a DRF style rate, e.g. "10/min", into (requests, seconds).
+    """
+    requests, period = rate.split("/")
+    return int(requests), {"s": 1, "m": 60, "h": 3600, "d": 86400}[period[0]]
+
+
+class TokenBucket:
+    """
+    Token bucket shared by every process through the Django cache.
+
+    The bucket is kept as a single counter, its theoretical arrival time
+    (GCRA) in units of emission intervals, so that taking a token is one
+    atomic `cache.incr`. A request is allowed while the counter is at most
+    `burst` intervals ahead of the current time; a rejected request gives
+    its token back.
+    """
+
+    def __init__(self, key, rate, burst):
+        self.key = key
+        self.rate = rate
+        self.burst = burst
+        # Long enough to outlive any debt; an idle bucket expires when full.
+        self.timeout = math.ceil((burst + 1) / rate) + 1
+
+    def consume(self):
+        """
+        Take a token. Returns (allowed, seconds until a token is available).
+        """
+        now = math.floor(time.time() * self.rate)
+
+        cache.add(self.key, now, self.timeout)
+        try:
+            tat = cache.incr(self.key)
+        except ValueError:
+            # The key expired between add() and incr().
+            cache.add(self.key, now + 1, self.timeout)
+            tat = now + 1
+
+        if tat <= now:
+            # The bucket had been full for a while, restart it at the current
+            # time. Racing resets can only hand out a few extra tokens.
+            cache.set(self.key, now + 1, self.timeout)
+            return True, 0
+
+        if tat - now <= self.burst:
+            return True, 0
+
+        cache.decr(self.key)
+        cache.touch(self.key, self.timeout)
+        return False, (tat - now - self.burst) / self.rate
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Throttle with a `TokenBucket` per client, configured per view.
+
+    The view's `throttle_scope` and the throttle's `kind` select the rate
+    from `DEFAULT_THROTTLE_RATES` as "<scope>.<kind>". Rates use DRF's
+    "<requests>/<period>" format: the bucket holds that many tokens and
+    refills at that pace. Views without a rate are not throttled.
+    """
+
+    kind = None
+
+    def get_bucket_key(self, request, view):
+        raise NotImplementedError
+
+    def get_rate(self, view):
+        scope = getattr(view, "throttle_scope", None)
+        return scope, api_settings.DEFAULT_THROTTLE_RATES.get(f"{scope}.{self.kind}")
+
+    def allow_request(self, request, view):
+        self.retry_after = None
+
+        scope, rate = self.get_rate(view)
+        if rate is None:
+            return True
+
+        key = self.get_bucket_key(request, view)
+        if key is None:
+            return True
+
+        requests, duration = parse_rate(rate)
+        bucket = TokenBucket(
+            f"throttle:{scope}:{self.kind}:{key}", requests / duration, requests
+        )
+        allowed, self.retry_after = bucket.consume()
+
+        if not allowed:
+            metrics.incr(f"throttle.{scope}.{self.kind}.rejected")
+        return allowed
+
+    def wait(self):
+        return self.retry_after
+
+
+class IPThrottle(TokenBucketThrottle):
+    """
+    Throttles by client IP, read from `X-Forwarded-For` only as far as the
+    `NUM_PROXIES` trusted proxies in front of the application vouch for it.
+    """
+
+    kind = "ip"
+
+    def get_bucket_key(self, request, view):
+        return self.get_ident(request)
+
+
+class EmailThrottle(TokenBucketThrottle):
+    """
+    Throttles by the email address in the request body, whatever IP the
+    requests come from.
+    """
+
+    kind = "email"
+
+    def get_bucket_key(self, request, view):
+        try:
+            email = request.data.get("email")
+        except AttributeError:
+            return None
+        if not isinstance(email, str) or not email:
+            return None
+        return hashlib.sha256(email.strip().lower().encode()).hexdigest()
+
+
+class GlobalThrottle(TokenBucketThrottle):
+    """
+    Caps the total rate of a view across all clients.
+    """
+
+    kind = "global"
+
+    def get_bucket_key(self, request, view):
+        return "all"
+
+
+CREDENTIAL_THROTTLES = [IPThrottle, EmailThrottle, GlobalThrottle]
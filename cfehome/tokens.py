@@ -0,0 +1,73 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from accounts.models import RefreshTokenFamily
+
+from .jwks import token_backend
+from .revocation import revocation_filter
+
+FAMILY_CLAIM = "fam"
+GENERATION_CLAIM = "gen"
+
+
+class AccessToken(tokens.AccessToken):
+    _token_backend = token_backend
+
+
+class RefreshToken(tokens.Token):
+    """
+    Refresh token bound to a `RefreshTokenFamily`.
+
+    Unlike simplejwt's RefreshToken it records nothing per token: rotating
+    bumps the generation of the family, and any older generation of the
+    same family is rejected.
+    """
+
+    _token_backend = token_backend
+    token_type = "refresh"
+    lifetime = api_settings.REFRESH_TOKEN_LIFETIME
+    no_copy_claims = tokens.RefreshToken.no_copy_claims + (GENERATION_CLAIM,)
+    access_token_class = AccessToken
+    access_token = tokens.RefreshToken.access_token
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        family = RefreshTokenFamily.objects.start(user)
+        token[FAMILY_CLAIM] = str(family.pk)
+        token[GENERATION_CLAIM] = family.generation
+        return token
+
+    def check_family(self):
+        if not RefreshTokenFamily.objects.is_current(
+            self.get(FAMILY_CLAIM), self.get(GENERATION_CLAIM)
+        ):
+            raise TokenError(_("Token is invalid or expired"))
+
+    def rotate(self):
+        """
+        Turn this token into the next generation of its family.
+        """
+        generation = RefreshTokenFamily.objects.rotate(
+            self.get(FAMILY_CLAIM), self.get(GENERATION_CLAIM)
+        )
+        if generation is None:
+            revocation_filter.add(self.get(FAMILY_CLAIM))
+            raise TokenError(_("Token is invalid or expired"))
+
+        self[GENERATION_CLAIM] = generation
+        self.set_jti()
+        self.set_exp()
+        self.set_iat()
+
+    def verify(self):
+        super().verify()
+
+        if FAMILY_CLAIM not in self.payload:
+            raise TokenError(_("Token is invalid or expired"))
+
+
+class UntypedToken(tokens.UntypedToken):
+    _token_backend = token_backend
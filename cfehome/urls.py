@@ -3,9 +3,12 @@ from django.urls import path, include
 from django.conf.urls.static import static
 from django.conf import settings
 
+from api.views import JWKSView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("api.urls")),
+    path(".well-known/jwks.json", JWKSView.as_view(), name="jwks"),
     path(
         "api/auth/",
         include(
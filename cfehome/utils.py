@@ -1,13 +1,10 @@
-import threading
 import jwt
 from datetime import datetime, timedelta
 from typing import TypedDict
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
 from django.utils import timezone
 
-from accounts.models import BlacklistedToken
+from accounts.models import BlacklistedToken, OutboundEmail
 
 
 class TemplatePaths(TypedDict):
@@ -15,30 +12,22 @@ class TemplatePaths(TypedDict):
     text: str
 
 
-class EmailThread(threading.Thread):
-
-    def __init__(self, email):
-        self.email = email
-        threading.Thread.__init__(self)
-
-    def run(self):
-        self.email.send()
-
-
 class Util:
     @staticmethod
     def send_email(
         email: str, subject: str, template_urls: TemplatePaths, context: dict
     ):
-
-        html_message = render_to_string(template_urls["html"], context)
-        plain_text_message = render_to_string(template_urls["text"], context)
-
-        msg = EmailMultiAlternatives(
-            subject, plain_text_message, settings.EMAIL_FROM, [email]
+        """
+        Queue an email for delivery. The templates are rendered by the
+        queue worker, so `context` must be JSON-serializable.
+        """
+        return OutboundEmail.objects.enqueue(
+            email,
+            subject,
+            template_text=template_urls["text"],
+            template_html=template_urls["html"],
+            context=context,
         )
-        msg.attach_alternative(html_message, "text/html")
-        EmailThread(msg).start()
 
     @staticmethod
     def generate_verification_token(user):
@@ -55,18 +44,46 @@ class Util:
         )
 
     @staticmethod
-    def validate_verification_token(key: str):
-        blacklisted = BlacklistedToken.objects.filter(token=key).first()
-
-        if blacklisted:
-            return None
-
+    def decode_verification_token(key: str):
         try:
             payload = jwt.decode(key, settings.SECRET_KEY, algorithms=["HS256"])
-            if payload["scope"] != "email_verification":
-                return None
-            return payload
         except jwt.ExpiredSignatureError:
             return None
         except jwt.InvalidTokenError:
             return None
+
+        if payload.get("scope") != "email_verification":
+            return None
+
+        return payload
+
+    @staticmethod
+    def validate_verification_token(key: str):
+        payload = Util.decode_verification_token(key)
+
+        # Only well-formed, unexpired tokens need the blacklist lookup
+        if payload is None or BlacklistedToken.objects.is_blacklisted(key):
+            return None
+
+        return payload
+
+    @staticmethod
+    async def avalidate_verification_token(key: str):
+        payload = Util.decode_verification_token(key)
+
+        if payload is None or await BlacklistedToken.objects.ais_blacklisted(key):
+            return None
+
+        return payload
+
+    @staticmethod
+    def blacklist_verification_token(key: str, payload: dict):
+        BlacklistedToken.objects.blacklist(
+            key, datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
+        )
+
+    @staticmethod
+    async def ablacklist_verification_token(key: str, payload: dict):
+        await BlacklistedToken.objects.ablacklist(
+            key, datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
+        )
@@ -0,0 +1,273 @@
+import hashlib
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import exceptions, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import metrics
+from .cache import LocalTTLCache, bump_versions, get_versions
+
+# Permissions that only look at the request, safe to check in the event loop.
+LOCAL_PERMISSIONS = (
+    permissions.AllowAny,
+    permissions.IsAuthenticated,
+    permissions.IsAuthenticatedOrReadOnly,
+)
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose `async def` handlers run natively under ASGI, without a
+    thread hop per request.
+
+    Authentication, permissions and throttles run before the handler as in
+    APIView. Authenticators and permissions with an async variant
+    (`aauthenticate`, `ahas_permission`) are awaited; request-only
+    permissions are checked inline; anything else, throttles included, runs
+    in a single `sync_to_async` call. Sync handlers are allowed next to async
+    ones and run through `sync_to_async`. Handlers return DRF Responses.
+    """
+
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def ainitial(self, request, *args, **kwargs):
+        """
+        `initial`, awaiting authentication, permissions and throttles.
+        """
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+
+        neg = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = neg
+
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+
+        await self.aperform_authentication(request)
+        await self.acheck_permissions(request)
+        await self.acheck_throttles(request)
+
+    async def aperform_authentication(self, request):
+        for authenticator in request.authenticators:
+            try:
+                if hasattr(authenticator, "aauthenticate"):
+                    user_auth_tuple = await authenticator.aauthenticate(request)
+                else:
+                    user_auth_tuple = await sync_to_async(authenticator.authenticate)(
+                        request
+                    )
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+
+        request._not_authenticated()
+
+    async def acheck_permissions(self, request):
+        for permission in self.get_permissions():
+            if hasattr(permission, "ahas_permission"):
+                allowed = await permission.ahas_permission(request, self)
+            elif isinstance(permission, LOCAL_PERMISSIONS):
+                allowed = permission.has_permission(request, self)
+            else:
+                allowed = await sync_to_async(permission.has_permission)(
+                    request, self
+                )
+
+            if not allowed:
+                self.permission_denied(
+                    request,
+                    message=getattr(permission, "message", None),
+                    code=getattr(permission, "code", None),
+                )
+
+    async def acheck_throttles(self, request):
+        if self.throttle_classes:
+            await sync_to_async(self.check_throttles)(request)
+
+
+class PreconditionFailed(exceptions.APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = "The resource was changed since it was read."
+    default_code = "precondition_failed"
+
+
+class ETagMixin:
+    def etag_matches(self, header, etag):
+        etags = parse_etags(header or "")
+        return etag in etags or "*" in etags
+
+    def conditional_response(self, request, etag, response):
+        """
+        Return 304 if `If-None-Match` holds `etag`, else `response()`.
+        """
+        if self.etag_matches(request.headers.get("If-None-Match"), etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = response()
+
+        response["ETag"] = etag
+        # Cached by the client only, and revalidated on every use. The ETag
+        # doesn't tell the negotiated formats apart.
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ["Accept"])
+        return response
+
+
+class ConditionalMixin(ETagMixin):
+    """
+    Conditional requests for retrieve/update views of versioned objects.
+
+    Responses carry a strong ETag built from `get_version`. A GET whose
+    `If-None-Match` holds the current ETag is answered with 304 from the
+    version alone, without loading or serializing the object. A PUT or PATCH
+    with `If-Match` is applied only if the ETag still matches, checked with
+    the row locked until the update commits, and fails with 412 otherwise.
+    """
+
+    etag_prefix = None
+
+    def get_version(self, lock=False):
+        """
+        Return the current version of the object, raising Http404 if it
+        doesn't exist. With `lock`, the row is locked for the rest of the
+        transaction.
+        """
+        raise NotImplementedError
+
+    def get_etag(self, version):
+        return quote_etag(f"{self.etag_prefix}-{version}")
+
+    def retrieve(self, request, *args, **kwargs):
+        # Read before the object, so a change landing in between leaves the
+        # client with a stale ETag rather than a stale body.
+        etag = self.get_etag(self.get_version())
+        retrieve = super().retrieve
+        return self.conditional_response(
+            request, etag, lambda: retrieve(request, *args, **kwargs)
+        )
+
+    def update(self, request, *args, **kwargs):
+        if_match = request.headers.get("If-Match")
+
+        with transaction.atomic():
+            if if_match is not None:
+                etag = self.get_etag(self.get_version(lock=True))
+                if not self.etag_matches(if_match, etag):
+                    raise PreconditionFailed()
+
+            response = super().update(request, *args, **kwargs)
+
+        response["ETag"] = self.get_etag(self.get_version())
+        return response
+
+
+def response_version_key(model):
+    return f"responses:version:{model._meta.label_lower}"
+
+
+def invalidate_responses(models):
+    """
+    Invalidate every cached list response built from rows of `models`,
+    called whenever rows of those models are written.
+    """
+    bump_versions(response_version_key(model) for model in models)
+
+
+response_cache = LocalTTLCache(
+    maxsize=settings.RESPONSE_CACHE_SIZE, ttl=settings.RESPONSE_CACHE_TIMEOUT
+)
+
+
+class CachedListMixin(ETagMixin):
+    """
+    Serves list responses of rarely written models from process memory.
+
+    The serialized response is kept in `response_cache` per view, host and
+    normalized query string, along with the version stamps of
+    `response_cache_models`. A request whose stamps still match is answered
+    without touching the database, and gets a 304 if its `If-None-Match`
+    holds the ETag of those stamps. Requests with query parameters outside
+    `response_cache_params` (when set) aren't cached.
+
+    Writes that send no signal are served stale for up to
+    `RESPONSE_CACHE_TIMEOUT` seconds.
+    """
+
+    response_cache_models = ()
+    response_cache_params = None
+
+    def get_response_cache_key(self, request):
+        params = sorted(request.query_params.lists())
+        if self.response_cache_params is not None and any(
+            name not in self.response_cache_params for name, _ in params
+        ):
+            return None
+
+        # Pagination links are absolute.
+        return (
+            f"responses:{type(self).__module__}.{type(self).__qualname__}:"
+            f"{request.scheme}://{request.get_host()}?{params!r}"
+        )
+
+    def list(self, request, *args, **kwargs):
+        key = self.get_response_cache_key(request)
+        if key is None:
+            return super().list(request, *args, **kwargs)
+
+        # Read before the rows, so a write landing in between leaves the
+        # entry stale-stamped rather than stale-valued.
+        versions = get_versions(
+            response_version_key(model) for model in self.response_cache_models
+        )
+        version = [versions[name] for name in sorted(versions)]
+        etag = quote_etag(hashlib.sha1(repr((key, version)).encode()).hexdigest())
+        list_ = super().list
+
+        def respond():
+            entry = response_cache.get(key)
+            if entry is not None and entry[0] == version:
+                metrics.incr("response_cache.hit")
+                return Response(entry[1])
+
+            metrics.incr("response_cache.miss")
+            response = list_(request, *args, **kwargs)
+            response_cache.set(key, (version, response.data))
+            return response
+
+        return self.conditional_response(request, etag, respond)